@@ -1,13 +1,28 @@
-from typing import Any
+from typing import Any, Optional
 import abc
+import ast
+import hashlib
+import io
 import os
 import sys
-import subprocess
+import json
+import time
+import tracemalloc
 import importlib
 import traceback
+import contextlib
+import concurrent.futures
+import pylint
 import pylint.lint
+import mypy.version
+import pytest
+import coverage
+import coverage.results
 from mypy import api
 
+# pylint and mypy results keyed by the content of the checked files, and the incremental mypy cache
+CACHE_DIR = '.benchmark_cache'
+
 
 class Benchmark:
 
@@ -16,10 +31,18 @@ class Benchmark:
     COLOR_ENDC = '\033[0m'
     COLOR_RESULT = '\033[93m'
 
+    OPTIONS = {'--jobs': int, '--report': str, '--memory': bool, '--no-cache': bool, '--pytest-shards': int}
+
     def __init__(self, argv) -> None:
-        self.mode = argv[1]
+        self.argv, options = parse_options(argv, self.OPTIONS)
+        self.jobs = options.get('--jobs', 1) # number of processes running tests
+        self.report = options.get('--report') # path of the JSON report, no report if None
+        self.track_memory = options.get('--memory', False) # trace the peak memory per test (slows the tests down)
+        self.use_cache = not options.get('--no-cache', False) # reuse pylint / mypy results of unchanged files
+        self.pytest_shards = options.get('--pytest-shards', 1) # processes sharing the tests of test_pytest
+        self.mode = self.argv[1]
         if self.mode == 'python':
-            self.script = argv[2]
+            self.script = self.argv[2]
             self.game_server = Python_Game_Server(self.script)
 
     def run_tests(self, disable_features=False) -> None:
@@ -29,43 +52,123 @@ class Benchmark:
         if self.mode == 'python':
             print(f'Mode:   {self.mode}')
             print(f'Script: {self.script}')
+        if self.jobs > 1:
+            print(f'Jobs:   {self.jobs}')
         print()
 
         list_function_name = self.get_list_function_name()
 
-        cnt_tests_valid = 0
-        cnt_tests_total = 0
-        cnt_points_valid = 0
-        cnt_points_total = 0
-        for function_name in list_function_name:
+        start = time.perf_counter()
+        list_result = self.run_list_test(list_function_name, disable_features)
+        seconds_wall = time.perf_counter() - start
 
-            function = getattr(self, function_name)
-            id_test = function.__doc__.split(":")[0]
-            points = int(function.__doc__.split(" ")[-2][1:])
-            description = function.__doc__[len(id_test) + 2:]
-            cnt_tests_total += 1
-            cnt_points_total += points
-            try:
-                if disable_features:
-                    os.environ["DISABLED_FEATURES"] = function_name
-                function()
-            except AssertionError as e:
-                print(f'{self.COLOR_FAIL}{id_test}{self.COLOR_ENDC}: {description}')
-                print(e)
-            except Exception:
-                print(f'{self.COLOR_FAIL}{id_test}{self.COLOR_ENDC}: {description}')
-                print(traceback.format_exc())
-            else:
-                print(f'{self.COLOR_OKAY}{id_test}{self.COLOR_ENDC}: {description}')
-                cnt_tests_valid += 1
-                cnt_points_valid += points
-            print()
+        cnt_tests_valid = sum(1 for result in list_result if result['valid'])
+        cnt_tests_total = len(list_result)
+        cnt_points_valid = sum(result['points'] for result in list_result if result['valid'])
+        cnt_points_total = sum(result['points'] for result in list_result)
 
         print(f'{self.COLOR_RESULT}Result{self.COLOR_ENDC}')
         print(f'Tests: {cnt_tests_valid}/{cnt_tests_total} valid', )
         print(f'Mark:  {cnt_points_valid}/{cnt_points_total} points', )
+        print(f'Time:  {seconds_wall:.2f} s', )
         print()
 
+        if self.report is not None:
+            report = {
+                'mode': self.mode,
+                'script': getattr(self, 'script', None),
+                'jobs': self.jobs,
+                'track_memory': self.track_memory,
+                'seconds_wall': seconds_wall,
+                'cnt_tests_valid': cnt_tests_valid,
+                'cnt_tests_total': cnt_tests_total,
+                'cnt_points_valid': cnt_points_valid,
+                'cnt_points_total': cnt_points_total,
+                'tests': list_result,
+            }
+            with open(self.report, 'w', encoding='utf-8') as fout:
+                json.dump(report, fout, indent=2)
+            print(f'Report: {self.report}')
+            print()
+
+
+    def run_list_test(self, list_function_name: list[str], disable_features=False) -> list[dict[str, Any]]:
+        """ Run the tests, in a process pool if jobs > 1, printing the output of each test in the given order """
+        if self.jobs <= 1:
+            return [self.run_test(function_name, disable_features) for function_name in list_function_name]
+
+        list_result = []
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            # submit the last tests first, the slow pylint / mypy / pytest tests have the highest numbers
+            dict_future = {function_name: executor.submit(
+                run_test_isolated, type(self), self.argv + self.get_argv_options(), function_name, disable_features)
+                for function_name in reversed(list_function_name)}
+            for function_name in list_function_name: # wait in test order, so the output is the same as without jobs
+                future = dict_future[function_name]
+                result, output = future.result()
+                print(output, end='')
+                list_result.append(result)
+        return list_result
+
+
+    def get_argv_options(self) -> list[str]:
+        """ Options passed on to the benchmarks in worker processes (each worker runs its tests serially) """
+        argv_options = []
+        if self.track_memory:
+            argv_options.append('--memory')
+        if not self.use_cache:
+            argv_options.append('--no-cache')
+        argv_options.append(f'--pytest-shards={self.pytest_shards}')
+        return argv_options
+
+
+    def run_test(self, function_name: str, disable_features=False) -> dict[str, Any]:
+        """ Run one test and print its outcome, returning outcome, points, timing, peak memory and engine calls """
+        function = getattr(self, function_name)
+        id_test = function.__doc__.split(":")[0]
+        description = function.__doc__[len(id_test) + 2:]
+        points = int(function.__doc__.split(" ")[-2][1:])
+        game_server = getattr(self, 'game_server', None)
+        if game_server is not None:
+            game_server.reset_counters()
+        is_valid = False
+        if self.track_memory:
+            tracemalloc.start()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            if disable_features:
+                os.environ["DISABLED_FEATURES"] = function_name
+            function()
+        except AssertionError as e:
+            print(f'{self.COLOR_FAIL}{id_test}{self.COLOR_ENDC}: {description}')
+            print(e)
+        except Exception:
+            print(f'{self.COLOR_FAIL}{id_test}{self.COLOR_ENDC}: {description}')
+            print(traceback.format_exc())
+        else:
+            print(f'{self.COLOR_OKAY}{id_test}{self.COLOR_ENDC}: {description}')
+            is_valid = True
+        seconds_wall = time.perf_counter() - start_wall
+        seconds_cpu = time.process_time() - start_cpu
+        bytes_peak = None
+        if self.track_memory:
+            bytes_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        print()
+        return {
+            'id': id_test,
+            'name': function_name,
+            'description': description,
+            'points': points,
+            'valid': is_valid,
+            'seconds_wall': seconds_wall,
+            'seconds_cpu': seconds_cpu, # of this process, without worker processes (e.g. pytest shards)
+            'bytes_peak': bytes_peak,
+            'cnt_get_list_action': game_server.cnt_get_list_action if game_server is not None else None,
+            'cnt_apply_action': game_server.cnt_apply_action if game_server is not None else None,
+        }
+
 
     def get_list_function_name(self) -> list[str]:
         list_function_name = []
@@ -91,12 +194,18 @@ class Benchmark:
 
     def test_pylint(self) -> None:
         """Test 100: Code style with Pylint [5 point]"""
-        og_pipe = sys.stdout # Save original pipeline
-        with open(os.devnull, 'w', encoding="utf-8") as tmp_pipe:
-            sys.stdout = tmp_pipe # Pipe stdout to temporary pipeline
-            module_name, _ = self.script.split('.')
-            pylint_score = round(pylint.lint.Run([f'server.py.{module_name}'], exit=False).linter.stats.global_note, 2)
-        sys.stdout = og_pipe # Set stdout pipe back to original
+        module_name, _ = self.script.split('.')
+        cache_key = get_cache_key(f'pylint {pylint.__version__}', module_name, ['.pylintrc', 'pyproject.toml'])
+        cached = load_cache(cache_key) if self.use_cache else None
+        if cached is not None:
+            pylint_score = cached['score']
+        else:
+            og_pipe = sys.stdout # Save original pipeline
+            with open(os.devnull, 'w', encoding="utf-8") as tmp_pipe:
+                sys.stdout = tmp_pipe # Pipe stdout to temporary pipeline
+                pylint_score = round(pylint.lint.Run([f'server.py.{module_name}'], exit=False).linter.stats.global_note, 2)
+            sys.stdout = og_pipe # Set stdout pipe back to original
+            store_cache(cache_key, {'score': pylint_score})
         if pylint_score != 10:
             raise AssertionError(f'Pylint score {pylint_score:.1f}/10')
 
@@ -104,9 +213,17 @@ class Benchmark:
     def test_mypy(self) -> None:
         """Test 101: Type checking with MyPy [5 point]"""
         module_name, _ = self.script.split('.')
-        result = api.run([f"server/py/{module_name}.py"])
-        if result[2] != 0:
-            raise AssertionError(f'MyPy exit code is {result[2]}')
+        cache_key = get_cache_key(f'mypy {mypy.version.__version__}', module_name, ['mypy.ini', 'pyproject.toml'])
+        cached = load_cache(cache_key) if self.use_cache else None
+        if cached is not None:
+            exit_code = cached['exit_code']
+        else:
+            # mypy's own incremental cache only re-checks changed modules of the import graph
+            result = api.run([f"server/py/{module_name}.py", "--cache-dir", os.path.join(CACHE_DIR, 'mypy')])
+            exit_code = result[2]
+            store_cache(cache_key, {'exit_code': exit_code})
+        if exit_code != 0:
+            raise AssertionError(f'MyPy exit code is {exit_code}')
 
 
     def test_pytest(self) -> None:
@@ -115,22 +232,176 @@ class Benchmark:
         test_file = f"test/test_{module_name}.py"
         if not os.path.isfile(test_file):
             raise AssertionError(f"There is no testfile for module '{module_name}' ('{test_file}')")
-        result = subprocess.run(["coverage", "run", "-m", "pytest", test_file], capture_output=True, check=False)
-        if result.returncode != 0:
-            raise AssertionError(f"Pytest exit code is {result.returncode}")
-        coverage_result = subprocess.run(
-            ["coverage", "report", "--format=total", f"server/py/{module_name}.py"],
-            capture_output=True, text=True, check=True)
-        if int(coverage_result.stdout) <= 80:
-            raise AssertionError(f"Test coverage is too low ({int(coverage_result.stdout)}%)")
+        # pytest and coverage run in this process (or in shard processes), no interpreter start per run
+        exit_code, percent = run_pytest_sharded(module_name, test_file, self.pytest_shards)
+        if exit_code != 0:
+            raise AssertionError(f"Pytest exit code is {exit_code}")
+        if int(percent) <= 80:
+            raise AssertionError(f"Test coverage is too low ({int(percent)}%)")
+
+
+def get_list_source_file(module_name: str) -> list[str]:
+    """ Get the file of the module in server/py and of the server/py modules it imports, directly or indirectly """
+    list_path: list[str] = []
+    list_module = [module_name]
+    while list_module:
+        path = f'server/py/{list_module.pop()}.py'
+        if path in list_path or not os.path.isfile(path):
+            continue
+        list_path.append(path)
+        with open(path, encoding='utf-8') as fin:
+            tree = ast.parse(fin.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                list_module += [alias.name[len('server.py.'):] for alias in node.names
+                                if alias.name.startswith('server.py.')]
+            elif isinstance(node, ast.ImportFrom) and node.module == 'server.py':
+                list_module += [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and node.module.startswith('server.py.'):
+                list_module.append(node.module[len('server.py.'):])
+    return sorted(list_path)
+
+
+def get_cache_key(tool: str, module_name: str, list_config_file: list[str]) -> str:
+    """ Hash of tool version, config files and the content of all source files the result depends on """
+    hash_key = hashlib.sha256(f'{tool} {sys.version}'.encode('utf-8'))
+    for path in list_config_file + get_list_source_file(module_name):
+        hash_key.update(path.encode('utf-8'))
+        if os.path.isfile(path):
+            with open(path, 'rb') as fin:
+                hash_key.update(hashlib.sha256(fin.read()).digest())
+    return hash_key.hexdigest()
+
+
+def load_cache(cache_key: str) -> Optional[dict[str, Any]]:
+    try:
+        with open(os.path.join(CACHE_DIR, f'{cache_key}.json'), encoding='utf-8') as fin:
+            return json.load(fin)
+    except (OSError, ValueError):
+        return None
+
+
+def store_cache(cache_key: str, value: dict[str, Any]) -> None:
+    """ Write the result atomically, tests of parallel workers may store results at the same time """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f'{cache_key}.json')
+    with open(f'{path}.{os.getpid()}', 'w', encoding='utf-8') as fout:
+        json.dump(value, fout)
+    os.replace(f'{path}.{os.getpid()}', path)
+
+
+class NodeIdCollector:
+    """ Pytest plugin collecting the node ids of the tests, used to split them into shards """
+
+    def __init__(self) -> None:
+        self.list_node_id: list[str] = []
+
+    def pytest_collection_modifyitems(self, items: list[Any]) -> None:
+        self.list_node_id = [item.nodeid for item in items]
+
+
+def run_pytest_with_coverage(module_name: str, list_arg: list[str], data_file: str,
+                             list_plugin: Optional[list[Any]] = None) -> int:
+    """ Run pytest in this process and save the coverage of server/py/<module_name>.py to data_file """
+    # the module is imported again while coverage is running, so its module level lines are measured too
+    module_key = f'server.py.{module_name}'
+    module_original = sys.modules.pop(module_key, None)
+    list_module_before = set(sys.modules)
+    cov = coverage.Coverage(data_file=data_file, include=[f'server/py/{module_name}.py'])
+    cov.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            exit_code = pytest.main(list_arg + ['-q', '-p', 'no:cacheprovider'], plugins=list_plugin)
+    finally:
+        cov.stop()
+        cov.save()
+        for name in set(sys.modules) - list_module_before: # test modules and the measured module
+            del sys.modules[name]
+        if module_original is not None:
+            sys.modules[module_key] = module_original
+            setattr(sys.modules['server.py'], module_name, module_original)
+    return int(exit_code)
+
+
+def run_pytest_shard(module_name: str, list_node_id: list[str], data_file: str) -> int:
+    return run_pytest_with_coverage(module_name, list_node_id, data_file)
+
+
+def run_pytest_sharded(module_name: str, test_file: str, cnt_shard: int) -> tuple[int, float]:
+    """ Run the tests of test_file in cnt_shard processes (in this process if 1), get exit code and coverage """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    data_file = os.path.join(CACHE_DIR, '.coverage')  # not in the repo root, where it could be committed
+    if cnt_shard <= 1:
+        exit_code = run_pytest_with_coverage(module_name, [test_file], data_file)
+        list_data_file = []
+    else:
+        collector = NodeIdCollector()
+        list_module_before = set(sys.modules)
+        with contextlib.redirect_stdout(io.StringIO()):
+            exit_code = int(pytest.main([test_file, '--collect-only', '-q', '-p', 'no:cacheprovider'],
+                                        plugins=[collector]))
+        for name in set(sys.modules) - list_module_before:
+            del sys.modules[name]
+        list_shard = [collector.list_node_id[idx::cnt_shard] for idx in range(cnt_shard)]
+        list_shard = [list_node_id for list_node_id in list_shard if list_node_id]
+        list_data_file = [f'{data_file}.shard{idx}' for idx in range(len(list_shard))]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=len(list_shard)) as executor:
+            list_exit_code = list(executor.map(
+                run_pytest_shard, [module_name] * len(list_shard), list_shard, list_data_file))
+        exit_code = max([exit_code] + list_exit_code)
+    cov = coverage.Coverage(data_file=data_file, include=[f'server/py/{module_name}.py'])
+    if list_data_file:
+        cov.combine(list_data_file)
+        cov.save()
+    else:
+        cov.load()
+    percent = cov.report(file=io.StringIO())
+    return exit_code, float(coverage.results.display_covered(percent, 0))
+
+
+def parse_options(argv: list[str], options: dict[str, type]) -> tuple[list[str], dict[str, Any]]:
+    """ Split '--name value', '--name=value' and '--flag' options from the positional arguments """
+    list_arg = []
+    dict_option: dict[str, Any] = {}
+    idx = 0
+    while idx < len(argv):
+        name, has_value, value = argv[idx].partition('=')
+        if name not in options:
+            list_arg.append(argv[idx])
+        elif options[name] is bool:
+            dict_option[name] = True
+        else:
+            if not has_value:
+                idx += 1
+                value = argv[idx]
+            dict_option[name] = options[name](value)
+        idx += 1
+    return list_arg, dict_option
+
+
+def run_test_isolated(benchmark_class: type, argv: list[str], function_name: str,
+                      disable_features: bool) -> tuple[dict[str, Any], str]:
+    """ Run one test in a worker process with its own benchmark and game server, returning the printed output """
+    benchmark = benchmark_class(argv)
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        result = benchmark.run_test(function_name, disable_features)
+    return result, buffer.getvalue()
 
 
 class Game_Server(metaclass=abc.ABCMeta):
 
+    cnt_get_list_action = 0 # engine calls since the last reset_counters
+    cnt_apply_action = 0
+
     @abc.abstractmethod
     def reset(self) -> None:
         pass
 
+    def reset_counters(self) -> None:
+        self.cnt_get_list_action = 0
+        self.cnt_apply_action = 0
+
     @abc.abstractmethod
     def set_state(self, state: Any) -> None:
         pass
@@ -176,10 +447,12 @@ class Python_Game_Server(Game_Server):
         self.game.print_state()
 
     def get_list_action(self) -> list[Any]:
+        self.cnt_get_list_action += 1
         return self.game.get_list_action()
 
     def select_action(self) -> Any:
-        return self.player.select_action(self.game.get_state(), self.game.get_list_action())
+        return self.player.select_action(self.game.get_state(), self.get_list_action())
 
     def apply_action(self, action: Any) -> None:
+        self.cnt_apply_action += 1
         self.game.apply_action(action)
@@ -0,0 +1,288 @@
+# runcmd: cd .. & venv\Scripts\python benchmark/benchmark_perf.py
+
+import sys
+import json
+import time
+import random
+import string
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmark import Benchmark, parse_options
+from server.py import battleship, dog, hangman, uno
+from server.py.dog import Card, Action
+from server.py.game import Game
+
+BASELINE_FILE = 'benchmark/perf_baseline.json'
+CNT_REPEAT = 3 # each workload runs this often, the fastest run counts
+MAX_SLOWDOWN = 1.5 # fail if a workload is this many times slower than the baseline
+
+LIST_WORD = ['devops', 'benchmark', 'python', 'marble', 'kennel', 'joker', 'pydantic', 'websocket', 'container',
+             'pipeline', 'coverage', 'hangman', 'battleship', 'profiler', 'snapshot', 'quiz']
+
+# a workload returns (number of operations, number of games), see the docstring for what an operation is
+Workload = Callable[[], Tuple[int, int]]
+
+
+def calibrate() -> Tuple[int, int]:
+    """ Pure Python reference loop, scales the baseline to the speed of the current machine (ops: iterations) """
+    cnt_op = 200_000
+    values: Dict[int, int] = {}
+    for idx in range(cnt_op):
+        values[idx % 1000] = values.get((idx * 7) % 1000, 0) + idx
+    sorted(values.values())
+    return cnt_op, 0
+
+
+def play_random_games(create_game: Callable[[int], Any], player: Any, phase_finished: Any, cnt_game: int,
+                      cnt_action_max: int, seed: int) -> Tuple[int, int]:
+    """ Play full games, errors of the engine are raised so that crashed games are never measured """
+    cnt_action = 0
+    for idx_game in range(cnt_game):
+        random.seed(seed + idx_game) # random players use the module random
+        game = create_game(seed + idx_game)
+        for _ in range(cnt_action_max):
+            if game.get_state().phase == phase_finished:
+                break
+            action = player.select_action(game.get_state(), game.get_list_action())
+            game.apply_action(action)
+            cnt_action += 1
+        if game.get_state().phase != phase_finished:
+            raise RuntimeError(f'Game with seed {seed + idx_game} did not finish within {cnt_action_max} actions')
+    return cnt_action, cnt_game
+
+
+def hangman_random_games() -> Tuple[int, int]:
+    """ Full Hangman games of random players (ops: applied actions) """
+    def create_game(seed: int) -> hangman.Hangman:
+        game = hangman.Hangman()
+        game.set_state(hangman.HangmanGameState(word_to_guess=LIST_WORD[seed % len(LIST_WORD)], guesses=[],
+                                                incorrect_guesses=[], phase=hangman.GamePhase.RUNNING))
+        return game
+    return play_random_games(create_game, hangman.RandomPlayer(), hangman.GamePhase.FINISHED,
+                             cnt_game=500, cnt_action_max=len(string.ascii_uppercase), seed=2000)
+
+
+def create_dog_position(list_card: List[Card], list_pos: List[int]) -> dog.Dog:
+    """ Dog game after the card exchange, player 1 (active) holds the cards and has marbles at the positions """
+    game = dog.Dog(seed=0)
+    state = game.get_state()
+    state.bool_card_exchanged = True
+    player = state.list_player[0]
+    player.list_card = list_card
+    for marble, pos in zip(player.list_marble, list_pos):
+        marble.pos = pos
+        marble.is_save = pos == 0
+    for other, pos in zip(state.list_player[1:], [20, 36, 52]):
+        other.list_marble[0].pos = pos
+        other.list_marble[0].is_save = True
+    game.set_state(state)
+    return game
+
+
+def list_action_calls(game: Game, cnt_call: int) -> Tuple[int, int]:
+    for _ in range(cnt_call):
+        game.get_list_action()
+    return cnt_call, 0
+
+
+def dog_random_games() -> Tuple[int, int]:
+    """
+    Dog games of random players, capped at 500 actions (ops: applied actions, games: finished or capped games).
+    Random games do not get past the first round yet and some end with an error of the engine, these count their
+    actions but not as a game. The seeds are fixed, so every run plays the same actions.
+    """
+    cnt_action, cnt_game = 0, 0
+    player = dog.RandomPlayer()
+    for seed in range(5000, 5020):
+        random.seed(seed) # random players use the module random
+        game = dog.Dog(seed=seed)
+        try:
+            for _ in range(500):
+                if game.get_state().phase == dog.GamePhase.FINISHED:
+                    break
+                game.apply_action(player.select_action(game.get_state(), game.get_list_action()))
+                cnt_action += 1
+        except ValueError:
+            continue
+        cnt_game += 1
+    return cnt_action, cnt_game
+
+
+def dog_full_hand() -> Tuple[int, int]:
+    """ get_list_action with six move cards and four marbles out of the kennel (ops: calls) """
+    list_card = [Card(suit='♠', rank=rank) for rank in ['A', '4', '7', '8', 'Q', 'K']]
+    return list_action_calls(create_dog_position(list_card, [0, 9, 27, 45]), 100)
+
+
+def dog_double_joker() -> Tuple[int, int]:
+    """ get_list_action with two Jokers in hand, every swap card is an option (ops: calls) """
+    list_card = [Card(suit='', rank='JKR'), Card(suit='', rank='JKR'), Card(suit='♥', rank='7'),
+                 Card(suit='♣', rank='2'), Card(suit='♦', rank='10'), Card(suit='♠', rank='K')]
+    return list_action_calls(create_dog_position(list_card, [0, 9, 66, 67]), 20)
+
+
+def dog_seven_split() -> Tuple[int, int]:
+    """ get_list_action in the middle of a split 7 (3 of 7 steps played) (ops: calls) """
+    game = create_dog_position([Card(suit='♥', rank='7'), Card(suit='♣', rank='5')], [0, 9, 27, 45])
+    game.apply_action(Action(card=Card(suit='♥', rank='7'), pos_from=9, pos_to=12))
+    return list_action_calls(game, 300)
+
+
+def uno_random_games() -> Tuple[int, int]:
+    """ Full 10-player Uno games of random players (ops: applied actions) """
+    def create_game(seed: int) -> uno.Uno:
+        game = uno.Uno(seed=seed)
+        game.set_state(uno.GameState(cnt_player=10))
+        return game
+    return play_random_games(create_game, uno.RandomPlayer(), uno.GamePhase.FINISHED,
+                             cnt_game=10, cnt_action_max=5000, seed=3000)
+
+
+def uno_large_hand() -> Tuple[int, int]:
+    """ get_list_action of a 10-player Uno game with 36 cards in the active hand (ops: calls) """
+    game = uno.Uno(seed=0)
+    game.set_state(uno.GameState(cnt_player=10, idx_player_active=0))
+    state = game.get_state()
+    assert state.list_card_draw is not None
+    state.list_player[0].list_card = state.list_card_draw[:36]
+    state.list_card_draw = state.list_card_draw[36:]
+    game.set_state(state)
+    return list_action_calls(game, 500)
+
+
+def battleship_random_games() -> Tuple[int, int]:
+    """ Full Battleship games of random players, ships are placed randomly (ops: applied actions) """
+    return play_random_games(lambda seed: battleship.Battleship(), battleship.RandomPlayer(),
+                             battleship.GamePhase.FINISHED, cnt_game=20, cnt_action_max=300, seed=4000)
+
+
+def battleship_setup() -> Tuple[int, int]:
+    """ get_list_action of the setup with the carrier placed, every placement of four ships (ops: calls) """
+    game = battleship.Battleship()
+    for _ in range(2): # both players place the carrier, then it is the turn of player 1 again
+        game.apply_action(battleship.BattleshipAction(action_type=battleship.ActionType.SET_SHIP,
+                                                      ship_name='carrier', location=['C3', 'C4', 'C5', 'C6', 'C7']))
+    return list_action_calls(game, 100)
+
+
+WORKLOADS: Dict[str, Workload] = {
+    'dog_random_games': dog_random_games,
+    'dog_full_hand': dog_full_hand,
+    'dog_double_joker': dog_double_joker,
+    'dog_seven_split': dog_seven_split,
+    'hangman_random_games': hangman_random_games,
+    'uno_random_games': uno_random_games,
+    'uno_large_hand': uno_large_hand,
+    'battleship_random_games': battleship_random_games,
+    'battleship_setup': battleship_setup,
+}
+
+
+def measure(workload: Workload, cnt_repeat: int = CNT_REPEAT) -> Dict[str, Any]:
+    """ Run the workload cnt_repeat times and get the throughput of the fastest run """
+    seconds_best = float('inf')
+    cnt_op, cnt_game = 0, 0
+    for _ in range(cnt_repeat):
+        start = time.perf_counter()
+        cnt_op, cnt_game = workload()
+        seconds_best = min(seconds_best, time.perf_counter() - start)
+    return {
+        'seconds': seconds_best,
+        'cnt_op': cnt_op,
+        'cnt_game': cnt_game,
+        'ops_per_second': cnt_op / seconds_best,
+        'games_per_second': cnt_game / seconds_best if cnt_game else None,
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], max_slowdown: float) -> List[str]:
+    """ Get the names of the workloads slower than the baseline by more than max_slowdown """
+    # scale the baseline by the speed of this machine relative to the machine that stored it
+    speed = result['calibration']['ops_per_second'] / baseline['calibration']['ops_per_second']
+    list_slow = []
+    for name, workload_result in result['workloads'].items():
+        workload_baseline = baseline['workloads'].get(name)
+        if workload_baseline is None:
+            workload_result['slowdown'] = None
+            continue
+        expected = workload_baseline['ops_per_second'] * speed
+        workload_result['slowdown'] = expected / workload_result['ops_per_second']
+        if workload_result['slowdown'] > max_slowdown:
+            list_slow.append(name)
+    return list_slow
+
+
+def run(list_name: List[str], cnt_repeat: int) -> Dict[str, Any]:
+    result: Dict[str, Any] = {'calibration': measure(calibrate, cnt_repeat), 'workloads': {}}
+    for name in list_name:
+        result['workloads'][name] = measure(WORKLOADS[name], cnt_repeat)
+    return result
+
+
+def print_result(result: Dict[str, Any], max_slowdown: float) -> None:
+    for name, workload_result in result['workloads'].items():
+        slowdown = workload_result.get('slowdown')
+        games = workload_result['games_per_second']
+        line = f'{name:<24} {workload_result["ops_per_second"]:>12.0f} ops/s'
+        line += f' {games:>10.1f} games/s' if games is not None else ' ' * 18
+        if slowdown is not None:
+            color = Benchmark.COLOR_FAIL if slowdown > max_slowdown else Benchmark.COLOR_OKAY
+            line += f'   {color}{slowdown:.2f}x{Benchmark.COLOR_ENDC} of baseline time'
+        print(line)
+    print()
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding='utf-8') as fin:
+            return json.load(fin)
+    except FileNotFoundError:
+        return None
+
+
+if __name__ == '__main__':
+
+    list_arg, options = parse_options(sys.argv, {
+        '--baseline': str, '--update-baseline': bool, '--max-slowdown': float, '--repeat': int, '--report': str})
+    baseline_file = options.get('--baseline', BASELINE_FILE)
+    max_slowdown = options.get('--max-slowdown', MAX_SLOWDOWN)
+    list_workload = [name for name in WORKLOADS if not list_arg[1:] or any(name.startswith(prefix)
+                                                                          for prefix in list_arg[1:])]
+    if not list_workload:
+        print(f"Error: No workload matches {list_arg[1:]}, workloads are: {', '.join(WORKLOADS)}")
+        sys.exit(2)
+
+    print('--- Performance ---')
+    print(f'Workloads: {", ".join(list_workload)}')
+    print()
+
+    perf_result = run(list_workload, options.get('--repeat', CNT_REPEAT))
+
+    if options.get('--update-baseline'):
+        baseline = load_baseline(baseline_file) or {'workloads': {}}
+        baseline['calibration'] = perf_result['calibration']
+        baseline['workloads'].update(perf_result['workloads'])
+        with open(baseline_file, 'w', encoding='utf-8') as fout:
+            json.dump(baseline, fout, indent=2)
+            fout.write('\n')
+        print_result(perf_result, max_slowdown)
+        print(f'Baseline written to {baseline_file}')
+        sys.exit(0)
+
+    baseline = load_baseline(baseline_file)
+    list_slow = compare(perf_result, baseline, max_slowdown) if baseline is not None else []
+    print_result(perf_result, max_slowdown)
+
+    if options.get('--report') is not None:
+        with open(options['--report'], 'w', encoding='utf-8') as fout:
+            json.dump(perf_result, fout, indent=2)
+
+    print(f'{Benchmark.COLOR_RESULT}Result{Benchmark.COLOR_ENDC}')
+    if baseline is None:
+        print(f'No baseline found ({baseline_file}), run with --update-baseline to store one')
+    elif list_slow:
+        print(f'{Benchmark.COLOR_FAIL}Slower than {max_slowdown}x the baseline: {", ".join(list_slow)}'
+              f'{Benchmark.COLOR_ENDC}')
+        sys.exit(1)
+    else:
+        print(f'All workloads within {max_slowdown}x of the baseline')
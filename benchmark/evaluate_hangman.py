@@ -0,0 +1,128 @@
+# runcmd: cd .. & venv\Scripts\python benchmark/evaluate_hangman.py hangman_solver.SolverPlayer --jobs 4
+
+import sys
+import json
+import time
+import random
+import importlib
+import multiprocessing
+import concurrent.futures
+from typing import Any, Dict, List, Optional
+
+from benchmark import Benchmark, parse_options
+from server.py import hangman
+from server.py.game import Player
+
+WORDS_FILE = 'server/py/hangman_words.json'
+CNT_WORD_BATCH = 200 # words per task of a worker process
+
+# set once per worker process (inherited with fork, else by init_worker) instead of being sent with every task
+_list_word: List[str] = []
+_player: Optional[Player] = None
+
+
+def create_player(player_name: str) -> Player:
+    """ Player from 'module.Class' of server.py, e.g. 'hangman.RandomPlayer' """
+    module_name, class_name = player_name.rsplit('.', 1)
+    player = getattr(importlib.import_module(f'server.py.{module_name}'), class_name)()
+    assert isinstance(player, Player)
+    return player
+
+
+def init_worker(list_word: Optional[List[str]], player_name: str, seed: int) -> None:
+    global _list_word, _player  # pylint: disable=global-statement
+    if list_word is not None:
+        _list_word = list_word
+    _player = create_player(player_name)
+    random.seed(seed) # random players use the module random
+
+
+def play_word(player: Player, word: str) -> Dict[str, Any]:
+    game = hangman.Hangman()
+    game.set_state(hangman.HangmanGameState(
+        word_to_guess=word, phase=hangman.GamePhase.RUNNING, guesses=[], incorrect_guesses=[]))
+    state = game.get_state()
+    while state.phase != hangman.GamePhase.FINISHED:
+        action = player.select_action(game.get_player_view(0), game.get_list_action())
+        if action is None:
+            break
+        game.apply_action(action)
+    # a game the player gives up (no action selected) is lost, also when few guesses were wrong
+    is_revealed = not hangman.get_letter_mask(word) & ~hangman.get_letter_mask(''.join(state.guesses))
+    is_won = state.phase == hangman.GamePhase.FINISHED and is_revealed
+    return {'is_won': is_won, 'cnt_guess': len(state.guesses), 'cnt_incorrect': len(state.incorrect_guesses)}
+
+
+def evaluate_batch(idx_start: int, idx_end: int) -> Dict[str, Any]:
+    """ Play the words with the indexes [idx_start, idx_end) of the word list of the worker """
+    assert _player is not None
+    result: Dict[str, Any] = {'cnt_game': 0, 'cnt_won': 0, 'cnt_guess': 0, 'cnt_incorrect': 0, 'list_lost': []}
+    for word in _list_word[idx_start:idx_end]:
+        game_result = play_word(_player, word)
+        result['cnt_game'] += 1
+        result['cnt_won'] += game_result['is_won']
+        result['cnt_guess'] += game_result['cnt_guess']
+        result['cnt_incorrect'] += game_result['cnt_incorrect']
+        if not game_result['is_won']:
+            result['list_lost'].append(word)
+    return result
+
+
+def evaluate(list_word: List[str], player_name: str, jobs: int, seed: int) -> Dict[str, Any]:
+    global _list_word  # pylint: disable=global-statement
+    _list_word = list_word
+    # with fork the workers share the word list of this process, other start methods get it once per worker
+    is_fork = 'fork' in multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if is_fork else None)
+    result: Dict[str, Any] = {'cnt_game': 0, 'cnt_won': 0, 'cnt_guess': 0, 'cnt_incorrect': 0, 'list_lost': []}
+    start = time.perf_counter()
+    initargs = (None if is_fork else list_word, player_name, seed)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=init_worker,
+                                                initargs=initargs) as executor:
+        list_idx = range(0, len(list_word), CNT_WORD_BATCH)
+        list_idx_end = [min(idx + CNT_WORD_BATCH, len(list_word)) for idx in list_idx]
+        for batch in executor.map(evaluate_batch, list_idx, list_idx_end):
+            for key in ['cnt_game', 'cnt_won', 'cnt_guess', 'cnt_incorrect', 'list_lost']:
+                result[key] += batch[key]
+    result['seconds'] = time.perf_counter() - start
+    result['win_rate'] = result['cnt_won'] / max(result['cnt_game'], 1)
+    result['mean_incorrect'] = result['cnt_incorrect'] / max(result['cnt_game'], 1)
+    result['guesses_per_second'] = result['cnt_guess'] / result['seconds']
+    return result
+
+
+if __name__ == '__main__':
+
+    list_arg, options = parse_options(sys.argv, {
+        '--words': str, '--sample': int, '--seed': int, '--jobs': int, '--report': str})
+    if len(list_arg) < 2:
+        print('Usage: evaluate_hangman.py <module.Player> [--words file] [--sample N] [--seed N] [--jobs N] '
+              '[--report path]')
+        sys.exit(2)
+    eval_player = list_arg[1]
+    eval_seed = options.get('--seed', 0)
+    with open(options.get('--words', WORDS_FILE), encoding='utf-8') as fin:
+        eval_list_word = json.load(fin)
+    if options.get('--sample') is not None and options['--sample'] < len(eval_list_word):
+        eval_list_word = random.Random(eval_seed).sample(eval_list_word, options['--sample'])
+
+    print('--- Hangman Evaluation ---')
+    print(f'Player: {eval_player}')
+    print(f'Words:  {len(eval_list_word)}')
+    print(f'Jobs:   {options.get("--jobs", 1)}')
+    print()
+
+    eval_result = evaluate(eval_list_word, eval_player, options.get('--jobs', 1), eval_seed)
+
+    if options.get('--report') is not None:
+        with open(options['--report'], 'w', encoding='utf-8') as fout:
+            json.dump(eval_result, fout, indent=2)
+
+    print(f'{Benchmark.COLOR_RESULT}Result{Benchmark.COLOR_ENDC}')
+    print(f'Win rate:        {eval_result["win_rate"]:.1%} ({eval_result["cnt_won"]}/{eval_result["cnt_game"]})')
+    print(f'Mean incorrect:  {eval_result["mean_incorrect"]:.2f}')
+    print(f'Speed:           {eval_result["guesses_per_second"]:.0f} guesses/s')
+    if eval_result['list_lost']:
+        print(f'Lost:            {", ".join(eval_result["list_lost"][:20])}'
+              f'{" ..." if len(eval_result["list_lost"]) > 20 else ""}')
+    print()
@@ -0,0 +1,227 @@
+# runcmd: cd .. & venv\Scripts\python benchmark/fuzz_dog.py --games 1000 --jobs 4
+
+import sys
+import time
+import random
+import concurrent.futures
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from benchmark import Benchmark, parse_options
+from server.py import dog
+from server.py.dog import GameState, GamePhase, KennelNumbers, FinishNumbers
+
+CNT_MARBLE = 16
+CNT_ACTION_MAX = 2000 # actions per game before the game is stopped
+CNT_GAME_BATCH = 25 # games per task of a worker process
+CNT_SHRINK_PLAY_MAX = 2000 # games replayed while shrinking one failure
+
+COUNTER_DECK = Counter((card.suit, card.rank) for card in GameState.LIST_CARD)
+
+
+class Failure(BaseModel):
+    seed: int  # seed of the game (deck order and random choices)
+    invariant: str  # name of the violated invariant or 'exception'
+    message: str  # what was wrong
+    list_choice: List[int]  # index into the list of legal actions for every move up to the failure
+
+
+# ----- invariants, each returns an error message or None -----
+
+def check_marble_count(state: GameState) -> Optional[str]:
+    list_marble = [marble for player in state.list_player for marble in player.list_marble]
+    cnt_distinct = len({id(marble) for marble in list_marble})
+    if len(list_marble) != CNT_MARBLE or cnt_distinct != CNT_MARBLE:
+        return f'{len(list_marble)} marbles ({cnt_distinct} distinct) instead of {CNT_MARBLE}'
+    return None
+
+
+def check_track_collision(state: GameState) -> Optional[str]:
+    list_pos = [marble.pos for player in state.list_player for marble in player.list_marble if marble.pos < 64]
+    list_pos_double = sorted(pos for pos, cnt in Counter(list_pos).items() if cnt > 1)
+    if list_pos_double:
+        return f'more than one marble on track position(s) {list_pos_double}'
+    return None
+
+
+def check_card_conservation(state: GameState) -> Optional[str]:
+    list_card = [card for player in state.list_player for card in player.list_card]
+    list_card += state.list_card_draw + state.list_card_discard
+    counter = Counter((card.suit, card.rank) for card in list_card)
+    if counter != COUNTER_DECK:
+        cnt_missing = sum((COUNTER_DECK - counter).values())
+        cnt_extra = sum((counter - COUNTER_DECK).values())
+        return f'hands, draw and discard pile have {cnt_missing} card(s) missing and {cnt_extra} extra'
+    return None
+
+
+def check_finish_lane(state: GameState) -> Optional[str]:
+    for player in state.list_player:
+        kennel = KennelNumbers[player.colour].value
+        finish = FinishNumbers[player.colour].value
+        for marble in player.list_marble:
+            if not (0 <= marble.pos < 64 or marble.pos in kennel or marble.pos in finish):
+                return f'{player.colour} marble at {marble.pos}, outside track, own kennel and own finish lane'
+    return None
+
+
+INVARIANTS: Dict[str, Callable[[GameState], Optional[str]]] = {
+    'marble_count': check_marble_count,
+    'track_collision': check_track_collision,
+    'card_conservation': check_card_conservation,
+    'finish_lane': check_finish_lane,
+}
+
+
+def play_game(seed: int, list_choice: Optional[List[int]] = None,
+              cnt_action_max: int = CNT_ACTION_MAX) -> Tuple[int, Optional[Failure]]:
+    """
+    Play random legal actions (or the given choices) and check the invariants after every action.
+    Get the number of applied actions and the first failure.
+    """
+    rng = random.Random(seed)
+    game = dog.Dog(seed=seed)
+    list_choice_played: List[int] = []
+
+    def fail(invariant: str, message: str) -> Tuple[int, Optional[Failure]]:
+        return len(list_choice_played), Failure(seed=seed, invariant=invariant, message=message,
+                                                list_choice=list(list_choice_played))
+
+    for idx_action in range(cnt_action_max):
+        if game.state.phase == GamePhase.FINISHED:
+            break
+        if list_choice is not None and idx_action >= len(list_choice):
+            break
+        try:
+            list_action = game.get_list_action()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return fail('exception', f'get_list_action raised {e!r}')
+        if list_choice is not None:
+            choice = list_choice[idx_action]
+        else:
+            choice = rng.randrange(len(list_action)) if list_action else 0
+        list_choice_played.append(choice)
+        action = list_action[choice % len(list_action)] if list_action else None
+        try:
+            game.apply_action(action)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return fail('exception', f'apply_action({action}) raised {e!r}')
+        for invariant, check in INVARIANTS.items():
+            message = check(game.state)
+            if message is not None:
+                return fail(invariant, message)
+    return len(list_choice_played), None
+
+
+def fuzz_batch(seed_start: int, cnt_game: int) -> Dict[str, Any]:
+    """ Play cnt_game games with consecutive seeds, keeping the first failure of each invariant """
+    result: Dict[str, Any] = {'cnt_action': 0, 'cnt_game': cnt_game, 'cnt_failure': Counter(), 'failures': {}}
+    for seed in range(seed_start, seed_start + cnt_game):
+        cnt_action, failure = play_game(seed)
+        result['cnt_action'] += cnt_action
+        if failure is not None:
+            result['cnt_failure'][failure.invariant] += 1
+            result['failures'].setdefault(failure.invariant, failure)
+    return result
+
+
+def shrink(failure: Failure, cnt_play_max: int = CNT_SHRINK_PLAY_MAX) -> Failure:
+    """ Remove and lower choices as long as the game still fails with the same invariant """
+    best = failure
+    cnt_play = 0
+
+    def try_choices(list_choice: List[int]) -> bool:
+        nonlocal best, cnt_play
+        cnt_play += 1
+        _, candidate = play_game(failure.seed, list_choice)
+        if candidate is None or candidate.invariant != failure.invariant:
+            return False
+        if (len(candidate.list_choice), candidate.list_choice) >= (len(best.list_choice), best.list_choice):
+            return False
+        best = candidate
+        return True
+
+    is_improved = True
+    while is_improved and cnt_play < cnt_play_max:
+        is_improved = False
+        size = len(best.list_choice) // 2
+        while size >= 1 and cnt_play < cnt_play_max: # delete chunks of choices
+            idx = 0
+            while idx < len(best.list_choice) and cnt_play < cnt_play_max:
+                if try_choices(best.list_choice[:idx] + best.list_choice[idx + size:]):
+                    is_improved = True
+                else:
+                    idx += size
+            size //= 2
+        for idx in range(len(best.list_choice)): # lower single choices
+            for choice in sorted({0, best.list_choice[idx] // 2}):
+                if idx < len(best.list_choice) and choice < best.list_choice[idx] and cnt_play < cnt_play_max:
+                    if try_choices(best.list_choice[:idx] + [choice] + best.list_choice[idx + 1:]):
+                        is_improved = True
+    return best
+
+
+def get_list_action_played(failure: Failure) -> List[Optional[dog.Action]]:
+    """ Replay the choices of a failure and get the actions """
+    game = dog.Dog(seed=failure.seed)
+    list_action_played = []
+    for choice in failure.list_choice:
+        list_action = game.get_list_action()
+        action = list_action[choice % len(list_action)] if list_action else None
+        list_action_played.append(action)
+        try:
+            game.apply_action(action)
+        except Exception:  # pylint: disable=broad-exception-caught
+            break
+    return list_action_played
+
+
+def fuzz(cnt_game: int, seed_start: int, jobs: int) -> Tuple[Dict[str, Any], float]:
+    result: Dict[str, Any] = {'cnt_action': 0, 'cnt_game': 0, 'cnt_failure': Counter(), 'failures': {}}
+    start = time.perf_counter()
+    list_batch = [(seed, min(CNT_GAME_BATCH, seed_start + cnt_game - seed))
+                  for seed in range(seed_start, seed_start + cnt_game, CNT_GAME_BATCH)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        for batch in executor.map(fuzz_batch, *zip(*list_batch)): # in seed order, so the output is deterministic
+            result['cnt_action'] += batch['cnt_action']
+            result['cnt_game'] += batch['cnt_game']
+            result['cnt_failure'].update(batch['cnt_failure'])
+            for invariant, failure in batch['failures'].items():
+                result['failures'].setdefault(invariant, failure)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+
+    list_arg, options = parse_options(sys.argv, {'--games': int, '--seed': int, '--jobs': int, '--no-shrink': bool})
+    fuzz_cnt_game = options.get('--games', 1000)
+    fuzz_jobs = options.get('--jobs', 1)
+
+    print('--- Dog Fuzzer ---')
+    print(f'Games:  {fuzz_cnt_game} (seeds from {options.get("--seed", 0)})')
+    print(f'Jobs:   {fuzz_jobs}')
+    print()
+
+    fuzz_result, seconds = fuzz(fuzz_cnt_game, options.get('--seed', 0), fuzz_jobs)
+
+    for name in list(INVARIANTS) + ['exception']:
+        cnt_failure = fuzz_result['cnt_failure'][name]
+        color = Benchmark.COLOR_FAIL if cnt_failure else Benchmark.COLOR_OKAY
+        print(f'{color}{name:<18}{Benchmark.COLOR_ENDC} {cnt_failure} failing game(s)')
+        first_failure = fuzz_result['failures'].get(name)
+        if first_failure is None:
+            continue
+        if not options.get('--no-shrink'):
+            first_failure = shrink(first_failure)
+        print(f'  seed {first_failure.seed}, {len(first_failure.list_choice)} action(s): {first_failure.message}')
+        for idx_action, played in enumerate(get_list_action_played(first_failure)):
+            print(f'  {idx_action:>4}: {played}')
+    print()
+
+    print(f'{Benchmark.COLOR_RESULT}Result{Benchmark.COLOR_ENDC}')
+    print(f'Actions: {fuzz_result["cnt_action"]} in {fuzz_result["cnt_game"]} games')
+    print(f'Speed:   {fuzz_result["cnt_action"] / seconds:.0f} actions/s, {fuzz_result["cnt_game"] / seconds:.1f} games/s')
+    print()
+    sys.exit(1 if fuzz_result['failures'] else 0)
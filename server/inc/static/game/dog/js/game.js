@@ -97,6 +97,9 @@ function Game(config) {
 	this.CNT_BALLS = 4
 	this.CNT_POS = 96
 	this.CNT_STEPS = 64
+	this.CNT_LANE = 4
+	this.URL_BOARD = '/dog/board.json';
+	this.board = null; // board geometry of the server (server/py/dog_board.py)
 	this.list_xy_pos = null;
 	this.dict_player_card_rect = null;
 	this.dict_exchange_card_rect = null;
@@ -129,10 +132,31 @@ Game.prototype.init = function () {
 	this.canvas.width = this.canvas_width;
 	this.canvas.height = this.canvas_height;
 	this.calc_xy_pos();
+	this.load_board();
 	this.load_images();
 	this.bind_events();
 }
 
+Game.prototype.load_board = function () {
+	// use the board geometry of the server, keep the defaults if it can not be loaded
+	var self = this;
+	fetch(this.URL_BOARD).then(function (response) {
+		return response.ok ? response.json() : null;
+	}).then(function (board) {
+		if(board == null) {
+			return;
+		}
+		self.board = board;
+		self.CNT_POS = board.cnt_pos;
+		self.CNT_STEPS = board.cnt_track;
+		self.CNT_LANE = board.cnt_lane;
+		if(self.player_state != null) {
+			self.calc_board_rotation();
+			self.render();
+		}
+	}).catch(function () {});
+}
+
 Game.prototype.calc_xy_pos = function () {
 	this.board_width = 860;
 	this.r_active = 0.024*this.board_width;
@@ -295,12 +319,21 @@ Game.prototype.set_player_state = function(player_state) {
 Game.prototype.calc_board_rotation = function() {
 	// rotate xy of pos, pos numbering remains the same
 	this.list_xy_pos_rotated = [];
+	var idx_you = this.player_state.idx_player_you;
+	var offset_track = idx_you*this.CNT_STEPS/this.CNT_PLAYERS;
+	var offset_lane = idx_you*2*this.CNT_LANE;
+	if(this.board != null) {
+		var colour_you = this.board.list_colour[idx_you];
+		offset_track = this.board.start_pos[colour_you];
+		offset_lane = this.board.kennel_pos[colour_you][0] - this.CNT_STEPS;
+	}
+	var cnt_lane_all = this.CNT_POS - this.CNT_STEPS;
 	for(var idx=0; idx<this.CNT_STEPS; idx++) {
-		var idx_to = (idx + this.CNT_STEPS - this.player_state.idx_player_you*16) % this.CNT_STEPS;
+		var idx_to = (idx + this.CNT_STEPS - offset_track) % this.CNT_STEPS;
 		this.list_xy_pos_rotated[idx_to] = this.list_xy_pos[idx];
 	}
 	for(var idx=this.CNT_STEPS; idx<this.CNT_POS; idx++) {
-		var idx_to = this.CNT_STEPS + (idx + 32 - this.player_state.idx_player_you*8) % 32;
+		var idx_to = this.CNT_STEPS + (idx + cnt_lane_all - offset_lane) % cnt_lane_all;
 		this.list_xy_pos_rotated[idx_to] = this.list_xy_pos[idx];
 	}
 
@@ -9,7 +9,12 @@ Singleplayer.prototype.main = function(){
     this.init_websocket();
 };
 Singleplayer.prototype.init_websocket = function(){
-    this.ws = new WebSocket(this.config.ws_endpoint);
+    var ws_endpoint = this.config.ws_endpoint;
+    var session_id = window.sessionStorage.getItem(this.config.ws_endpoint);
+    if(session_id!=null) {
+        ws_endpoint += '?session_id='+encodeURIComponent(session_id);
+    }
+    this.ws = new WebSocket(ws_endpoint);
     this.ws.onopen = this.ws_onopen.bind(this);
     this.ws.onmessage = this.ws_onmessage.bind(this);
 }
@@ -24,6 +29,10 @@ Singleplayer.prototype.ws_onmessage = function(event) {
     var data = JSON.parse(event.data);
     this.add_log('> '+data.type);
     switch(data['type']) {
+        case 'session':
+            // remember the session to resume the game after a reconnect
+            window.sessionStorage.setItem(this.config.ws_endpoint, data['session_id']);
+            break;
         case 'update':
     		this.game.set_player_state(data['state']);
     		//console.log(data['state']);
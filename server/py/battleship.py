@@ -1,42 +1,51 @@
-from typing import List, Optional
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from enum import Enum
+import functools
+import operator
 import random
+
+from pydantic import BaseModel, ConfigDict
+
 from server.py.game import Game, Player
 
+# the board is a 100-bit mask, location 'A1' is bit 0, 'A10' bit 9, 'B1' bit 10 ... 'J10' bit 99
+CNT_SIDE = 10
+LIST_LOCATION: Tuple[str, ...] = tuple(
+    f'{letter}{number}' for letter in 'ABCDEFGHIJ'[:CNT_SIDE] for number in range(1, CNT_SIDE + 1))
+LOCATION_BIT: Dict[str, int] = {location: 1 << idx for idx, location in enumerate(LIST_LOCATION)}
+MASK_BOARD = (1 << len(LIST_LOCATION)) - 1
+LIST_SHIP: Tuple[Tuple[str, int], ...] = (  # name and length of the ships every player places
+    ('carrier', 5), ('battleship', 4), ('cruiser', 3), ('submarine', 3), ('destroyer', 2))
+
 
 class ActionType(str, Enum):
     SET_SHIP = "set_ship"
     SHOOT = "shoot"
 
 
-class BattleshipAction:
-    def __init__(
-        self, action_type: ActionType, ship_name: Optional[str], location: List[str]
-    ) -> None:
-        self.action_type = action_type
-        self.ship_name = ship_name  # only for set_ship actions
-        self.location = location
+class BattleshipAction(BaseModel):
+    model_config = ConfigDict(frozen=True)  # the actions are shared, see SHOOT_ACTIONS and SET_SHIP_ACTIONS
+
+    action_type: ActionType
+    ship_name: Optional[str]  # only for set_ship actions
+    location: List[str]
+
 
+SHOOT_ACTIONS: Tuple[BattleshipAction, ...] = tuple(
+    BattleshipAction(action_type=ActionType.SHOOT, ship_name=None, location=[location]) for location in LIST_LOCATION)
 
-class Ship:
-    def __init__(self, name: str, length: int, location: Optional[List[str]]) -> None:
-        self.name = name
-        self.length = length
-        self.location = location
 
+class Ship(BaseModel):
+    name: str
+    length: int
+    location: Optional[List[str]]
 
-class PlayerState:
-    def __init__(
-        self,
-        name: str,
-        ships: List[Ship],
-        shots: List[str],
-        successful_shots: List[str],
-    ) -> None:
-        self.name = name
-        self.ships = ships
-        self.shots = shots
-        self.successful_shots = successful_shots
+
+class PlayerState(BaseModel):
+    name: str
+    ships: List[Ship]
+    shots: List[str]
+    successful_shots: List[str]
 
 
 class GamePhase(str, Enum):
@@ -45,59 +54,198 @@ class GamePhase(str, Enum):
     FINISHED = "finished"  # when the game is finished
 
 
-class BattleshipGameState:
-    def __init__(
-        self,
-        idx_player_active: int,
-        phase: GamePhase,
-        winner: Optional[int],
-        players: List[PlayerState],
-    ) -> None:
-        self.idx_player_active = idx_player_active
-        self.phase = phase
-        self.winner = winner
-        self.players = players
+class BattleshipGameState(BaseModel):
+    idx_player_active: int
+    phase: GamePhase
+    winner: Optional[int]
+    players: List[PlayerState]
+
+
+def get_location_mask(list_location: List[str]) -> int:
+    """ Mask of the locations (e.g. ['A1', 'b2']), each one is looked up in LOCATION_BIT """
+    mask = 0
+    for location in list_location:
+        bit = LOCATION_BIT.get(location) or LOCATION_BIT.get(location.upper())
+        if bit is None:
+            raise ValueError(f"'{location}' is not a location on the board")
+        mask |= bit
+    return mask
+
+
+def get_list_location(mask: int) -> List[str]:
+    """ Locations of the set bits of the mask, from 'A1' to 'J10' """
+    list_location = []
+    while mask:
+        low = mask & -mask
+        list_location.append(LIST_LOCATION[low.bit_length() - 1])
+        mask ^= low
+    return list_location
+
+
+def get_placement_masks(length: int) -> List[int]:
+    """ Masks of every placement of a ship of the length, along a letter or a number, in board order """
+    list_mask = []
+    for idx_start in range(len(LIST_LOCATION)):
+        idx_letter, idx_number = divmod(idx_start, CNT_SIDE)
+        for step, idx_line in ((1, idx_number), (CNT_SIDE, idx_letter)):
+            if idx_line + length <= CNT_SIDE:
+                list_mask.append(sum(1 << (idx_start + idx * step) for idx in range(length)))
+    return list_mask
+
+
+# per ship the mask and the shared action of every placement, the setup actions only filter them
+SET_SHIP_ACTIONS: Dict[str, Tuple[Tuple[int, BattleshipAction], ...]] = {
+    name: tuple((mask, BattleshipAction(action_type=ActionType.SET_SHIP, ship_name=name,
+                                        location=get_list_location(mask)))
+                for mask in get_placement_masks(length))
+    for name, length in LIST_SHIP}
+PLACEMENT_MASKS: Dict[str, FrozenSet[int]] = {  # per ship the masks of its valid placements
+    name: frozenset(mask for mask, _ in list_action) for name, list_action in SET_SHIP_ACTIONS.items()}
+SHIP_LENGTH: Dict[str, int] = dict(LIST_SHIP)
 
 
 class Battleship(Game):
-    def __init__(self):
-        """Game initialization (set_state call not necessary)"""
-        pass
+
+    def __init__(self) -> None:
+        """ Game initialization (set_state call not necessary) """
+        self.state = BattleshipGameState(idx_player_active=0, phase=GamePhase.SETUP, winner=None, players=[
+            PlayerState(name=f'Player {idx + 1}', ships=[Ship(name=name, length=length, location=None)
+                                                         for name, length in LIST_SHIP],
+                        shots=[], successful_shots=[])
+            for idx in range(2)])
+        self.list_mask_ship: List[int] = []  # per player the locations of the placed ships
+        self.list_mask_shot: List[int] = []  # per player the locations the player has shot at
+        self.list_mask_hit: List[int] = []  # per player the shots that hit a ship of the opponent
+        self.list_ship_masks: List[List[int]] = []  # per player the mask of each ship, 0 if not placed
+        self.set_state(self.state)
 
     def print_state(self) -> None:
-        """Set the game to a given state"""
-        pass
+        """ Print the current game state """
+        print(self.state.model_dump())
 
     def get_state(self) -> BattleshipGameState:
-        """Get the complete, unmasked game state"""
-        pass
+        """ Get the complete, unmasked game state """
+        return self.state
 
     def set_state(self, state: BattleshipGameState) -> None:
-        """Print the current game state"""
-        pass
+        """ Set the game to a given state, the masks are built from the locations """
+        self.state = state
+        self.list_ship_masks = [[get_location_mask(ship.location or []) for ship in player.ships]
+                                for player in state.players]
+        self.list_mask_ship = [functools.reduce(operator.or_, list_mask, 0) for list_mask in self.list_ship_masks]
+        self.list_mask_shot = [get_location_mask(player.shots) for player in state.players]
+        self.list_mask_hit = [get_location_mask(player.successful_shots) for player in state.players]
 
     def get_list_action(self) -> List[BattleshipAction]:
-        """Get a list of possible actions for the active player"""
-        pass
-
-    def apply_action(self, action: BattleshipAction) -> None:
-        """Apply the given action to the game"""
-        pass
+        """ Get a list of possible actions for the active player """
+        idx_player = self.state.idx_player_active
+        if self.state.phase == GamePhase.SETUP:
+            return self._get_list_action_setup(idx_player)
+        if self.state.phase == GamePhase.RUNNING:
+            mask_free = MASK_BOARD & ~self.list_mask_shot[idx_player]
+            list_action = []
+            while mask_free:
+                low = mask_free & -mask_free
+                list_action.append(SHOOT_ACTIONS[low.bit_length() - 1])
+                mask_free ^= low
+            return list_action
+        return []
+
+    def _get_list_action_setup(self, idx_player: int) -> List[BattleshipAction]:
+        """ Every placement of the ships not placed yet that doesn't overlap the placed ships """
+        mask_ship = self.list_mask_ship[idx_player]
+        set_name = {ship.name for ship in self.state.players[idx_player].ships if ship.location is not None}
+        list_action = []
+        for name, _ in LIST_SHIP:
+            if name not in set_name:
+                list_action += [action for mask, action in SET_SHIP_ACTIONS[name] if not mask & mask_ship]
+        return list_action
+
+    def apply_action(self, action: Optional[BattleshipAction]) -> None:
+        """ Apply the given action to the game, None passes the turn """
+        state = self.state
+        idx_player = state.idx_player_active
+        if action is not None and action.action_type == ActionType.SET_SHIP:
+            self._set_ship(idx_player, action)
+            if all(self._is_fleet_placed(idx) for idx in range(len(state.players))):
+                state.phase = GamePhase.RUNNING
+        elif action is not None and action.action_type == ActionType.SHOOT:
+            self._shoot(idx_player, action)
+            if state.phase == GamePhase.FINISHED:
+                return
+        state.idx_player_active = (idx_player + 1) % len(state.players)
+
+    def _set_ship(self, idx_player: int, action: BattleshipAction) -> None:
+        player = self.state.players[idx_player]
+        name = action.ship_name or ''
+        if name not in SHIP_LENGTH:
+            raise ValueError(f"'{name}' is not a ship of the fleet")
+        if any(ship.name == name and ship.location is not None for ship in player.ships):
+            raise ValueError(f"Ship '{name}' is already placed")
+        mask = get_location_mask(action.location)
+        if len(action.location) != SHIP_LENGTH[name] or mask not in PLACEMENT_MASKS[name]:
+            raise ValueError(f"{action.location} is no placement of the ship '{name}' (length {SHIP_LENGTH[name]})")
+        if mask & self.list_mask_ship[idx_player]:
+            raise ValueError(f"Ship '{name}' overlaps a placed ship")
+        location = list(action.location)
+        for idx_ship, ship in enumerate(player.ships):
+            if ship.name == action.ship_name and ship.location is None:
+                ship.location = location
+                self.list_ship_masks[idx_player][idx_ship] = mask
+                break
+        else:
+            player.ships.append(Ship(name=name, length=len(location), location=location))
+            self.list_ship_masks[idx_player].append(mask)
+        self.list_mask_ship[idx_player] |= mask
+
+    def _is_fleet_placed(self, idx_player: int) -> bool:
+        set_name = {ship.name for ship in self.state.players[idx_player].ships if ship.location is not None}
+        return all(name in set_name for name, _ in LIST_SHIP)
+
+    def _shoot(self, idx_player: int, action: BattleshipAction) -> None:
+        if self.state.phase != GamePhase.RUNNING:
+            raise ValueError(f"Shots are not allowed in the phase '{self.state.phase.value}'")
+        if len(action.location) != 1:
+            raise ValueError(f"A shot needs exactly one location, got {action.location}")
+        bit = get_location_mask(action.location)
+        if bit & self.list_mask_shot[idx_player]:
+            raise ValueError(f"'{action.location[0]}' was already shot at")
+        location = LIST_LOCATION[bit.bit_length() - 1]
+        player = self.state.players[idx_player]
+        player.shots.append(location)
+        self.list_mask_shot[idx_player] |= bit
+        mask_ship = self.list_mask_ship[(idx_player + 1) % len(self.state.players)]
+        if bit & mask_ship:
+            player.successful_shots.append(location)
+            self.list_mask_hit[idx_player] |= bit
+            if mask_ship & ~self.list_mask_hit[idx_player] == 0:  # all ships of the opponent sunk
+                self.state.phase = GamePhase.FINISHED
+                self.state.winner = idx_player
 
     def get_player_view(self, idx_player: int) -> BattleshipGameState:
-        """Get the masked state for the active player (e.g. the oppontent's cards are face down)"""
-        pass
+        """ Get the masked state for the active player (the opponent's ships are hidden until sunk) """
+        list_player = []
+        for idx, player in enumerate(self.state.players):
+            if idx != idx_player:
+                mask_hit = self.list_mask_hit[idx_player]
+                ships = [ship if mask and mask & ~mask_hit == 0 else  # sunk ships are revealed
+                         Ship(name=ship.name, length=ship.length, location=None)
+                         for ship, mask in zip(player.ships, self.list_ship_masks[idx])]
+                player = player.model_copy(update={'ships': ships})
+            list_player.append(player)
+        return self.state.model_copy(update={'players': list_player})
 
 
 class RandomPlayer(Player):
-    def select_action(
-        self, state: BattleshipGameState, actions: List[BattleshipAction]
-    ) -> Optional[BattleshipAction]:
-        """Given masked game state and possible actions, select the next action"""
+
+    def select_action(self, state: BattleshipGameState, actions: List[BattleshipAction]) -> Optional[BattleshipAction]:
+        """ Given masked game state and possible actions, select the next action """
         if len(actions) > 0:
             return random.choice(actions)
         return None
 
 
 if __name__ == "__main__":
+
     game = Battleship()
+    game.print_state()
@@ -1,9 +1,10 @@
 import random
 from enum import Enum
-from typing import ClassVar, List, Literal, Optional
+from typing import ClassVar, Dict, List, Literal, Optional
 
 from pydantic import BaseModel
 
+from server.py import dog_board
 from server.py.game import Game, Player
 
 
@@ -135,9 +136,13 @@ class CardSevenMetadata(BaseModel):
 
 
 class Dog(Game):
-    def __init__(self) -> None:
+    def __init__(self, seed: Optional[int] = None, list_card: Optional[List[Card]] = None) -> None:
         """ Game initialization (set_state call not necessary, we expect 4 players) """
-        random.shuffle(GameState.LIST_CARD)
+        # all shuffles derive from the seed, so a game can be replayed from its seed and actions
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        if list_card is None:
+            list_card = list(GameState.LIST_CARD)
+            random.Random(self.seed).shuffle(list_card)
         self.state = GameState(
             phase=GamePhase.RUNNING,
             cnt_round=1,
@@ -148,37 +153,40 @@ class Dog(Game):
                 PlayerState(
                     name="Tick",
                     colour="BLUE",
-                    list_card=GameState.LIST_CARD[:6],
+                    list_card=list_card[:6],
                     list_marble=[Marble(pos=64), Marble(pos=65), Marble(pos=66), Marble(pos=67)],
                 ),
                 PlayerState(
                     name="Trick",
                     colour="GREEN",
-                    list_card=GameState.LIST_CARD[6:12],
+                    list_card=list_card[6:12],
                     list_marble=[Marble(pos=72), Marble(pos=73), Marble(pos=74), Marble(pos=75)],
                 ),
                 PlayerState(
                     name="Track",
                     colour="RED",
-                    list_card=GameState.LIST_CARD[12:18],
+                    list_card=list_card[12:18],
                     list_marble=[Marble(pos=80), Marble(pos=81), Marble(pos=82), Marble(pos=83)],
                 ),
                 PlayerState(
                     name="Donald",
                     colour="YELLOW",
-                    list_card=GameState.LIST_CARD[18:24],
+                    list_card=list_card[18:24],
                     list_marble=[Marble(pos=88), Marble(pos=89), Marble(pos=90), Marble(pos=91)],
                 ),
             ],
-            list_card_draw=GameState.LIST_CARD[24:],
+            list_card_draw=list_card[24:],
             list_card_discard=[],
             card_active=None,
         )
         self.card_seven_metadata = CardSevenMetadata(remaining_steps=None, actions=[], actions_other_players=[])
+        self.cnt_marble_finished: Dict[str, int] = {} # marbles in the finish lane per colour, see _move_marble
+        self._count_marbles_in_finish()
 
     def set_state(self, state: GameState) -> None:
         """Set the game to a given state"""
         self.state = state
+        self._finish_game()
 
     def get_state(self) -> GameState:
         """Get the complete, unmasked game state"""
@@ -191,18 +199,17 @@ class Dog(Game):
         print(self.state)
 
     def get_list_action(self) -> List[Action]:  # pylint: disable=R0912
-        """Get a list of possible actions for the active player"""
+        """Get a list of possible actions for the active player (does not change the state)"""
         actions = []
         player = self.state.list_player[self.state.idx_player_active]
         if not self.state.bool_card_exchanged:
             return self._unique_actions(self._generate_card_exchange_actions(player))
-        self._finish_game()
-        if player.finished:
-            partner = self._get_partner()
-            player.list_marble = partner.list_marble
+        owner = self.state.list_player[self._get_idx_marble_owner()]
+        mask_save = self._get_mask_save() # built once, every move checks it
         if self.state.card_active is not None:
-            for marble in player.list_marble:
-                if marble.pos in KennelNumbers[player.colour].value:
+            kennel_positions = dog_board.KENNEL_POS[owner.colour]
+            for marble in owner.list_marble:
+                if marble.pos in kennel_positions:
                     continue
                 current_position = marble.pos
                 if self.state.card_active.rank == "7":
@@ -210,27 +217,18 @@ class Dog(Game):
                         possible_steps = list(range(1, 8))
                     else:
                         possible_steps = list(range(1, self.card_seven_metadata.remaining_steps+1))
-                    if 4 in possible_steps and current_position == StartNumbers[player.colour].value:
+                    if 4 in possible_steps and current_position == dog_board.START_POS[owner.colour]:
                         possible_steps.append(-4)
-                    for step in possible_steps:
-                        destination = (current_position + step) % 64
-                        if self._check_if_save_marble_between_current_and_destination(current_position, destination):
-                            continue
-                        actions.append(
-                            Action(card=self.state.card_active, pos_from=current_position, pos_to=destination)
-                        )
                 else:
-                    for move in MOVES[self.state.card_active.rank]:
-                        current_position = marble.pos
-                        destination = (current_position + move) % 64
-                        if self._check_if_save_marble_between_current_and_destination(current_position, destination):
-                            continue
+                    possible_steps = MOVES[self.state.card_active.rank]
+                for step in possible_steps:
+                    for destination in self._get_destinations(owner, marble, step, mask_save):
                         actions.append(
                             Action(card=self.state.card_active, pos_from=current_position, pos_to=destination)
                         )
             return self._unique_actions(actions) # calls helper method for the exchange
 
-        marbles_in_play, marbles_in_kennel = self._get_marbles_in_kennel_and_in_play(player)
+        marbles_in_play, marbles_in_kennel = self._get_marbles_in_kennel_and_in_play(owner)
 
         if len(marbles_in_kennel) == 4:
             return self._unique_actions(self._generate_kennel_and_joker_actions(player, marbles_in_kennel))
@@ -245,24 +243,56 @@ class Dog(Game):
             actions = self._generate_jake_swap_actions(player, jake_cards, marbles_in_play)
 
         # Collect all move options for each marbles and cards inhand
-        self._collect_move_options_for_marbles_and_cards(player, marbles_in_play, actions)
+        self._collect_move_options_for_marbles_and_cards(player, marbles_in_play, actions, mask_save)
         return self._unique_actions(actions)
 
     def _collect_move_options_for_marbles_and_cards(self, player: PlayerState, marbles_in_play: List[Marble],
-                                                    actions: List[Action]) -> None:
+                                                    actions: List[Action], mask_save: int) -> None:
+        owner = self.state.list_player[self._get_idx_marble_owner()]
         for marble in marbles_in_play:
             for card in player.list_card:
                 for move in MOVES[card.rank]:
-                    current_position = marble.pos
-                    destination = (current_position + move) % 64
-                    if self._check_if_save_marble_between_current_and_destination(current_position, destination):
-                        continue
-                    actions.append(Action(card=card, pos_from=current_position, pos_to=destination))
+                    for destination in self._get_destinations(owner, marble, move, mask_save):
+                        actions.append(Action(card=card, pos_from=marble.pos, pos_to=destination))
+
+    def _get_destinations(self, player: PlayerState, marble: Marble, steps: int, mask_save: int) -> List[int]:
+        """
+        Get the positions the marble of the player can reach with the steps: on the track and, moving forward over
+        the own start square, in the own finish lane (without overtaking own marbles in the lane)
+        """
+        destinations = []
+        current_position = marble.pos
+        if current_position < dog_board.CNT_TRACK:
+            destination = (current_position + steps) % dog_board.CNT_TRACK
+            if not self._check_if_save_marble_between_current_and_destination(
+                    current_position, destination, steps, mask_save):
+                destinations.append(destination)
+            if marble.is_save: # a marble can not go to the finish directly from its start
+                return destinations
+        destination = dog_board.get_finish_destination(player.colour, current_position, steps)
+        if destination < 0:
+            return destinations
+        if current_position < dog_board.CNT_TRACK and self._check_if_save_marble_between_current_and_destination(
+                current_position, dog_board.FINISH_ENTRY[player.colour], mask_save=mask_save):
+            return destinations
+        path_index = dog_board.PATH_INDEX[player.colour]
+        path_index_from, path_index_to = path_index[current_position], path_index[destination]
+        for other in player.list_marble:
+            if other.pos >= dog_board.CNT_TRACK and path_index_from < path_index[other.pos] <= path_index_to:
+                return destinations # own marbles in the finish lane can not be overtaken
+        destinations.append(destination)
+        return destinations
 
     def _unique_actions(self, actions: List[Action]) -> List[Action]:
+        """ Actions in their order without duplicates, compared by their fields instead of pairwise """
         unique_actions = []
+        seen = set()
         for action in actions:
-            if action not in unique_actions:
+            card_swap = action.card_swap
+            key = (action.card.suit, action.card.rank, action.pos_from, action.pos_to,
+                   None if card_swap is None else (card_swap.suit, card_swap.rank))
+            if key not in seen:
+                seen.add(key)
                 unique_actions.append(action)
         return unique_actions
 
@@ -274,19 +304,17 @@ class Dog(Game):
         """
         actions = []
         other_marbles_in_play = []
-        invalid_positions = set(FinishNumbers['BLUE'].value +
-                                 FinishNumbers['RED'].value +
-                                 FinishNumbers['GREEN'].value +
-                                 FinishNumbers['YELLOW'].value)
-        invalid_positions.update([StartNumbers.BLUE, StartNumbers.RED, StartNumbers.GREEN, StartNumbers.YELLOW])
-        for idx_other_player, other_player in enumerate(self.state.list_player):
-            if idx_other_player != self.state.idx_player_active:
+        invalid_positions = {pos for finish_positions in dog_board.FINISH_POS.values() for pos in finish_positions}
+        invalid_positions.update(dog_board.START_POS.values())
+        owner = self.state.list_player[self._get_idx_marble_owner()]
+        for other_player in self.state.list_player:
+            if other_player is not player and other_player is not owner:
                 other_marbles_in_play.extend(self._get_marbles_in_kennel_and_in_play(other_player)[0])
 
         positions_jake_from = []
         positions_jake_to = []
         for marble in marbles_in_play:
-            if  marble.pos not in FinishNumbers[player.colour].value:
+            if  dog_board.FINISH_COLOUR[marble.pos] is None: # not in the finish lane
                 positions_jake_from.append(marble.pos)
         for marble in other_marbles_in_play:
             if not marble.is_save and marble.pos not in invalid_positions:
@@ -320,19 +348,22 @@ class Dog(Game):
         unique_cards = {card.rank + card.suit: card for card in player.list_card}.values()
         return [Action(card=card) for card in unique_cards]
 
-    def _check_if_save_marble_between_current_and_destination(self, current_position: int, destination: int) -> bool:
-        for player in self.state.list_player:
-            for marble in player.list_marble:
-                if current_position < destination:
-                    if marble.pos > current_position and marble.pos <= destination and marble.is_save:
-                        return True
-                else: # if move is over start (0) position
-                    if marble.pos < current_position and marble.pos <= destination and marble.is_save:
-                        return True
-        return False
+    def _check_if_save_marble_between_current_and_destination(self, current_position: int, destination: int,
+                                                              steps: int = 1, mask_save: Optional[int] = None) -> bool:
+        """ True if a save marble is passed or reached on the track, moving in the direction of the steps """
+        if mask_save is None:
+            mask_save = self._get_mask_save()
+        direction = -1 if steps < 0 else 1
+        distance = direction * (destination - current_position) % dog_board.CNT_TRACK
+        return dog_board.is_any_between(mask_save, current_position, direction * distance)
+
+    def _get_mask_save(self) -> int:
+        """ Track mask of the save marbles, no marble can pass or reach them """
+        return dog_board.get_track_mask(
+            marble.pos for player in self.state.list_player for marble in player.list_marble if marble.is_save)
 
     def _get_marbles_in_kennel_and_in_play(self, player: PlayerState) -> tuple[list[Marble], list[Marble]]:
-        kennel_positions = KennelNumbers[player.colour].value
+        kennel_positions = dog_board.KENNEL_POS[player.colour]
         marbles_in_play, marbles_in_kennel = [], []
         for marble in player.list_marble:
             if marble.pos not in kennel_positions:
@@ -347,7 +378,6 @@ class Dog(Game):
         when the player has a JOKER card.
         """
         actions = []
-        start_position = StartNumbers[player.colour].value
 
         joker_cards = [card for card in player.list_card if card.rank == "JKR"]
         if joker_cards:
@@ -370,13 +400,14 @@ class Dog(Game):
 
         card_ranks = [card.rank for card in player.list_card]
         if any(rank in ["JKR", "A", "K"] for rank in card_ranks):
-            marble_in_kennel_positions = [marble.pos for marble in marbles_in_kennel]
+            pos_kennel = min(marble.pos for marble in marbles_in_kennel)
+            start_position = dog_board.START_POS[dog_board.KENNEL_COLOUR[pos_kennel] or player.colour]
             for card in player.list_card:
                 if card.rank in ["JKR", "A", "K"]:
                     actions.append(
                         Action(
                             card=card,
-                            pos_from=min(marble_in_kennel_positions),
+                            pos_from=pos_kennel,
                             pos_to=start_position,
                         )
                     )
@@ -416,7 +447,7 @@ class Dog(Game):
 
         for i, card in enumerate(player.list_card):
             if card.rank == "JKR" and card.suit == action.card.suit:
-                player.list_card.pop(i)
+                self.state.list_card_discard.append(player.list_card.pop(i))
                 break
         else:
             raise ValueError("Joker-Karte nicht in der Hand des Spielers gefunden.")
@@ -435,10 +466,11 @@ class Dog(Game):
         player = self.state.list_player[self.state.idx_player_active]
         player.list_card = [self.state.list_card_draw.pop() for _ in range(num_cards)]
 
-    def apply_action(self, action: Action) -> None: # pylint: disable=R0912
+    def apply_action(self, action: Optional[Action]) -> None: # pylint: disable=R0912
         """ Apply the given action to the game """
         player = self.state.list_player[self.state.idx_player_active]
-        idx_player_active = self.state.idx_player_active
+        idx_owner = self._get_idx_marble_owner() # a finished player moves the marbles of the partner
+        owner = self.state.list_player[idx_owner]
 
         if action is None:
             return self. _action_none(player)
@@ -449,44 +481,45 @@ class Dog(Game):
             return self._process_joker_action(player, action)
         current_position = action.pos_from
         destination = action.pos_to
-        marble_idx = self._get_marble_idx_from_position(player, current_position)
+        marble_idx = self._get_marble_idx_from_position(owner, current_position)
         other_player, other_marble_idx = self._get_other_marble_idx_from_position(destination)
         if marble_idx < 0:
             raise ValueError("You don't have a marble at your specified position.")
         if destination is not None:
-            player.list_marble[marble_idx].pos = destination
-        if destination == StartNumbers[player.colour].value and current_position in KennelNumbers[player.colour].value:
-            player.list_marble[marble_idx].is_save = True
+            self._move_marble(owner.list_marble[marble_idx], destination)
+        # a marble is save on its start square only when it just left the kennel
+        owner.list_marble[marble_idx].is_save = destination == dog_board.START_POS[owner.colour] and \
+            current_position in dog_board.KENNEL_POS[owner.colour]
 
         # Execute the second part of the jake card swap to complete action
         if action.card.rank == "J" and other_player is not None and current_position is not None:
-            other_player.list_marble[other_marble_idx].pos = current_position
+            self._move_marble(other_player.list_marble[other_marble_idx], current_position)
         card_idx = self._get_card_idx_in_hand(player, action)
         if card_idx < 0:
             raise ValueError("You don't have this card in Hand.")
         if action.card.rank != "7":
-            player.list_card.pop(card_idx)
+            self.state.list_card_discard.append(player.list_card.pop(card_idx))
         if action.card.rank == "7":
             if current_position is None or destination is None:
                 raise ValueError("Current and destination position must be specified for card 7.")
             self._card_seven_logic(action, current_position, destination)
             self.card_seven_metadata.actions.append(action)
+            if self.card_seven_metadata.remaining_steps is None: # all 7 steps are played
+                self.state.list_card_discard.append(player.list_card.pop(card_idx))
 
-                # Support partner at the end of the game
-        if player.finished:
-            partner = self._get_partner()
-            partner.list_marble = player.list_marble
-        # If not finished send home player standing on the same field
-        elif current_position is not None and destination is not None:
+        # Send home marbles standing on the same field
+        if current_position is not None and destination is not None:
             self._send_marble_home_if_possible(
-                action, idx_player_active, marble_idx, current_position, destination
+                action, idx_owner, marble_idx, current_position, destination
             )
-        self._finish_game()
+        self._update_finished()
         return None
 
     def _card_seven_logic(self, action: Action, current_position: int, destination: int) -> None:
         if self.card_seven_metadata.remaining_steps is None:
             self.card_seven_metadata.remaining_steps = 7
+            self.card_seven_metadata.actions = [] # only the actions of this 7 are reverted
+            self.card_seven_metadata.actions_other_players = []
             self.state.card_active = action.card
 
         steps = self._calculate_steps(current_position, destination)
@@ -499,21 +532,41 @@ class Dog(Game):
             self.card_seven_metadata.remaining_steps -= abs(steps)
 
     def _calculate_steps(self, current_position: int, destination: int) -> int:
+        player = self.state.list_player[self._get_idx_marble_owner()]
+        return dog_board.get_steps(player.colour, current_position, destination)
+
+    def _move_marble(self, marble: Marble, pos: int) -> None:
+        """ Move the marble and keep the number of marbles in each finish lane up to date """
+        colour_from = dog_board.FINISH_COLOUR[marble.pos] if 0 <= marble.pos < dog_board.CNT_POS else None
+        colour_to = dog_board.FINISH_COLOUR[pos] if 0 <= pos < dog_board.CNT_POS else None
+        if colour_from is not None:
+            self.cnt_marble_finished[colour_from] -= 1
+        if colour_to is not None:
+            self.cnt_marble_finished[colour_to] += 1
+        marble.pos = pos
+
+    def _count_marbles_in_finish(self) -> None:
+        """ Count the marbles in the finish lanes from scratch (after the state was set) """
+        for player in self.state.list_player:
+            self.cnt_marble_finished[player.colour] = sum(
+                marble.pos in dog_board.FINISH_POS[player.colour] for marble in player.list_marble)
+
+    def _get_idx_marble_owner(self) -> int:
+        """ Index of the player whose marbles the active player moves (the partner once all own marbles are in) """
         player = self.state.list_player[self.state.idx_player_active]
-        start_number = StartNumbers[player.colour].value
-        if start_number == 0:
-            start_number = 64
-        if current_position < start_number <= destination:
-            steps_to_start_number = start_number - current_position
-            steps_from_start_number = FinishNumbers[player.colour].value.index(destination) + 1
-            return steps_to_start_number + steps_from_start_number
-        return (destination - current_position) % 64
+        if self._is_player_in_finish(player, dog_board.FINISH_POS[player.colour]):
+            return (self.state.idx_player_active + 2) % self.state.cnt_player
+        return self.state.idx_player_active
 
     def _finish_game(self) -> None:
+        """ Count the marbles in the finish from scratch and update the finished players and the phase """
+        self._count_marbles_in_finish()
+        self._update_finished()
+
+    def _update_finished(self) -> None:
+        """ Update the finished players and the phase from the counts kept by _move_marble """
         for player in self.state.list_player:
-            finish_positions = FinishNumbers[player.colour].value
-            if self._is_player_in_finish(player, finish_positions):
-                player.finished = True
+            player.finished = self.cnt_marble_finished[player.colour] == dog_board.CNT_LANE
 
         if self.state.list_player[0].finished and self.state.list_player[2].finished or \
            self.state.list_player[1].finished and self.state.list_player[3].finished:
@@ -529,25 +582,27 @@ class Dog(Game):
         for action in self.card_seven_metadata.actions[::-1]: # revert all own actions
             action.pos_from, action.pos_to = action.pos_to, action.pos_from
             for marble in player.list_marble:
-                if marble.pos == action.pos_from:
-                    marble.pos = action.pos_to or -1
+                if marble.pos == action.pos_from and action.pos_to is not None:
+                    self._move_marble(marble, action.pos_to)
                     break
         for action in self.card_seven_metadata.actions_other_players: # revert all other players actions
             for player_ in self.state.list_player:
                 for marble in player_.list_marble:
-                    if marble.pos == action.pos_to:
-                        marble.pos = action.pos_from or -1
+                    if marble.pos == action.pos_to and action.pos_from is not None:
+                        self._move_marble(marble, action.pos_from)
                         break
 
     def _action_none(self, player: PlayerState) -> None:
         if player.list_card:
+            self.state.list_card_discard.extend(player.list_card)
             player.list_card = []
             if self.state.card_active is not None:
                 if self.state.card_active.rank == "7" and (
                     self.card_seven_metadata.remaining_steps is None or self.card_seven_metadata.remaining_steps > 0
                 ):
                     self.state.card_active = None
-                    self._revert_actions(player)
+                    self._revert_actions(self.state.list_player[self._get_idx_marble_owner()])
+                    self._update_finished()
                 self.card_seven_metadata.remaining_steps = None
             return
         if all(not player.list_card for player in self.state.list_player): # all players have no cards
@@ -565,8 +620,8 @@ class Dog(Game):
         for player in self.state.list_player:
             player.list_card = []
         self.state.list_card_discard = []
-        self.state.list_card_draw = GameState.LIST_CARD
-        random.shuffle(self.state.list_card_draw)
+        self.state.list_card_draw = list(GameState.LIST_CARD)
+        random.Random(f'{self.seed}:{self.state.cnt_round}').shuffle(self.state.list_card_draw)
 
     def _get_partner(self) -> PlayerState:
         idx_partner = (self.state.idx_player_active + 2) % self.state.cnt_player # identify partner-player
@@ -615,14 +670,18 @@ class Dog(Game):
             destination: int,
         ) -> None:
         all_marble_positions = [marble.pos for player in self.state.list_player for marble in player.list_marble]
+        # a 7 into the finish lane overtakes the track up to the start square of the active player
+        track_destination = destination if destination < dog_board.CNT_TRACK else \
+            dog_board.FINISH_ENTRY[self.state.list_player[idx_player_active].colour]
         num_marbles_on_dest = all_marble_positions.count(destination)
         for i, player in enumerate(self.state.list_player):
-            kennel_positions = KennelNumbers[player.colour].value
+            kennel_positions = dog_board.KENNEL_POS[player.colour]
             for j, marble in enumerate(player.list_marble):
                 if i == idx_player_active and j == marble_idx:
                     continue # skip the marble that was moved
-                if action.card.rank == "7" and (current_position is not None and destination is not None):
-                    if marble.pos > current_position and marble.pos < destination:
+                if action.card.rank == "7" and current_position < dog_board.CNT_TRACK:
+                    if marble.pos < dog_board.CNT_TRACK and marble.pos != destination and \
+                            dog_board.is_between(current_position, track_destination, marble.pos):
                         self.card_seven_metadata.actions_other_players.append(
                             Action(
                                 card=Card(suit="", rank=""),
@@ -630,7 +689,7 @@ class Dog(Game):
                                 pos_to=kennel_positions[0]
                             )
                         )
-                        marble.pos = kennel_positions[0] # find smarter way to allocate marbles to kennel
+                        self._move_marble(marble, kennel_positions[0]) # find smarter way to allocate marbles to kennel
 
 
                 if marble.pos == destination and num_marbles_on_dest > 1:
@@ -641,7 +700,7 @@ class Dog(Game):
                             pos_to=kennel_positions[0],
                         )
                     )
-                    marble.pos = kennel_positions[0]
+                    self._move_marble(marble, kennel_positions[0])
 
     def get_player_view(self, idx_player: int) -> GameState:
         """ Get the masked state for the active player (e.g. the oppontent's cards are face down)"""
@@ -0,0 +1,134 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Board numbering: track 0-63, then per colour 4 kennel and 4 finish positions (BLUE 64-71, GREEN 72-79, ...).
+# A marble's path starts on the square after its start, runs once around the track to its start square
+# (path index 63) and ends in its finish lane (path index 64-67).
+
+CNT_TRACK = 64  # squares on the track
+CNT_LANE = 4  # kennel and finish positions per colour
+CNT_POS = 96  # all positions
+CNT_STEP_MAX = 13  # most steps of a single card (K, JKR)
+LIST_COLOUR = ('BLUE', 'GREEN', 'RED', 'YELLOW')
+
+START_POS: Dict[str, int] = {colour: idx * CNT_TRACK // 4 for idx, colour in enumerate(LIST_COLOUR)}
+KENNEL_POS: Dict[str, Tuple[int, ...]] = {
+    colour: tuple(CNT_TRACK + idx * 2 * CNT_LANE + i for i in range(CNT_LANE))
+    for idx, colour in enumerate(LIST_COLOUR)}
+FINISH_POS: Dict[str, Tuple[int, ...]] = {
+    colour: tuple(CNT_TRACK + idx * 2 * CNT_LANE + CNT_LANE + i for i in range(CNT_LANE))
+    for idx, colour in enumerate(LIST_COLOUR)}
+FINISH_ENTRY: Dict[str, int] = dict(START_POS)  # marbles turn into the finish lane after this square
+# per position, the colour whose kennel / finish lane it is (None elsewhere)
+KENNEL_COLOUR: List[Optional[str]] = [
+    next((colour for colour, kennel in KENNEL_POS.items() if pos in kennel), None) for pos in range(CNT_POS)]
+FINISH_COLOUR: List[Optional[str]] = [
+    next((colour for colour, finish in FINISH_POS.items() if pos in finish), None) for pos in range(CNT_POS)]
+
+
+def _build_path_index(colour: str) -> List[int]:
+    """ Path index of every position for a marble of the colour (-1 if not on its path) """
+    path_index = [-1] * CNT_POS
+    for pos in range(CNT_TRACK):
+        path_index[pos] = (pos - START_POS[colour] - 1) % CNT_TRACK
+    for i, pos in enumerate(FINISH_POS[colour]):
+        path_index[pos] = CNT_TRACK + i
+    return path_index
+
+
+def _build_square_at(path_index: List[int]) -> List[int]:
+    """ Position of every path index (inverse of the path index) """
+    square_at = [-1] * (CNT_TRACK + CNT_LANE)
+    for pos, idx in enumerate(path_index):
+        if idx >= 0:
+            square_at[idx] = pos
+    return square_at
+
+
+# per colour, flat lists indexed by position (or path index for SQUARE_AT)
+PATH_INDEX: Dict[str, List[int]] = {colour: _build_path_index(colour) for colour in LIST_COLOUR}
+SQUARE_AT: Dict[str, List[int]] = {colour: _build_square_at(PATH_INDEX[colour]) for colour in LIST_COLOUR}
+DISTANCE_TO_FINISH: Dict[str, List[int]] = {
+    colour: [CNT_TRACK + CNT_LANE - 1 - idx if idx >= 0 else -1 for idx in PATH_INDEX[colour]]
+    for colour in LIST_COLOUR}  # steps to the last finish position, -1 if not on the path
+# PASSES_START[colour][pos * (CNT_STEP_MAX + 1) + steps]: moving steps forward from pos reaches the start square
+# before the last step, so the marble may turn into its finish lane
+PASSES_START: Dict[str, List[bool]] = {
+    colour: [pos < CNT_TRACK and (START_POS[colour] - pos) % CNT_TRACK < steps
+             for pos in range(CNT_POS) for steps in range(CNT_STEP_MAX + 1)]
+    for colour in LIST_COLOUR}
+
+
+def get_steps(colour: str, pos_from: int, pos_to: int) -> int:
+    """ Steps forward from pos_from to pos_to for a marble of the colour (into or inside its finish lane) """
+    path_index = PATH_INDEX[colour]
+    if path_index[pos_to] >= CNT_TRACK:
+        return path_index[pos_to] - path_index[pos_from]
+    return (pos_to - pos_from) % CNT_TRACK
+
+
+def get_finish_destination(colour: str, pos_from: int, steps: int) -> int:
+    """ Finish position reached by moving steps forward from pos_from, -1 if the move can not end in the lane """
+    if steps <= 0 or steps > CNT_STEP_MAX:
+        return -1
+    if pos_from < CNT_TRACK and not PASSES_START[colour][pos_from * (CNT_STEP_MAX + 1) + steps]:
+        return -1
+    path_index = PATH_INDEX[colour][pos_from]
+    if path_index < 0 or path_index + steps >= CNT_TRACK + CNT_LANE:
+        return -1
+    return SQUARE_AT[colour][path_index + steps]
+
+
+def is_between(pos_from: int, pos_to: int, pos: int, direction: int = 1) -> bool:
+    """ True if the track square pos is passed or reached moving from pos_from to pos_to (direction -1: backwards) """
+    return 0 < direction * (pos - pos_from) % CNT_TRACK <= direction * (pos_to - pos_from) % CNT_TRACK
+
+
+def get_track_mask(list_pos: Iterable[int]) -> int:
+    """
+    Bitmask of the track squares of the positions (one bit per square, e.g. of the marbles that block),
+    repeated above the track so that a range over square 0 is a single shift
+    """
+    mask = 0
+    for pos in list_pos:
+        if pos < CNT_TRACK:
+            mask |= 1 << pos
+    return mask | mask << CNT_TRACK
+
+
+def is_any_between(mask: int, pos_from: int, steps: int) -> bool:
+    """ True if a square of the track mask is passed or reached moving steps from pos_from (negative: backwards) """
+    if steps >= 0:
+        return mask >> (pos_from + 1) & ((1 << steps) - 1) != 0
+    return mask >> (pos_from + CNT_TRACK + steps) & ((1 << -steps) - 1) != 0
+
+
+def to_dict() -> Dict[str, Any]:
+    """ All tables, keyed like the constants in lower case """
+    return {
+        'cnt_track': CNT_TRACK,
+        'cnt_lane': CNT_LANE,
+        'cnt_pos': CNT_POS,
+        'cnt_step_max': CNT_STEP_MAX,
+        'list_colour': list(LIST_COLOUR),
+        'start_pos': START_POS,
+        'kennel_pos': KENNEL_POS,
+        'finish_pos': FINISH_POS,
+        'finish_entry': FINISH_ENTRY,
+        'kennel_colour': KENNEL_COLOUR,
+        'finish_colour': FINISH_COLOUR,
+        'path_index': PATH_INDEX,
+        'square_at': SQUARE_AT,
+        'distance_to_finish': DISTANCE_TO_FINISH,
+        'passes_start': {colour: [int(flag) for flag in flags] for colour, flags in PASSES_START.items()},
+    }
+
+
+def to_json() -> str:
+    """ Board geometry for the client (server/inc/static/game/dog/js/game.js) """
+    return json.dumps(to_dict(), separators=(',', ':'))
+
+
+if __name__ == '__main__':
+
+    print(to_json())
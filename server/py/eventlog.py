@@ -0,0 +1,120 @@
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, TextIO
+
+
+class EventLog:
+    """
+    Structured game events as JSON lines. emit() only appends to a queue, a writer thread
+    serialises and writes the events in batches, so the event loop never waits for the disk or stdout.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            path: str = '-',
+            sample_rate: float = 1.0,
+            max_bytes: int = 10 * 1024 * 1024,
+            backup_count: int = 5,
+            batch_size: int = 256,
+            flush_interval: float = 0.5,
+            max_queue: int = 100_000,
+        ) -> None:
+        self.path = path  # file to write to, '-' for stdout
+        self.sample_rate = sample_rate  # share of sessions whose moves are logged
+        self.max_bytes = max_bytes  # rotate the file when it would grow larger
+        self.backup_count = backup_count  # number of rotated files to keep (path.1 ... path.N)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.cnt_dropped = 0  # events dropped because the writer could not keep up
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._file: Optional[TextIO] = None
+        self._size = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """ Start the writer thread, events emitted before are written then """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._closed.clear()
+        self._thread = threading.Thread(target=self._run, name='event-log', daemon=True)
+        self._thread.start()
+
+    def is_sampled(self, session_id: str) -> bool:
+        """ Sampling is done per session, so a sampled game is logged with all its moves """
+        if self.sample_rate >= 1.0:
+            return True
+        return zlib.crc32(session_id.encode('utf-8')) / 0xFFFFFFFF < self.sample_rate
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """ Queue an event, never blocks (drops the event if the queue is full) """
+        if self._closed.is_set() or len(self._queue) >= self.max_queue:
+            self.cnt_dropped += 1
+            return
+        self._queue.append({'ts': time.time(), 'event': event, **fields})
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """ Write the queued events and stop the writer thread """
+        self._closed.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            while self._queue:
+                lines: List[str] = []
+                while self._queue and len(lines) < self.batch_size:
+                    lines.append(json.dumps(self._queue.popleft(), default=str, ensure_ascii=False))
+                self._write(''.join(line + '\n' for line in lines))
+            if self._closed.is_set():
+                if self._file is not None:
+                    self._file.close()
+                return
+
+    def _write(self, data: str) -> None:
+        if self.path == '-':
+            sys.stdout.write(data)
+            sys.stdout.flush()
+            return
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')  # pylint: disable=consider-using-with
+            self._size = self._file.tell()
+        if self._size > 0 and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+
+    def _rotate(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        for idx in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f'{self.path}.{idx}'):
+                os.replace(f'{self.path}.{idx}', f'{self.path}.{idx + 1}')
+        if self.backup_count > 0:
+            os.replace(self.path, f'{self.path}.1')
+        self._file = open(self.path, 'w', encoding='utf-8')  # pylint: disable=consider-using-with
+        self._size = 0
+
+
+def create_event_log_from_env() -> EventLog:
+    """ Configure the event log with GAME_EVENT_LOG (path or '-'), GAME_EVENT_LOG_SAMPLE,
+    GAME_EVENT_LOG_MAX_BYTES and GAME_EVENT_LOG_BACKUPS """
+    return EventLog(
+        path=os.environ.get('GAME_EVENT_LOG', '-'),
+        sample_rate=float(os.environ.get('GAME_EVENT_LOG_SAMPLE', '1.0')),
+        max_bytes=int(os.environ.get('GAME_EVENT_LOG_MAX_BYTES', str(10 * 1024 * 1024))),
+        backup_count=int(os.environ.get('GAME_EVENT_LOG_BACKUPS', '5')),
+    )
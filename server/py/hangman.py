@@ -1,16 +1,26 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 import random
+import string
 from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from server.py.game import Game, Player
 
+# letters are bits 0 (A) to 25 (Z) of a 26-bit mask
+LETTER_BIT: Dict[str, int] = {letter: 1 << idx for idx, letter in enumerate(string.ascii_uppercase)}
+CNT_INCORRECT_MAX = 8  # the game is lost with this many incorrect guesses
+
 
 class GuessLetterAction(BaseModel):
+    model_config = ConfigDict(frozen=True)  # the actions are shared, see GUESS_ACTIONS
+
     letter: str
 
 
+GUESS_ACTIONS: Tuple[GuessLetterAction, ...] = tuple(GuessLetterAction(letter=letter) for letter in LETTER_BIT)
+
+
 class GamePhase(str, Enum):
     SETUP = 'setup'  # before the game has started
     RUNNING = 'running'  # while the game is running
@@ -24,25 +34,45 @@ class HangmanGameState(BaseModel):
     incorrect_guesses: List[str]
 
 
+def get_letter_mask(text: str) -> int:
+    """ Mask of the letters in the text (case-insensitive, other characters are ignored) """
+    mask = 0
+    for char in text.upper():
+        mask |= LETTER_BIT.get(char, 0)
+    return mask
+
+
 class Hangman(Game):
 
-    def __init__(self, word_to_guess:str ="") -> None:
+    def __init__(self, word_to_guess: str = "") -> None:
         """ Important: Game initialization also requires a set_state call to set the 'word_to_guess' """
-        self.state = None
+        self.state: Optional[HangmanGameState] = None
+        self.mask_word = 0  # letters of the word to guess
+        self.mask_guessed = 0  # letters guessed so far
+        self.list_char_bit: List[Tuple[str, int]] = []  # characters of the word with their letter bit
+        self.masked_word = ''  # word of get_player_view, for the revealed letters in mask_revealed
+        self.mask_revealed = -1
+        if word_to_guess:
+            self.set_state(HangmanGameState(
+                word_to_guess=word_to_guess, phase=GamePhase.RUNNING, guesses=[], incorrect_guesses=[]))
 
     def get_state(self) -> HangmanGameState:
-        """ Set the game to a given state """
+        """ Get the complete, unmasked game state """
         if self.state is None:
-            raise Exception("Game state not set yet. Set the game state using `set_state` method.")
+            raise ValueError("Game state not set yet. Set the game state using `set_state` method.")
         return self.state
 
     def set_state(self, state: HangmanGameState) -> None:
-        """ Get the complete, unmasked game state """
-        for letter in state.guesses:
-            if letter not in state.word_to_guess.upper():
-                state.incorrect_guesses.append(letter.upper())
-        
+        """ Set the game to a given state, incorrect_guesses is derived from the word and the guesses """
+        mask_word = get_letter_mask(state.word_to_guess)
+        state.incorrect_guesses = [
+            letter.upper() for letter in state.guesses if not LETTER_BIT.get(letter.upper(), 0) & mask_word]
+
         self.state = state
+        self.mask_word = mask_word
+        self.mask_guessed = get_letter_mask(''.join(state.guesses))
+        self.list_char_bit = [(char, LETTER_BIT.get(char.upper(), 0)) for char in state.word_to_guess]
+        self.mask_revealed = -1
 
     def print_state(self) -> None:
         """Print the current game state."""
@@ -53,44 +83,40 @@ class Hangman(Game):
 
     def get_list_action(self) -> List[GuessLetterAction]:
         """ Get a list of possible actions for the active player """
-
-        # all_letters contains all possible letters for the player
-        all_letters = set('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
-
-        # from current game state all guessed letters
-        guessed_letters = set(letter.upper() for letter in self.state.guesses)
-
-        # Computes all unguessed letters
-        unguessed_letters = all_letters - guessed_letters
-
-        # Creates a GuessLetterAction for each unguessed letter
-        return [GuessLetterAction(letter=letter) for letter in sorted(unguessed_letters)]
-
+        self.get_state()
+        mask_guessed = self.mask_guessed
+        return [action for idx, action in enumerate(GUESS_ACTIONS) if not mask_guessed >> idx & 1]
 
     def apply_action(self, action: GuessLetterAction) -> None:
-        """ Apply the given action to the game """        
-        if self.state.phase != GamePhase.RUNNING:
-            self.state.phase = GamePhase.RUNNING
-        
-        self.state.guesses.append(action.letter.upper()) # add letter to guesses
-        if all(letter in self.state.guesses for letter in self.state.word_to_guess.upper()):
-            self.state.phase = GamePhase.FINISHED
-        
-        if action.letter.upper() not in self.state.word_to_guess.upper():
-            self.state.incorrect_guesses.append(action.letter.upper()) # add letter to incorrect guesses
-            if len(self.state.incorrect_guesses) >= 8:
-                self.state.phase = GamePhase.FINISHED
+        """ Apply the given action to the game """
+        state = self.get_state()
+        if state.phase != GamePhase.RUNNING:
+            state.phase = GamePhase.RUNNING
+
+        letter = action.letter.upper()
+        bit = LETTER_BIT.get(letter, 0)
+        state.guesses.append(letter) # add letter to guesses
+        self.mask_guessed |= bit
+        if not self.mask_word & ~self.mask_guessed:
+            state.phase = GamePhase.FINISHED
+
+        if not bit & self.mask_word:
+            state.incorrect_guesses.append(letter) # add letter to incorrect guesses
+            if len(state.incorrect_guesses) >= CNT_INCORRECT_MAX:
+                state.phase = GamePhase.FINISHED
 
     def get_player_view(self, idx_player: Optional[int] = None) -> HangmanGameState:
         """ Get the masked state for the active player (e.g. the oppontent's cards are face down)"""
-
-        masked_word = "".join([char if char.upper() in self.state.guesses else "_" for char in self.state.word_to_guess])
+        state = self.get_state()
+        mask_revealed = self.mask_guessed & self.mask_word
+        if mask_revealed != self.mask_revealed: # the view only changes with a correct guess
+            self.masked_word = ''.join(char if bit & mask_revealed else '_' for char, bit in self.list_char_bit)
+            self.mask_revealed = mask_revealed
         return HangmanGameState(
-            word_to_guess=masked_word,
-            phase=self.state.phase,
-            guesses=self.state.guesses,
-            incorrect_guesses=self.state.incorrect_guesses)
-
+            word_to_guess=self.masked_word,
+            phase=state.phase,
+            guesses=state.guesses,
+            incorrect_guesses=state.incorrect_guesses)
 
 
 class RandomPlayer(Player):
@@ -0,0 +1,238 @@
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from server.py import hangman
+from server.py.game import Player
+
+WORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hangman_words.json')
+INDEX_DIR = os.path.join(tempfile.gettempdir(), 'hangman_solver')  # indexes built at runtime, per word list
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+LETTERS_BY_FREQUENCY = 'ETAOINSHRDLCUMWFGYPBVKJXQZ'  # English letter frequency, used without candidates
+CNT_EXACT_MAX = 512  # up to this many candidates the information gain is computed exactly
+CNT_CACHE_MAX = 4096  # masked patterns whose guess is remembered
+
+# Binary index, little-endian:
+#   header: magic, number of word lengths
+#   per word length: length, number of words, offset of the words, offset of the bitsets
+#   words: the words of one length, uppercase ASCII, back to back
+#   bitsets: one bit per word of the length, 26 'contains letter' bitsets followed by
+#            length * 26 'letter at position' bitsets
+MAGIC = b'HMI1'
+HEADER = struct.Struct('<4sI')
+GROUP = struct.Struct('<IIII')
+
+
+def normalize_word(word: str) -> Optional[str]:
+    """ Uppercase word, None if it has characters the solver can not guess """
+    word = word.upper()
+    return word if word and all(char in LETTERS for char in word) else None
+
+
+def _build_bitsets(words: List[str], length: int) -> bytes:
+    bitsets = [0] * (len(LETTERS) * (length + 1))
+    for idx_word, word in enumerate(words):
+        for pos, char in enumerate(word):
+            idx_letter = ord(char) - ord('A')
+            bitsets[idx_letter] |= 1 << idx_word
+            bitsets[len(LETTERS) * (pos + 1) + idx_letter] |= 1 << idx_word
+    size_bitset = (len(words) + 7) // 8
+    return b''.join(bitset.to_bytes(size_bitset, 'little') for bitset in bitsets)
+
+
+def build_index(list_word: List[str]) -> bytes:
+    """ Build the binary index of the words (see the layout above) """
+    groups: Dict[int, List[str]] = {}
+    for word in sorted({word for word in map(normalize_word, list_word) if word is not None}):
+        groups.setdefault(len(word), []).append(word)
+
+    offset = HEADER.size + GROUP.size * len(groups)
+    list_group, list_data = [], []
+    for length, words in sorted(groups.items()):
+        data_words = ''.join(words).encode('ascii')
+        data_bitsets = _build_bitsets(words, length)
+        list_group.append(GROUP.pack(length, len(words), offset, offset + len(data_words)))
+        list_data += [data_words, data_bitsets]
+        offset += len(data_words) + len(data_bitsets)
+    return HEADER.pack(MAGIC, len(groups)) + b''.join(list_group) + b''.join(list_data)
+
+
+def get_index_file(words_file: str = WORDS_FILE) -> str:
+    """ Index of the word list in INDEX_DIR, named by the hash of the list so a changed list gets a new index """
+    with open(words_file, 'rb') as fin:
+        digest = hashlib.sha256(fin.read()).hexdigest()[:16]
+    return os.path.join(INDEX_DIR, f'hangman_words.{digest}.idx')
+
+
+def write_index(words_file: str = WORDS_FILE, index_file: Optional[str] = None) -> str:
+    """ Write the index of the word list, by default to get_index_file, and return its path """
+    if index_file is None:
+        index_file = get_index_file(words_file)
+    with open(words_file, encoding='utf-8') as fin:
+        data = build_index(json.load(fin))
+    os.makedirs(os.path.dirname(os.path.abspath(index_file)), exist_ok=True)
+    path_tmp = f'{index_file}.{os.getpid()}.tmp'
+    with open(path_tmp, 'wb') as fout:
+        fout.write(data)
+    os.replace(path_tmp, index_file)  # readers never see a half written index
+    return index_file
+
+
+class WordIndex:
+    """
+    Memory-mapped binary word index. Opening only reads the header, words and bitsets are
+    read from the mapping when a word length is used for the first time.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as fin:
+            self._mmap = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, cnt_group = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a Hangman word index')
+        self._groups: Dict[int, Tuple[int, int, int]] = {}  # length: number of words, offset words, offset bitsets
+        for idx in range(cnt_group):
+            length, cnt_word, offset_words, offset_bitsets = GROUP.unpack_from(
+                self._mmap, HEADER.size + idx * GROUP.size)
+            self._groups[length] = (cnt_word, offset_words, offset_bitsets)
+        self._bitsets: Dict[int, List[int]] = {}
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def get_cnt_word(self, length: int) -> int:
+        return self._groups.get(length, (0, 0, 0))[0]
+
+    def get_word(self, length: int, idx_word: int) -> str:
+        offset_words = self._groups[length][1]
+        return self._mmap[offset_words + idx_word * length:offset_words + (idx_word + 1) * length].decode('ascii')
+
+    def get_bitsets(self, length: int) -> List[int]:
+        """ 'Contains letter' bitsets followed by the 'letter at position' bitsets of the words of the length """
+        bitsets = self._bitsets.get(length)
+        if bitsets is None:
+            cnt_word, _, offset = self._groups[length]
+            size = (cnt_word + 7) // 8
+            bitsets = [int.from_bytes(self._mmap[offset + idx * size:offset + (idx + 1) * size], 'little')
+                       for idx in range(len(LETTERS) * (length + 1))]
+            self._bitsets[length] = bitsets
+        return bitsets
+
+    def get_candidates(self, pattern: str, guessed: str) -> int:
+        """
+        Bitset of the words matching the masked pattern ('_' for hidden letters) given the guessed letters:
+        revealed letters at their positions, no guessed letter at a hidden position, no incorrect letter
+        """
+        length = len(pattern)
+        if self.get_cnt_word(length) == 0:
+            return 0
+        bitsets = self.get_bitsets(length)
+        candidates = (1 << self.get_cnt_word(length)) - 1
+        list_idx_guessed = [ord(char) - ord('A') for char in set(guessed) if char in LETTERS]
+        for pos, char in enumerate(pattern):
+            offset = len(LETTERS) * (pos + 1)
+            if char == '_':
+                for idx_letter in list_idx_guessed:
+                    candidates &= ~bitsets[offset + idx_letter]
+            else:
+                candidates &= bitsets[offset + ord(char) - ord('A')]
+        return candidates
+
+
+def iter_bits(bitset: int) -> List[int]:
+    list_idx = []
+    while bitset:
+        low = bitset & -bitset
+        list_idx.append(low.bit_length() - 1)
+        bitset ^= low
+    return list_idx
+
+
+def get_information_gain(index: WordIndex, length: int, candidates: int, cnt_candidate: int,
+                         idx_letter: int) -> float:
+    """ Expected information (bits) of guessing the letter: entropy of the patterns it can reveal """
+    bitsets = index.get_bitsets(length)
+    if cnt_candidate > CNT_EXACT_MAX: # approximation: only 'in the word' or not
+        p = (candidates & bitsets[idx_letter]).bit_count() / cnt_candidate
+        return 0.0 if p in (0.0, 1.0) else -p * math.log2(p) - (1 - p) * math.log2(1 - p)
+    counts: Dict[int, int] = {}
+    list_bitset_pos = bitsets[len(LETTERS) + idx_letter::len(LETTERS)]
+    for idx_word in iter_bits(candidates & bitsets[idx_letter]):
+        key = 0
+        for pos, bitset_pos in enumerate(list_bitset_pos):
+            if bitset_pos >> idx_word & 1:
+                key |= 1 << pos
+        counts[key] = counts.get(key, 0) + 1
+    counts[0] = cnt_candidate - sum(counts.values())
+    return -sum(cnt / cnt_candidate * math.log2(cnt / cnt_candidate) for cnt in counts.values() if cnt)
+
+
+_indexes: Dict[str, WordIndex] = {}
+
+
+def load_index(index_file: str, words_file: str = WORDS_FILE) -> WordIndex:
+    """ Shared index of the process, (re)built first if the word list is newer """
+    index = _indexes.get(index_file)
+    if index is None:
+        if not os.path.exists(index_file) or (
+                os.path.exists(words_file) and os.path.getmtime(words_file) > os.path.getmtime(index_file)):
+            write_index(words_file, index_file)
+        index = _indexes[index_file] = WordIndex(index_file)
+    return index
+
+
+class SolverPlayer(Player):
+    """ Guesses the letter with the highest information gain over the dictionary words matching the view """
+
+    def __init__(self, index_file: Optional[str] = None, words_file: str = WORDS_FILE) -> None:
+        self.index_file = index_file if index_file is not None else get_index_file(words_file)
+        self.words_file = words_file
+        self._cache: 'OrderedDict[Tuple[str, str], str]' = OrderedDict()  # (pattern, guessed): letter
+
+    def select_action(self, state: hangman.HangmanGameState,
+                      actions: List[hangman.GuessLetterAction]) -> Optional[hangman.GuessLetterAction]:
+        """ Given masked game state and possible actions, select the next action """
+        if not actions:
+            return None
+        dict_action = {action.letter.upper(): action for action in actions}
+        pattern = state.word_to_guess.upper()
+        guessed = ''.join(sorted({letter.upper() for letter in state.guesses}))
+        letter = self._cache.get((pattern, guessed))
+        if letter is None:
+            letter = self._select_letter(pattern, guessed, dict_action)
+            self._cache[(pattern, guessed)] = letter
+            if len(self._cache) > CNT_CACHE_MAX:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end((pattern, guessed))
+        return dict_action.get(letter) or actions[0]
+
+    def _select_letter(self, pattern: str, guessed: str, dict_action: Dict[str, hangman.GuessLetterAction]) -> str:
+        index = load_index(self.index_file, self.words_file)
+        candidates = index.get_candidates(pattern, guessed)
+        cnt_candidate = candidates.bit_count()
+        list_letter = [letter for letter in LETTERS_BY_FREQUENCY if letter in dict_action]
+        if cnt_candidate == 0 or not list_letter: # word not in the dictionary
+            return list_letter[0] if list_letter else next(iter(dict_action))
+        bitsets = index.get_bitsets(len(pattern))
+
+        def score(letter: str) -> Tuple[float, int]:
+            idx_letter = ord(letter) - ord('A')
+            gain = get_information_gain(index, len(pattern), candidates, cnt_candidate, idx_letter)
+            return gain, (candidates & bitsets[idx_letter]).bit_count() # ties: the letter most likely in the word
+
+        return max(list_letter, key=score)
+
+
+if __name__ == '__main__':
+
+    # python -m server.py.hangman_solver build [words.json] [index file]
+    if sys.argv[1:2] == ['build']:
+        print(f'Index written to {write_index(*sys.argv[2:4])}')
@@ -1,18 +1,73 @@
-from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 import json
 import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Type, Union
+
+from pydantic import BaseModel
 
 import server.py.hangman as hangman
 import server.py.battleship as battleship
+import server.py.uno as uno
 import server.py.dog as dog
+import server.py.dog_board as dog_board
+import server.py.session as session
+import server.py.metrics as metrics
+import server.py.profiling as profiling
+import server.py.watchdog as watchdog
+import server.py.eventlog as eventlog
+import server.py.replay as replay
+from server.py.game import Game, Player
 
 import random
 
-app = FastAPI()
+
+# handlers blocking the event loop longer than WATCHDOG_THRESHOLD seconds are logged with their stack
+loop_watchdog = watchdog.LoopWatchdog(threshold=float(os.environ.get('WATCHDOG_THRESHOLD', '0.25')))
+
+# JSON lines per move, written by a background thread started with the app (see eventlog.create_event_log_from_env)
+event_log = eventlog.create_event_log_from_env()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    loop_watchdog.start()
+    event_log.start()
+    yield
+    loop_watchdog.stop()
+    for session_id in list(replay_recorders):
+        finish_recording(session_id)
+    event_log.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# SESSION_STORE=memory (default) or sqlite:///path/to/sessions.db to share sessions between workers
+session_store = session.create_session_store(os.environ.get('SESSION_STORE', 'memory'))
+cnt_worker = int(os.environ.get('WEB_CONCURRENCY', '1'))
+
+# GAME_REPLAY_LOG=path/to/games.replay appends every new Dog and Hangman game when it ends (see replay.py)
+replay_log = replay.ReplayLog(os.environ['GAME_REPLAY_LOG']) if os.environ.get('GAME_REPLAY_LOG') else None
+replay_recorders: Dict[str, replay.ReplayRecorder] = {}
+replay_indexes: 'OrderedDict[str, replay.ReplayIndex]' = OrderedDict()  # most recently used last
+CNT_REPLAY_INDEX_MAX = 64
+
+GAME_CLASSES: Dict[str, Type[Game]] = {
+    'hangman': hangman.Hangman, 'battleship': battleship.Battleship, 'uno': uno.Uno, 'dog': dog.Dog}
+
+DOG_BOARD_JSON = dog_board.to_json()  # board geometry for the Dog client, computed once
+
+# GAME_PROFILE=dog:0.1,hangman samples 10% of the Dog and all Hangman engine calls from the start
+profiling.attach_from_config(
+    os.environ.get('GAME_PROFILE'), GAME_CLASSES, os.environ.get('GAME_PROFILE_MEMORY') == '1')
 
 app.mount("/inc/static", StaticFiles(directory="server/inc/static"), name="static")
 
@@ -24,6 +79,207 @@ async def get(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 
+def new_session_id() -> str:
+    session_id = uuid.uuid4().hex
+    watchdog.tag(session_id=session_id)
+    return session_id
+
+
+async def open_session(websocket: WebSocket, game_type: str, create_game: Callable[[], Game]) -> tuple[str, Game]:
+    """ Resume the game of the 'session_id' query parameter or start a new session """
+    session_id = websocket.query_params.get('session_id')
+    game = None
+    if session_id:
+        game = await asyncio.to_thread(session_store.load_game, session_id, game_type)
+    if session_id is None or game is None:
+        session_id = new_session_id()
+        game = create_game()
+        start_recording(game_type, session_id, game)
+    else:
+        watchdog.tag(session_id=session_id)
+    data = {'type': 'session', 'session_id': session_id, 'worker': session.affinity_hint(session_id, cnt_worker)}
+    await websocket.send_json(data)
+    return session_id, game
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+def check_admin(request: Request) -> None:
+    """ Admin endpoints need the ADMIN_TOKEN as 'X-Admin-Token' header and are disabled without ADMIN_TOKEN """
+    token = os.environ.get('ADMIN_TOKEN')
+    if not token or request.headers.get('x-admin-token') != token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled or the token is wrong")
+
+
+@app.get("/admin/profile", response_model=None)
+async def get_profile(request: Request, output: str = 'json') -> Union[PlainTextResponse, Dict[str, Any]]:
+    check_admin(request)
+    if output == 'collapsed':
+        return PlainTextResponse(profiling.PROFILER.to_collapsed())
+    return profiling.PROFILER.summary()
+
+
+@app.post("/admin/profile/{game_type}")
+async def attach_profile(request: Request, game_type: str, sample_rate: float = 1.0,
+                         track_memory: bool = False) -> Dict[str, Any]:
+    check_admin(request)
+    if game_type not in GAME_CLASSES:
+        raise HTTPException(status_code=404, detail=f"Unknown game type '{game_type}'")
+    try:
+        profiling.PROFILER.attach(GAME_CLASSES[game_type], sample_rate, track_memory)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return profiling.PROFILER.summary()
+
+
+@app.delete("/admin/profile/{game_type}")
+async def detach_profile(request: Request, game_type: str, reset: bool = False) -> Dict[str, Any]:
+    check_admin(request)
+    if game_type not in GAME_CLASSES:
+        raise HTTPException(status_code=404, detail=f"Unknown game type '{game_type}'")
+    profiling.PROFILER.detach(GAME_CLASSES[game_type])
+    summary = profiling.PROFILER.summary()
+    if reset:
+        profiling.PROFILER.reset()
+    return summary
+
+
+def start_recording(game_type: str, session_id: str, game: Game) -> None:
+    """ Record the actions of a freshly created game (resumed games are not recorded) """
+    if replay_log is not None and game_type in replay.CODECS:
+        replay_recorders[session_id] = replay.ReplayRecorder(game_type, game, session_id)
+
+
+def finish_recording(session_id: str) -> None:
+    """ Append the recorded game to the replay log, called when the game ends or the client leaves """
+    recorder = replay_recorders.pop(session_id, None)
+    if replay_log is not None and recorder is not None:
+        replay_log.append(recorder)
+
+
+def build_replay_index(game_id: str) -> replay.ReplayIndex:
+    if replay_log is None or not os.path.exists(replay_log.path):
+        raise HTTPException(status_code=404, detail="Replay log is disabled (set GAME_REPLAY_LOG)")
+    with replay.ReplayReader(replay_log.path) as reader:
+        record = reader.find(game_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail=f"Game '{game_id}' not found in the replay log")
+    return replay.ReplayIndex(record)
+
+
+async def get_replay_index(game_id: str) -> replay.ReplayIndex:
+    """ Get the snapshot index of a recorded game, built off the event loop on first use """
+    index = replay_indexes.get(game_id)
+    if index is None:
+        index = await asyncio.to_thread(build_replay_index, game_id)
+        replay_indexes[game_id] = index
+        while len(replay_indexes) > CNT_REPLAY_INDEX_MAX:
+            replay_indexes.popitem(last=False)
+    replay_indexes.move_to_end(game_id)
+    return index
+
+
+def get_list_action(game_type: str, game: Game) -> List[Any]:
+    with metrics.GET_LIST_ACTION_SECONDS.time(game=game_type):
+        return game.get_list_action()
+
+
+def apply_action(game_type: str, session_id: str, game: Game, action: Any) -> None:
+    start = time.perf_counter()
+    game.apply_action(action)
+    seconds = time.perf_counter() - start
+    recorder = replay_recorders.get(session_id)
+    if recorder is not None:
+        recorder.record(action)
+    metrics.APPLY_ACTION_SECONDS.observe(seconds, game=game_type)
+    metrics.MOVES_TOTAL.inc(game=game_type)
+    if event_log.is_sampled(session_id):  # only logged moves pay for dumping the action
+        event_log.emit('move', session_id=session_id, game=game_type, action=dump(action),
+                       seconds_apply_action=seconds)
+
+
+def dump(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, list):
+        return [dump(item) for item in value]
+    return value
+
+
+async def send_update(websocket: WebSocket, game_type: str, state: Any, **fields: Any) -> None:
+    """ Send the state extended by the given fields (e.g. 'list_action') as 'update' message """
+    metrics.SENDS_IN_FLIGHT.inc(game=game_type)
+    try:
+        with metrics.SEND_SECONDS.time(game=game_type):
+            dict_state = state.model_dump()
+            for key, value in fields.items():
+                dict_state[key] = dump(value)
+            await websocket.send_json({'type': 'update', 'state': dict_state})
+    finally:
+        metrics.SENDS_IN_FLIGHT.dec(game=game_type)
+
+
+# ----- Replay -----
+
+@app.get("/replay/{game_id}")
+async def get_replay(game_id: str, idx_move: int = -1) -> Dict[str, Any]:
+    """ State of a recorded game after idx_move moves (the final state if negative) """
+    index = await get_replay_index(game_id)
+    idx_move = index.cnt_action if idx_move < 0 else min(idx_move, index.cnt_action)
+    game = index.seek(idx_move)
+    return {'game_id': game_id, 'game_type': index.game_type, 'idx_move': idx_move, 'cnt_move': index.cnt_action,
+            'state': game.get_state().model_dump()}
+
+
+def parse_idx_move(value: Any) -> Optional[int]:
+    """ Move index sent by a client, None if it is not an integer """
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@app.websocket("/replay/ws")
+async def replay_ws(websocket: WebSocket) -> None:
+    """ Stream the states of the game 'game_id' from move 'idx_move' on, a 'seek' message restarts the stream """
+    await websocket.accept()
+    game_id = websocket.query_params.get('game_id', '')
+    watchdog.tag(game='replay', session_id=game_id)
+
+    try:
+        try:
+            index = await get_replay_index(game_id)
+        except HTTPException as e:
+            await websocket.close(code=1008, reason=e.detail)
+            return
+        idx_move = parse_idx_move(websocket.query_params.get('idx_move', '0'))
+        if idx_move is None:
+            await websocket.send_json({'type': 'error', 'message': "'idx_move' must be an integer"})
+            idx_move = 0
+
+        while True:
+            for idx, action, game in index.iter_moves(idx_move):
+                await send_update(websocket, index.game_type, game.get_state(),
+                                  idx_move=idx, cnt_move=index.cnt_action, selected_action=action)
+            while True:
+                data = await websocket.receive_json()
+                if not isinstance(data, dict) or data.get('type') != 'seek':
+                    continue
+                idx_seek = parse_idx_move(data.get('idx_move'))
+                if idx_seek is not None:
+                    idx_move = idx_seek
+                    break
+                await websocket.send_json({'type': 'error', 'message': "'idx_move' must be an integer"})
+
+    except WebSocketDisconnect:
+        event_log.emit('disconnected', game='replay', session_id=game_id)
+
+
 # ----- Hangman -----
 
 @app.get("/hangman/singleplayer/local/", response_class=HTMLResponse)
@@ -31,13 +287,14 @@ async def hangman_singleplayer(request: Request):
     return templates.TemplateResponse("game/hangman/singleplayer_local.html", {"request": request})
 
 @app.websocket("/hangman/singleplayer/ws")
+@metrics.track_session("hangman")
 async def hangman_singleplayer_ws(websocket: WebSocket):
     await websocket.accept()
+    watchdog.tag(game='hangman')
 
     idx_player_you = 0
 
-    try:
-
+    def create_game() -> Game:
         game = hangman.Hangman()
 
         words = []
@@ -45,34 +302,35 @@ async def hangman_singleplayer_ws(websocket: WebSocket):
             words = json.load(fin)
         word_to_guess = random.choice(words)
 
-        state = hangman.HangmanGameState(word_to_guess=word_to_guess, phase=hangman.GamePhase.RUNNING, guesses=[], incorrect_guesses=[])
+        state = hangman.HangmanGameState(word_to_guess=word_to_guess, phase=hangman.GamePhase.RUNNING, guesses=[],
+                                         incorrect_guesses=[])
         game.set_state(state)
+        return game
 
-        while True:
+    session_id = ''
 
-            state = game.get_player_view(idx_player_you)
+    try:
+
+        session_id, game = await open_session(websocket, 'hangman', create_game)
 
-            game.print_state()
+        while True:
 
             state = game.get_player_view(idx_player_you)
-            list_action = game.get_list_action()
-            dict_state = state.model_dump()
-            dict_state['idx_player_you'] = idx_player_you
-            dict_state['list_action'] = [action.model_dump() for action in list_action]
-            data = {'type': 'update', 'state': dict_state}
-            await websocket.send_json(data)
+            list_action = get_list_action('hangman', game)
+            await send_update(websocket, 'hangman', state, idx_player_you=idx_player_you, list_action=list_action)
 
             if state.phase == hangman.GamePhase.FINISHED:
+                await asyncio.to_thread(session_store.delete, session_id)
                 break
 
             if len(list_action) == 0:
-                game.apply_action(None)
+                apply_action('hangman', session_id, game, None)
             else:
                 data = await websocket.receive_json()
                 if data['type'] == 'action':
                     action = hangman.GuessLetterAction.model_validate(data['action'])
-                    game.apply_action(action)
-                    print(action)
+                    apply_action('hangman', session_id, game, action)
+            await asyncio.to_thread(session_store.save_game, session_id, 'hangman', game)
 
             continue
             state = game.get_player_view(idx_player_you)
@@ -84,7 +342,9 @@ async def hangman_singleplayer_ws(websocket: WebSocket):
             await websocket.send_json(data)
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        event_log.emit('disconnected', game='hangman', session_id=session_id)
+    finally:
+        finish_recording(session_id)
 
 
 # ----- Battleship -----
@@ -95,8 +355,11 @@ async def battleship_simulation(request: Request):
 
 
 @app.websocket("/battleship/simulation/ws")
+@metrics.track_session("battleship")
 async def battleship_simulation_ws(websocket: WebSocket):
     await websocket.accept()
+    watchdog.tag(game='battleship')
+    session_id = new_session_id()
 
     idx_player_you = 0
 
@@ -107,17 +370,13 @@ async def battleship_simulation_ws(websocket: WebSocket):
         while True:
 
             state = game.get_state()
-            list_action = game.get_list_action()
+            list_action = get_list_action('battleship', game)
             action = None
             if len(list_action) > 0:
                 action = player.select_action(state, list_action)
 
-            dict_state = state.model_dump()
-            dict_state['idx_player_you'] = idx_player_you
-            dict_state['list_action'] = []
-            dict_state['selected_action'] = None if action is None else action.model_dump()
-            data = {'type': 'update', 'state': dict_state}
-            await websocket.send_json(data)
+            await send_update(websocket, 'battleship', state,
+                              idx_player_you=idx_player_you, list_action=[], selected_action=action)
 
             if state.phase == battleship.GamePhase.FINISHED:
                 break
@@ -126,10 +385,10 @@ async def battleship_simulation_ws(websocket: WebSocket):
 
             if data['type'] == 'action':
                 action = battleship.BattleshipAction.model_validate(data['action'])
-                game.apply_action(action)
+                apply_action('battleship', session_id, game, action)
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        event_log.emit('disconnected', game='battleship', session_id=session_id)
 
 
 @app.get("/battleship/singleplayer", response_class=HTMLResponse)
@@ -138,8 +397,11 @@ async def battleship_singleplayer(request: Request):
 
 
 @app.websocket("/battleship/singleplayer/ws")
+@metrics.track_session("battleship")
 async def battleship_singleplayer_ws(websocket: WebSocket):
     await websocket.accept()
+    watchdog.tag(game='battleship')
+    session_id = new_session_id()
 
     idx_player_you = 0
 
@@ -159,66 +421,100 @@ async def battleship_singleplayer_ws(websocket: WebSocket):
             if state.idx_player_active == idx_player_you:
 
                 state = game.get_player_view(idx_player_you)
-                list_action = game.get_list_action()
-                dict_state = state.model_dump()
-                dict_state['idx_player_you'] = idx_player_you
-                dict_state['list_action'] = [action.model_dump() for action in list_action]
-                data = {'type': 'update', 'state': dict_state}
-                await websocket.send_json(data)
+                list_action = get_list_action('battleship', game)
+                await send_update(websocket, 'battleship', state, idx_player_you=idx_player_you,
+                                  list_action=list_action)
 
                 if len(list_action) == 0:
-                    game.apply_action(None)
+                    apply_action('battleship', session_id, game, None)
                 else:
                     data = await websocket.receive_json()
                     if data['type'] == 'action':
                         action = battleship.BattleshipAction.model_validate(data['action'])
-                        game.apply_action(action)
-                        print(action)
+                        apply_action('battleship', session_id, game, action)
 
                 state = game.get_player_view(idx_player_you)
-                dict_state = state.model_dump()
-                dict_state['idx_player_you'] = idx_player_you
-                dict_state['list_action'] = []
-
-                data = {'type': 'update', 'state': dict_state}
-                await websocket.send_json(data)
+                await send_update(websocket, 'battleship', state, idx_player_you=idx_player_you, list_action=[])
 
             else:
 
                 state = game.get_player_view(state.idx_player_active)
-                list_action = game.get_list_action()
+                list_action = get_list_action('battleship', game)
                 action = player.select_action(state, list_action)
                 if action is not None:
                     await asyncio.sleep(1)
-                game.apply_action(action)
+                apply_action('battleship', session_id, game, action)
                 state = game.get_player_view(idx_player_you)
-                dict_state = state.model_dump()
-                dict_state['idx_player_you'] = idx_player_you
-                dict_state['list_action'] = []
-                data = {'type': 'update', 'state': dict_state}
-                await websocket.send_json(data)
+                await send_update(websocket, 'battleship', state, idx_player_you=idx_player_you, list_action=[])
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        event_log.emit('disconnected', game='battleship', session_id=session_id)
 
 
 # ----- UNO -----
 
+UNO_CNT_PLAYER = 4
+
+
+def create_uno_game() -> Game:
+    game = uno.Uno()
+    game.set_state(uno.GameState(cnt_player=UNO_CNT_PLAYER))
+    return game
+
+
+def get_uno_view(state: uno.GameState) -> uno.GameState:
+    """ Compact state for the client, it only draws the top card of the discard pile and the back of the draw pile """
+    return state.model_copy(update={
+        'list_card_draw': [uno.CARD_HIDDEN] if state.list_card_draw else [],
+        'list_card_discard': (state.list_card_discard or [])[-1:]})
+
+
+def select_uno_action(game: Game, player: Player) -> tuple[List[uno.Action], Optional[uno.Action]]:
+    """ Actions of the active player and the one a server-side player selects, called off the event loop """
+    state = game.get_state()
+    list_action = get_list_action('uno', game)
+    if len(list_action) == 0 or state.idx_player_active is None:
+        return list_action, None
+    return list_action, player.select_action(game.get_player_view(state.idx_player_active), list_action)
+
+
 @app.get("/uno/simulation/", response_class=HTMLResponse)
 async def uno_simulation(request: Request):
     return templates.TemplateResponse("game/uno/simulation.html", {"request": request})
 
 
 @app.websocket("/uno/simulation/ws")
+@metrics.track_session("uno")
 async def uno_simulation_ws(websocket: WebSocket):
     await websocket.accept()
+    watchdog.tag(game='uno')
+    session_id = new_session_id()
+
+    idx_player_you = 0
 
     try:
+        game = create_uno_game()
+        player = uno.RandomPlayer()
 
-        pass
+        while True:
+
+            state = game.get_state()
+            list_action, action = await asyncio.to_thread(select_uno_action, game, player)
+
+            await send_update(websocket, 'uno', get_uno_view(state),
+                              idx_player_you=idx_player_you, list_action=list_action, selected_action=action)
+
+            if state.phase == uno.GamePhase.FINISHED:
+                break
+
+            data = await websocket.receive_json()
+            if data['type'] == 'action':
+                action = uno.Action.model_validate(data['action'])
+                if action in list_action:  # else the actions are sent again
+                    apply_action('uno', session_id, game, action)
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        event_log.emit('disconnected', game='uno', session_id=session_id)
 
 
 @app.get("/uno/singleplayer", response_class=HTMLResponse)
@@ -227,27 +523,83 @@ async def uno_singleplayer(request: Request):
 
 
 @app.websocket("/uno/singleplayer/ws")
+@metrics.track_session("uno")
 async def uno_singleplayer_ws(websocket: WebSocket):
     await websocket.accept()
+    watchdog.tag(game='uno')
+
+    idx_player_you = 0
+    session_id = ''
 
     try:
+        session_id, game = await open_session(websocket, 'uno', create_uno_game)
+        player = uno.RandomPlayer()
 
-        pass
+        while True:
+            state = game.get_state()
+            if state.phase == uno.GamePhase.FINISHED:
+                await asyncio.to_thread(session_store.delete, session_id)
+                break
+
+            if state.idx_player_active == idx_player_you:
+                list_action = get_list_action('uno', game)
+                state = game.get_player_view(idx_player_you)
+                await send_update(websocket, 'uno', get_uno_view(state),
+                                  idx_player_you=idx_player_you, list_action=list_action)
+
+                data = await websocket.receive_json()
+                if data['type'] == 'action':
+                    action = uno.Action.model_validate(data['action'])
+                    if action in list_action:  # else the actions are sent again
+                        apply_action('uno', session_id, game, action)
+                await asyncio.to_thread(session_store.save_game, session_id, 'uno', game)
+
+            else:
+
+                _, action_bot = await asyncio.to_thread(select_uno_action, game, player)
+                if action_bot is None:
+                    break  # the bot has no action, the game can not go on
+                await asyncio.sleep(1)
+                apply_action('uno', session_id, game, action_bot)
+                await asyncio.to_thread(session_store.save_game, session_id, 'uno', game)
+
+            state = game.get_player_view(idx_player_you)
+            await send_update(websocket, 'uno', get_uno_view(state), idx_player_you=idx_player_you, list_action=[])
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        event_log.emit('disconnected', game='uno', session_id=session_id)
+    finally:
+        finish_recording(session_id)
 
 
 @app.websocket("/uno/random_player/ws")
-async def uno_random_player_ws(websocket: WebSocket):
+@metrics.track_session("uno")
+async def uno_random_player_ws(websocket: WebSocket) -> None:
     await websocket.accept()
+    watchdog.tag(game='uno')
+    session_id = new_session_id()
 
     try:
+        game = create_uno_game()
+        players = [uno.RandomPlayer() for _ in range(UNO_CNT_PLAYER)]
+
+        while True:
+            state = game.get_state()
+            player = players[state.idx_player_active or 0]
+            list_action, action = await asyncio.to_thread(select_uno_action, game, player)
+
+            if action is not None:
+                apply_action('uno', session_id, game, action)
+            state = game.get_state()  # brings the card lists of the state up to date
+
+            await send_update(websocket, 'uno', get_uno_view(state), list_action=list_action, selected_action=action)
 
-        pass
+            if state.phase == uno.GamePhase.FINISHED:
+                break
+            await asyncio.sleep(0)  # let the other connections run between the moves
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        event_log.emit('disconnected', game='uno', session_id=session_id)
 
 
 # ----- Dog -----
@@ -257,32 +609,37 @@ async def dog_simulation(request: Request):
     return templates.TemplateResponse("game/dog/simulation.html", {"request": request})
 
 
+@app.get("/dog/board.json")
+async def dog_board_json() -> Response:
+    return Response(content=DOG_BOARD_JSON, media_type='application/json')
+
+
 @app.websocket("/dog/simulation/ws")
+@metrics.track_session("dog")
 async def dog_simulation_ws(websocket: WebSocket):
     await websocket.accept()
+    watchdog.tag(game='dog')
+    session_id = new_session_id()
 
     idx_player_you = 0 # identify player (0-3 --> player 1)
 
     try:
         game = dog.Dog() # game instance for dog
+        start_recording('dog', session_id, game)
         player = dog.RandomPlayer() # player instance for dog
 
         while True:
             # checking game state, possible actions --> updates client
             state = game.get_state()
-            list_action = game.get_list_action()
+            list_action = get_list_action('dog', game)
 
             # Check for valid actions
             action = None
             if len(list_action) > 0:
                 action = player.select_action(state, list_action)
 
-            dict_state = state.model_dump()
-            dict_state['idx_player_you'] = idx_player_you
-            dict_state['list_action'] = [action.model_dump() for action in list_action]
-            dict_state['selected_action'] = None if action is None else action.model_dump()
-            data = {'type': 'update', 'state': dict_state}
-            await websocket.send_json(data)
+            await send_update(websocket, 'dog', state,
+                              idx_player_you=idx_player_you, list_action=list_action, selected_action=action)
 
             # Check for Game End
             if state.phase == dog.GamePhase.FINISHED:
@@ -291,10 +648,12 @@ async def dog_simulation_ws(websocket: WebSocket):
             data = await websocket.receive_json()
             if data['type'] == 'action':
                 action = dog.Action.model_validate(data['action'])
-                game.apply_action(action)
+                apply_action('dog', session_id, game, action)
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        event_log.emit('disconnected', game='dog', session_id=session_id)
+    finally:
+        finish_recording(session_id)
 
 
 @app.get("/dog/singleplayer", response_class=HTMLResponse)
@@ -303,76 +662,75 @@ async def dog_singleplayer(request: Request):
 
 
 @app.websocket("/dog/singleplayer/ws")
+@metrics.track_session("dog")
 async def dog_singleplayer_ws(websocket: WebSocket):
     await websocket.accept()
+    watchdog.tag(game='dog')
 
     idx_player_you = 0
+    session_id = ''
 
     try:
-        game = dog.Dog()
+        session_id, game = await open_session(websocket, 'dog', dog.Dog)
         player = dog.RandomPlayer()
 
         while True:
             state = game.get_state()
             if state.phase == dog.GamePhase.FINISHED:
+                await asyncio.to_thread(session_store.delete, session_id)
                 break
-            
+
             # New player's turn
             if state.idx_player_active == idx_player_you:
                 state = game.get_player_view(idx_player_you)
-                list_action = game.get_list_action()
-                dict_state = state.model_dump()
-                dict_state['idx_player_you'] = idx_player_you
-                dict_state['list_action'] = [action.model_dump() for action in list_action]
-                data = {'type': 'update', 'state': dict_state}
-                await websocket.send_json(data)
+                list_action = get_list_action('dog', game)
+                await send_update(websocket, 'dog', state, idx_player_you=idx_player_you, list_action=list_action)
 
                 # handle the input given from player
                 if len(list_action) > 0:
                     data = await websocket.receive_json()
                     if data['type'] == 'action':
                         action = dog.Action.model_validate(data['action'])
-                        game.apply_action(action)
+                        apply_action('dog', session_id, game, action)
+                await asyncio.to_thread(session_store.save_game, session_id, 'dog', game)
 
                 state = game.get_player_view(idx_player_you)
-                dict_state = state.model_dump()
-                dict_state['idx_player_you'] = idx_player_you
-                dict_state['list_action'] = []
-
-                data = {'type': 'update', 'state': dict_state}
-                await websocket.send_json(data)
+                await send_update(websocket, 'dog', state, idx_player_you=idx_player_you, list_action=[])
 
             else:
 
                 state = game.get_player_view(state.idx_player_active)
-                list_action = game.get_list_action()
+                list_action = get_list_action('dog', game)
                 action = player.select_action(state, list_action)
                 if action is not None:
                     await asyncio.sleep(1)
-                game.apply_action(action)
+                apply_action('dog', session_id, game, action)
+                await asyncio.to_thread(session_store.save_game, session_id, 'dog', game)
                 state = game.get_player_view(idx_player_you)
-                dict_state = state.model_dump()
-                dict_state['idx_player_you'] = idx_player_you
-                dict_state['list_action'] = []
-                data = {'type': 'update', 'state': dict_state}
-                await websocket.send_json(data)
+                await send_update(websocket, 'dog', state, idx_player_you=idx_player_you, list_action=[])
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        event_log.emit('disconnected', game='dog', session_id=session_id)
+    finally:
+        finish_recording(session_id)
 
 
 @app.websocket("/dog/random_player/ws")
+@metrics.track_session("dog")
 async def dog_random_player_ws(websocket: WebSocket):
     await websocket.accept()
+    watchdog.tag(game='dog')
+    session_id = new_session_id()
 
     try:
         game = dog.Dog()
+        start_recording('dog', session_id, game)
         players = [dog.RandomPlayer() for _ in range(4)] # 4 random players
 
         while True:
             #Get current game state
             state = game.get_state()
-            list_action = game.get_list_action()
+            list_action = get_list_action('dog', game)
 
             # Check for valid actions
             action = None
@@ -383,18 +741,17 @@ async def dog_random_player_ws(websocket: WebSocket):
 
             # Apply selected action to the game
             if action is not None:
-                game.apply_action(action)
+                apply_action('dog', session_id, game, action)
 
-            # Prepare state update for the client
-            dict_state = state.model_dump()
-            dict_state['list_action'] = [action.model_dump() for action in list_action]
-            dict_state['selected_action'] = None if action is None else action.model_dump()
-            await websocket.send_json({'type': 'update', 'state': dict_state})
+            # Send state update to the client
+            await send_update(websocket, 'dog', state, list_action=list_action, selected_action=action)
 
             # Check for Game End
             if state.phase == dog.GamePhase.FINISHED:
-                await websocket.send_json({'type': 'update', 'state': dict_state})
+                await send_update(websocket, 'dog', state, list_action=list_action, selected_action=action)
                 break
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        event_log.emit('disconnected', game='dog', session_id=session_id)
+    finally:
+        finish_recording(session_id)
@@ -0,0 +1,185 @@
+import bisect
+import functools
+import threading
+import time
+from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# latency buckets in seconds, from 50us (hangman move) to 2.5s (stalled event loop)
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Metric(metaclass=ABCMeta):
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric '{self.name}' expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """ Get the sample lines in the Prometheus text format """
+
+    def render(self) -> str:
+        """ Get HELP, TYPE and sample lines of this metric """
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """ Increase the counter by a non-negative amount """
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        idx_bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[idx_bucket] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """ Observe the wall time spent in the with block """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get_count(self, **labels: str) -> int:
+        return sum(self._counts.get(self._label_values(labels), []))
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+        for key, counts, total in items:
+            cumulative = 0
+            for upper, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(upper)}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}')
+        return lines
+
+
+class Registry:
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """ Get all metrics in the Prometheus text exposition format (version 0.0.4) """
+        return '\n'.join(metric.render() for metric in self._metrics.values()) + '\n'
+
+
+REGISTRY = Registry()
+
+SESSIONS_ACTIVE: Gauge = REGISTRY.register(Gauge(
+    'game_sessions_active', 'Number of open game websocket sessions', ('game',)))
+SESSIONS_TOTAL: Counter = REGISTRY.register(Counter(
+    'game_sessions_total', 'Number of game websocket sessions started', ('game',)))
+MOVES_TOTAL: Counter = REGISTRY.register(Counter(
+    'game_moves_total', 'Number of applied actions, use rate() for moves per second', ('game',)))
+GET_LIST_ACTION_SECONDS: Histogram = REGISTRY.register(Histogram(
+    'game_get_list_action_seconds', 'Latency of Game.get_list_action', ('game',)))
+APPLY_ACTION_SECONDS: Histogram = REGISTRY.register(Histogram(
+    'game_apply_action_seconds', 'Latency of Game.apply_action', ('game',)))
+SEND_SECONDS: Histogram = REGISTRY.register(Histogram(
+    'game_send_seconds', 'Latency of model_dump plus websocket send of a state update', ('game',)))
+SENDS_IN_FLIGHT: Gauge = REGISTRY.register(Gauge(
+    'game_websocket_sends_in_flight', 'Number of state updates being serialised or sent right now', ('game',)))
+EVENT_LOOP_LAG_SECONDS: Histogram = REGISTRY.register(Histogram(
+    'event_loop_lag_seconds', 'Delay of a scheduled wake-up of the asyncio event loop'))
+EVENT_LOOP_STALLS_TOTAL: Counter = REGISTRY.register(Counter(
+    'event_loop_stalls_total', 'Number of times a handler blocked the event loop longer than the threshold', ('game',)))
+
+
+def track_session(game_type: str) -> Callable[[Callable[..., Awaitable[None]]], Callable[..., Awaitable[None]]]:
+    """ Decorator for websocket handlers counting started and active sessions of a game """
+    def decorator(handler: Callable[..., Awaitable[None]]) -> Callable[..., Awaitable[None]]:
+        @functools.wraps(handler)
+        async def wrapper(*args: Any, **kwargs: Any) -> None:
+            SESSIONS_TOTAL.inc(game=game_type)
+            SESSIONS_ACTIVE.inc(game=game_type)
+            try:
+                await handler(*args, **kwargs)
+            finally:
+                SESSIONS_ACTIVE.dec(game=game_type)
+        return wrapper
+    return decorator
@@ -0,0 +1,168 @@
+import functools
+import json
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from server.py.game import Game
+
+PROFILED_METHODS = ('get_list_action', 'apply_action', 'get_player_view', 'get_state')
+
+
+class MethodStats:
+
+    def __init__(self) -> None:
+        self.cnt_call = 0  # number of sampled calls
+        self.seconds_total = 0.0  # wall time of the sampled calls
+        self.seconds_max = 0.0  # slowest sampled call
+        self.cnt_block = 0  # net number of memory blocks allocated by the sampled calls
+        self.bytes_peak = 0  # largest traced memory peak of a call (only with track_memory)
+
+    def add(self, seconds: float, cnt_block: int, bytes_peak: int) -> None:
+        self.cnt_call += 1
+        self.seconds_total += seconds
+        self.seconds_max = max(self.seconds_max, seconds)
+        self.cnt_block += cnt_block
+        self.bytes_peak = max(self.bytes_peak, bytes_peak)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'cnt_call': self.cnt_call,
+            'seconds_total': self.seconds_total,
+            'seconds_mean': self.seconds_total / self.cnt_call if self.cnt_call else 0.0,
+            'seconds_max': self.seconds_max,
+            'cnt_block': self.cnt_block,
+            'bytes_peak': self.bytes_peak,
+        }
+
+
+class GameProfiler:
+    """
+    Samples the Game interface methods of attached game classes.
+    Attaching patches the class, so games that are already running are profiled as well.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._originals: Dict[Tuple[type, str], Callable[..., Any]] = {}
+        self._sample_rates: Dict[type, float] = {}
+        self._stats: Dict[Tuple[str, str], MethodStats] = {}
+        self.track_memory = False
+
+    def is_attached(self, game_class: Type[Game]) -> bool:
+        return game_class in self._sample_rates
+
+    def attach(self, game_class: Type[Game], sample_rate: float = 1.0, track_memory: bool = False) -> None:
+        """ Start sampling the given share (0 to 1) of calls, or change the rate if already attached """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f'Sample rate must be between 0 and 1, got {sample_rate}')
+        with self._lock:
+            self._sample_rates[game_class] = sample_rate
+            if track_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self.track_memory = self.track_memory or track_memory
+            for method_name in PROFILED_METHODS:
+                if (game_class, method_name) not in self._originals:
+                    method = getattr(game_class, method_name)
+                    self._originals[(game_class, method_name)] = method
+                    setattr(game_class, method_name, self._wrap(game_class, method_name, method))
+
+    def detach(self, game_class: Type[Game]) -> None:
+        """ Restore the original methods of the game class (collected stats are kept) """
+        with self._lock:
+            self._sample_rates.pop(game_class, None)
+            for method_name in PROFILED_METHODS:
+                method = self._originals.pop((game_class, method_name), None)
+                if method is not None:
+                    setattr(game_class, method_name, method)
+            if not self._sample_rates and self.track_memory:
+                self.track_memory = False
+                tracemalloc.stop()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+
+    def _wrap(self, game_class: type, method_name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        key = (f'{game_class.__module__.rsplit(".", 1)[-1]}.{game_class.__name__}', method_name)
+
+        @functools.wraps(method)
+        def wrapper(game: Game, *args: Any, **kwargs: Any) -> Any:
+            # nested interface calls (e.g. get_state inside apply_action) are part of the outer sample
+            if getattr(self._local, 'active', False) or random.random() >= self._sample_rates.get(game_class, 0.0):
+                return method(game, *args, **kwargs)
+            self._local.active = True
+            track_memory = self.track_memory and tracemalloc.is_tracing()
+            bytes_start = 0
+            if track_memory:
+                tracemalloc.reset_peak()
+                bytes_start = tracemalloc.get_traced_memory()[0]
+            cnt_block_start = sys.getallocatedblocks()
+            start = time.perf_counter()
+            try:
+                return method(game, *args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                cnt_block = sys.getallocatedblocks() - cnt_block_start
+                bytes_peak = tracemalloc.get_traced_memory()[1] - bytes_start if track_memory else 0
+                self._local.active = False
+                with self._lock:
+                    stats = self._stats.get(key)
+                    if stats is None:
+                        stats = self._stats[key] = MethodStats()
+                    stats.add(seconds, cnt_block, bytes_peak)
+        return wrapper
+
+    def summary(self) -> Dict[str, Any]:
+        """ Get the collected stats as JSON-serialisable dict {game: {method: stats}} """
+        with self._lock:
+            items = sorted(self._stats.items())
+        result: Dict[str, Any] = {
+            'attached': {f'{cls.__module__.rsplit(".", 1)[-1]}.{cls.__name__}': rate
+                         for cls, rate in self._sample_rates.items()},
+            'games': {},
+        }
+        for (game_name, method_name), stats in items:
+            result['games'].setdefault(game_name, {})[method_name] = stats.to_dict()
+        return result
+
+    def to_json(self) -> str:
+        return json.dumps(self.summary(), indent=2)
+
+    def to_collapsed(self) -> str:
+        """ Get the wall time in microseconds in the collapsed stack format of flamegraph.pl / speedscope """
+        with self._lock:
+            items = sorted(self._stats.items())
+        lines: List[str] = []
+        for (game_name, method_name), stats in items:
+            lines.append(f'{game_name};{method_name} {round(stats.seconds_total * 1e6)}')
+        return '\n'.join(lines) + '\n'
+
+
+PROFILER = GameProfiler()
+
+
+def parse_profile_config(config: str) -> Dict[str, float]:
+    """ Parse a config like 'dog:0.1,hangman' (sample rate defaults to 1) into {game_type: sample_rate} """
+    result: Dict[str, float] = {}
+    for item in config.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        game_type, _, rate = item.partition(':')
+        result[game_type.strip()] = float(rate) if rate else 1.0
+    return result
+
+
+def attach_from_config(config: Optional[str], game_classes: Dict[str, Type[Game]], track_memory: bool = False) -> None:
+    """ Attach the profiler to the game types listed in the config (see parse_profile_config) """
+    if not config:
+        return
+    for game_type, sample_rate in parse_profile_config(config).items():
+        if game_type not in game_classes:
+            raise ValueError(f"Unknown game type '{game_type}' in profile config")
+        PROFILER.attach(game_classes[game_type], sample_rate, track_memory)
@@ -0,0 +1,373 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import uuid
+from abc import ABCMeta, abstractmethod
+from array import array
+from collections import Counter
+from typing import Any, ClassVar, Dict, Iterator, List, Optional, Tuple, Union
+
+from server.py import dog, hangman, session
+from server.py.game import Game
+
+# file:   FILE_HEADER, then records appended one after the other
+# record: RECORD_HEADER, init bytes (e.g. deck order), cnt_action * action_size bytes
+FILE_HEADER = struct.Struct('<4sH')  # magic, version
+RECORD_HEADER = struct.Struct('<IB16sQHI')  # record size, game type, game id, seed, init size, number of actions
+OFFSET_GAME_ID = struct.calcsize('<IB')  # of the game id in RECORD_HEADER
+MAGIC = b'GRPL'
+VERSION = 1
+NONE = 0xFF  # encodes None for card and position bytes
+SNAPSHOT_INTERVAL = 32  # moves between the snapshots of a ReplayIndex
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class ReplayCodec(metaclass=ABCMeta):
+    game_type: ClassVar[int]  # stored in the record header
+    action_size: ClassVar[int]  # bytes per encoded action
+
+    @abstractmethod
+    def encode_init(self, game: Game) -> bytes:
+        """ Encode what is needed besides the seed to rebuild the freshly created game """
+
+    @abstractmethod
+    def new_game(self, seed: int, init: Buffer) -> Game:
+        """ Rebuild the game as it was before the first action """
+
+    @abstractmethod
+    def encode_action(self, action: Any) -> bytes:
+        """ Encode an action (or None) into action_size bytes """
+
+    @abstractmethod
+    def decode_action(self, data: Buffer) -> Any:
+        """ Decode action_size bytes into an action (or None) """
+
+
+class DogCodec(ReplayCodec):
+    """ Cards as suit index * 16 + rank index, actions as 4 bytes: card, pos_from, pos_to, card_swap """
+    game_type = 1
+    action_size = 4
+    LIST_SUIT: ClassVar[List[str]] = dog.GameState.LIST_SUIT + ['']
+
+    def __init__(self) -> None:
+        self.list_card: List[Optional[dog.Card]] = [None] * 256
+        self.dict_card_code: Dict[tuple[str, str], int] = {}
+        for idx_suit, suit in enumerate(self.LIST_SUIT):
+            for idx_rank, rank in enumerate(dog.GameState.LIST_RANK):
+                code = idx_suit * 16 + idx_rank
+                self.list_card[code] = dog.Card(suit=suit, rank=rank)
+                self.dict_card_code[(suit, rank)] = code
+
+    def encode_card(self, card: Optional[dog.Card]) -> int:
+        return NONE if card is None else self.dict_card_code[(card.suit, card.rank)]
+
+    def decode_card(self, code: int) -> Optional[dog.Card]:
+        card = self.list_card[code]
+        return None if card is None else card.model_copy()
+
+    def encode_init(self, game: Game) -> bytes:
+        assert isinstance(game, dog.Dog)
+        list_card = [card for player in game.state.list_player for card in player.list_card]
+        return bytes(self.encode_card(card) for card in list_card + game.state.list_card_draw)
+
+    def new_game(self, seed: int, init: Buffer) -> Game:
+        return dog.Dog(seed=seed, list_card=[card for card in map(self.decode_card, init) if card is not None])
+
+    def encode_action(self, action: Any) -> bytes:
+        if action is None:
+            return bytes((NONE, NONE, NONE, NONE))
+        return bytes((
+            self.encode_card(action.card),
+            NONE if action.pos_from is None else action.pos_from,
+            NONE if action.pos_to is None else action.pos_to,
+            self.encode_card(action.card_swap),
+        ))
+
+    def decode_action(self, data: Buffer) -> Any:
+        card = self.decode_card(data[0])
+        if card is None:
+            return None
+        return dog.Action(
+            card=card,
+            pos_from=None if data[1] == NONE else data[1],
+            pos_to=None if data[2] == NONE else data[2],
+            card_swap=self.decode_card(data[3]),
+        )
+
+
+class HangmanCodec(ReplayCodec):
+    """ The word as utf-8, actions as 1 byte: index of the letter in the alphabet """
+    game_type = 2
+    action_size = 1
+
+    def encode_init(self, game: Game) -> bytes:
+        assert isinstance(game, hangman.Hangman)
+        return game.get_state().word_to_guess.encode('utf-8')
+
+    def new_game(self, seed: int, init: Buffer) -> Game:
+        game = hangman.Hangman()
+        word_to_guess = bytes(init).decode('utf-8')
+        game.set_state(hangman.HangmanGameState(
+            word_to_guess=word_to_guess, phase=hangman.GamePhase.RUNNING, guesses=[], incorrect_guesses=[]))
+        return game
+
+    def encode_action(self, action: Any) -> bytes:
+        return bytes((NONE if action is None else ord(action.letter.upper()) - ord('A'),))
+
+    def decode_action(self, data: Buffer) -> Any:
+        return None if data[0] == NONE else hangman.GUESS_ACTIONS[data[0]]
+
+
+CODECS: Dict[str, ReplayCodec] = {'dog': DogCodec(), 'hangman': HangmanCodec()}
+GAME_TYPES: Dict[int, str] = {codec.game_type: name for name, codec in CODECS.items()}
+
+
+class ReplayRecorder:
+    """ Collects the actions of one game, must be created before the first action is applied """
+
+    def __init__(self, game_type: str, game: Game, game_id: Optional[str] = None) -> None:
+        self.game_type = game_type
+        self.codec = CODECS[game_type]
+        self.game_id = uuid.UUID(hex=game_id) if game_id is not None else uuid.uuid4()
+        self.seed = getattr(game, 'seed', 0)
+        self.init = self.codec.encode_init(game)
+        self.actions = bytearray()
+
+    def record(self, action: Any) -> None:
+        self.actions += self.codec.encode_action(action)
+
+    def to_bytes(self) -> bytes:
+        size = RECORD_HEADER.size + len(self.init) + len(self.actions)
+        header = RECORD_HEADER.pack(size, self.codec.game_type, self.game_id.bytes, self.seed, len(self.init),
+                                    len(self.actions) // self.codec.action_size)
+        return header + self.init + bytes(self.actions)
+
+
+class ReplayLog:
+    """ Append-only file of recorded games, safe to share between processes on one host """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return
+        try:
+            os.write(fd, FILE_HEADER.pack(MAGIC, VERSION))
+        finally:
+            os.close(fd)
+
+    def append(self, recorder: ReplayRecorder) -> None:
+        """ Append the game with a single write, so records of concurrent writers do not interleave """
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        try:
+            os.write(fd, recorder.to_bytes())
+        finally:
+            os.close(fd)
+
+
+class ReplayRecord:
+    """ One record of a replay log, copies its bytes out of the buffer so it outlives the reader """
+
+    def __init__(self, buffer: memoryview, offset: int) -> None:
+        size, game_type, game_id, seed, size_init, cnt_action = RECORD_HEADER.unpack_from(buffer, offset)
+        self.offset = offset
+        self.size = size
+        self.game_type = GAME_TYPES[game_type]
+        self.game_id = uuid.UUID(bytes=game_id).hex
+        self.seed = seed
+        self.cnt_action = cnt_action
+        start_init = offset + RECORD_HEADER.size
+        self.init = bytes(buffer[start_init:start_init + size_init])
+        self.actions = bytes(buffer[start_init + size_init:offset + size])
+
+    @property
+    def codec(self) -> ReplayCodec:
+        return CODECS[self.game_type]
+
+    def get_action(self, idx_action: int) -> Any:
+        action_size = self.codec.action_size
+        return self.codec.decode_action(self.actions[idx_action * action_size:(idx_action + 1) * action_size])
+
+    def replay(self, idx_move: Optional[int] = None) -> Game:
+        """ Rebuild the game after the first idx_move actions (all actions if None) """
+        game = self.codec.new_game(self.seed, self.init)
+        for idx_action in range(self.cnt_action if idx_move is None else min(idx_move, self.cnt_action)):
+            game.apply_action(self.get_action(idx_action))
+        return game
+
+
+class ReplayIndex:
+    """
+    Snapshots of a recorded game every `interval` moves, built in one pass over the record.
+    Seeking replays at most interval - 1 actions on top of the nearest snapshot.
+    """
+
+    def __init__(self, record: ReplayRecord, interval: int = SNAPSHOT_INTERVAL) -> None:
+        self.game_id = record.game_id
+        self.game_type = record.game_type
+        self.codec = record.codec
+        self.cnt_action = record.cnt_action
+        self.interval = interval
+        self.actions = record.actions
+        self.list_snapshot: List[bytes] = []
+        game = record.codec.new_game(record.seed, record.init)
+        for idx_action in range(self.cnt_action + 1):
+            if idx_action % interval == 0:
+                self.list_snapshot.append(session.dump_snapshot(self.game_type, game))
+            if idx_action < self.cnt_action:
+                game.apply_action(self.get_action(idx_action))
+
+    def get_action(self, idx_action: int) -> Any:
+        action_size = self.codec.action_size
+        return self.codec.decode_action(self.actions[idx_action * action_size:(idx_action + 1) * action_size])
+
+    def seek(self, idx_move: int) -> Game:
+        """ Rebuild the game after the first idx_move actions """
+        idx_move = max(0, min(idx_move, self.cnt_action))
+        idx_snapshot = idx_move // self.interval
+        game = session.load_snapshot(self.game_type, self.list_snapshot[idx_snapshot])
+        for idx_action in range(idx_snapshot * self.interval, idx_move):
+            game.apply_action(self.get_action(idx_action))
+        return game
+
+    def iter_moves(self, idx_move: int) -> Iterator[Tuple[int, Any, Game]]:
+        """ Yield (idx_move, action leading there, game) from the given move to the end of the game """
+        idx_move = max(0, min(idx_move, self.cnt_action))
+        game = self.seek(idx_move)
+        yield idx_move, self.get_action(idx_move - 1) if idx_move > 0 else None, game
+        for idx_action in range(idx_move, self.cnt_action):
+            action = self.get_action(idx_action)
+            game.apply_action(action)
+            yield idx_action + 1, action, game
+
+
+class ReplayReader:
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'rb')  # pylint: disable=consider-using-with
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        magic, version = FILE_HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{path}' is not a replay log (version {VERSION})")
+        self._offsets = array('Q')
+        offset = FILE_HEADER.size
+        while offset + RECORD_HEADER.size <= len(self._buffer):
+            size = struct.unpack_from('<I', self._buffer, offset)[0]
+            if size < RECORD_HEADER.size or offset + size > len(self._buffer):
+                break  # record still being written
+            self._offsets.append(offset)
+            offset += size
+
+    def __enter__(self) -> 'ReplayReader':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._buffer.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, idx: int) -> ReplayRecord:
+        return ReplayRecord(self._buffer, self._offsets[idx])
+
+    def __iter__(self) -> Iterator[ReplayRecord]:
+        """ Records with copies of their bytes, scans use find and get_stats which do not copy """
+        for offset in self._offsets:
+            yield ReplayRecord(self._buffer, offset)
+
+    def find(self, game_id: str) -> Optional[ReplayRecord]:
+        """ Get the last record of the game with the given id, only this record is copied out of the log """
+        try:
+            game_id_bytes = uuid.UUID(hex=game_id).bytes
+        except ValueError:
+            return None
+        buffer = self._buffer
+        for offset in reversed(self._offsets):
+            if buffer[offset + OFFSET_GAME_ID:offset + OFFSET_GAME_ID + 16] == game_id_bytes:
+                return ReplayRecord(buffer, offset)
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ Count games, actions and (for dog) played card ranks from the headers and actions in the mapping """
+        stats: Dict[str, Dict[str, Any]] = {}
+        cnt_card_code: Counter[int] = Counter()
+        buffer = self._buffer
+        for offset in self._offsets:
+            size, game_type, _, _, size_init, cnt_action = RECORD_HEADER.unpack_from(buffer, offset)
+            game_stats = stats.setdefault(GAME_TYPES[game_type], {'cnt_game': 0, 'cnt_action': 0, 'cnt_action_max': 0})
+            game_stats['cnt_game'] += 1
+            game_stats['cnt_action'] += cnt_action
+            game_stats['cnt_action_max'] = max(game_stats['cnt_action_max'], cnt_action)
+            if GAME_TYPES[game_type] == 'dog':  # the first byte of each action is the card code
+                start_actions = offset + RECORD_HEADER.size + size_init
+                cnt_card_code.update(buffer[start_actions:offset + size:DogCodec.action_size])
+        for game_stats in stats.values():
+            game_stats['cnt_action_mean'] = game_stats['cnt_action'] / game_stats['cnt_game']
+        if 'dog' in stats:
+            cnt_rank: Counter[str] = Counter()
+            for code, cnt in cnt_card_code.items():
+                cnt_rank['none' if code == NONE else dog.GameState.LIST_RANK[code & 0x0F]] += cnt
+            stats['dog']['cnt_card_rank'] = dict(cnt_rank)
+        return stats
+
+
+def record_random_games(path: str, cnt_game: int, cnt_action_max: int = 2000, seed: int = 0) -> int:
+    """
+    Headless runner: play Dog games with random players and append them to the replay log.
+    Games in which the engine raises are not recorded, their number is returned.
+    """
+    log = ReplayLog(path)
+    rng = random.Random(seed)
+    player = dog.RandomPlayer()
+    cnt_failed = 0
+    for _ in range(cnt_game):
+        game = dog.Dog(seed=rng.getrandbits(63))
+        recorder = ReplayRecorder('dog', game)
+        try:
+            for _ in range(cnt_action_max):
+                if game.get_state().phase == dog.GamePhase.FINISHED:
+                    break
+                action = player.select_action(game.get_state(), game.get_list_action())
+                game.apply_action(action)
+                recorder.record(action)
+        except (ValueError, IndexError):
+            cnt_failed += 1
+            continue
+        log.append(recorder)
+    return cnt_failed
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Record, inspect and replay games')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    parser_record = subparsers.add_parser('record', help='record Dog games of random players')
+    parser_record.add_argument('path')
+    parser_record.add_argument('cnt_game', type=int)
+    parser_stats = subparsers.add_parser('stats', help='print statistics of a replay log')
+    parser_stats.add_argument('path')
+    parser_replay = subparsers.add_parser('replay', help='print the state of a game after a number of moves')
+    parser_replay.add_argument('path')
+    parser_replay.add_argument('idx_game', type=int)
+    parser_replay.add_argument('idx_move', type=int, nargs='?')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        CNT_FAILED = record_random_games(args.path, args.cnt_game)
+        print(f'recorded {args.cnt_game - CNT_FAILED} games, {CNT_FAILED} failed')
+    elif args.command == 'stats':
+        with ReplayReader(args.path) as reader:
+            print(reader.get_stats())
+    else:
+        with ReplayReader(args.path) as reader:
+            reader[args.idx_game].replay(args.idx_move).print_state()
@@ -0,0 +1,199 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABCMeta, abstractmethod
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from server.py import dog, hangman, uno
+from server.py.game import Game
+
+
+class SessionRecord(BaseModel):
+    session_id: str  # id handed out to the client, used to reconnect
+    game_type: str  # key into SNAPSHOT_CODECS (e.g. "dog")
+    owner: str  # worker that wrote the last snapshot (host:pid)
+    updated: float  # unix timestamp of the last save
+    snapshot: bytes  # compressed game snapshot (see dump_snapshot)
+
+
+def _dump_dog(game: Game) -> Dict[str, Any]:
+    assert isinstance(game, dog.Dog)
+    return {
+        'seed': game.seed,  # later reshuffles of the deck depend on the seed
+        'state': game.state.model_dump(mode='json', exclude_defaults=True),
+        'card_seven_metadata': game.card_seven_metadata.model_dump(mode='json'),
+    }
+
+
+def _load_dog(data: Dict[str, Any]) -> Game:
+    game = dog.Dog(seed=data.get('seed'))
+    game.set_state(dog.GameState.model_validate(data['state']))
+    game.card_seven_metadata = dog.CardSevenMetadata.model_validate(data['card_seven_metadata'])
+    return game
+
+
+def _dump_hangman(game: Game) -> Dict[str, Any]:
+    assert isinstance(game, hangman.Hangman)
+    state = game.get_state()
+    # incorrect_guesses is derived from word and guesses, set_state rebuilds it
+    return {'word_to_guess': state.word_to_guess, 'phase': state.phase.value, 'guesses': list(state.guesses)}
+
+
+def _load_hangman(data: Dict[str, Any]) -> Game:
+    game = hangman.Hangman()
+    game.set_state(hangman.HangmanGameState(
+        word_to_guess=data['word_to_guess'],
+        phase=hangman.GamePhase(data['phase']),
+        guesses=data['guesses'],
+        incorrect_guesses=[]))
+    return game
+
+
+def _dump_uno(game: Game) -> Dict[str, Any]:
+    assert isinstance(game, uno.Uno)
+    return {'state': game.get_state().model_dump(mode='json', exclude_defaults=True)}
+
+
+def _load_uno(data: Dict[str, Any]) -> Game:
+    game = uno.Uno()
+    game.set_state(uno.GameState.model_validate(data['state']))  # a running state is imported, not dealt again
+    return game
+
+
+SNAPSHOT_CODECS: Dict[str, Tuple[Callable[[Game], Dict[str, Any]], Callable[[Dict[str, Any]], Game]]] = {
+    'dog': (_dump_dog, _load_dog),
+    'hangman': (_dump_hangman, _load_hangman),
+    'uno': (_dump_uno, _load_uno),
+}
+
+
+def dump_snapshot(game_type: str, game: Game) -> bytes:
+    """ Serialise a running game into a compact, compressed snapshot """
+    dump, _ = SNAPSHOT_CODECS[game_type]
+    payload = json.dumps(dump(game), separators=(',', ':'), ensure_ascii=False)
+    return zlib.compress(payload.encode('utf-8'))
+
+
+def load_snapshot(game_type: str, snapshot: bytes) -> Game:
+    """ Rebuild a game instance from a snapshot created by dump_snapshot """
+    _, load = SNAPSHOT_CODECS[game_type]
+    return load(json.loads(zlib.decompress(snapshot).decode('utf-8')))
+
+
+def worker_id() -> str:
+    """ Identify the current worker process (used as owner of saved sessions) """
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def affinity_hint(session_id: str, cnt_worker: int) -> int:
+    """ Stable worker index for a session, so a load balancer can route reconnects to the same worker """
+    if cnt_worker <= 1:
+        return 0
+    return zlib.crc32(session_id.encode('utf-8')) % cnt_worker
+
+
+class SessionStore(metaclass=ABCMeta):
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        """ Get the stored session or None if it does not exist """
+
+    @abstractmethod
+    def save(self, record: SessionRecord) -> None:
+        """ Insert or replace a session """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """ Remove a session (e.g. when the game is finished) """
+
+    def save_game(self, session_id: str, game_type: str, game: Game) -> None:
+        """ Snapshot the game and store it under the given session id """
+        self.save(SessionRecord(
+            session_id=session_id,
+            game_type=game_type,
+            owner=worker_id(),
+            updated=time.time(),
+            snapshot=dump_snapshot(game_type, game)))
+
+    def load_game(self, session_id: str, game_type: str) -> Optional[Game]:
+        """ Restore the game of a session, None if unknown or of another game type """
+        record = self.load(session_id)
+        if record is None or record.game_type != game_type:
+            return None
+        return load_snapshot(game_type, record.snapshot)
+
+
+class MemorySessionStore(SessionStore):
+    """ Sessions live in this process only (single worker deployments) """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._records: Dict[str, SessionRecord] = {}
+
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        with self._lock:
+            return self._records.get(session_id)
+
+    def save(self, record: SessionRecord) -> None:
+        with self._lock:
+            self._records[record.session_id] = record
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._records.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """ Sessions in a SQLite file shared by all workers that can reach it """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS session ('
+                'session_id TEXT PRIMARY KEY, game_type TEXT NOT NULL, owner TEXT NOT NULL, '
+                'updated REAL NOT NULL, snapshot BLOB NOT NULL)')
+
+    def _connect(self) -> sqlite3.Connection:
+        connection: Optional[sqlite3.Connection] = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        row = self._connect().execute(
+            'SELECT session_id, game_type, owner, updated, snapshot FROM session WHERE session_id = ?',
+            (session_id,)).fetchone()
+        if row is None:
+            return None
+        return SessionRecord(session_id=row[0], game_type=row[1], owner=row[2], updated=row[3], snapshot=row[4])
+
+    def save(self, record: SessionRecord) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO session (session_id, game_type, owner, updated, snapshot) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (record.session_id, record.game_type, record.owner, record.updated, record.snapshot))
+
+    def delete(self, session_id: str) -> None:
+        with self._connect() as connection:
+            connection.execute('DELETE FROM session WHERE session_id = ?', (session_id,))
+
+
+def create_session_store(url: str) -> SessionStore:
+    """ Create a store from a url: 'memory' or 'sqlite:///path/to/sessions.db' """
+    if url in ('', 'memory'):
+        return MemorySessionStore()
+    if url.startswith('sqlite:///'):
+        return SQLiteSessionStore(url[len('sqlite:///'):])
+    raise ValueError(f"Unknown session store '{url}'")
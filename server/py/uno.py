@@ -1,22 +1,41 @@
-from server.py.game import Game, Player
-from typing import List, Optional
-from pydantic import BaseModel
-from enum import Enum
+from typing import ClassVar, Dict, List, Optional, Tuple
 import random
+from enum import Enum
+
+from pydantic import BaseModel, ConfigDict
+
+from server.py.game import Game, Player
 
 
 class Card(BaseModel):
+    model_config = ConfigDict(frozen=True)  # cards are shared between the states, see CARD_BY_ID
+
     color: Optional[str] = None   # color of the card (see LIST_COLOR)
     number: Optional[int] = None  # number of the card (if not a symbol card)
     symbol: Optional[str] = None  # special cards (see LIST_SYMBOL)
 
+    def get_sort_key(self) -> Tuple[str, int, str]:
+        return self.color or '', -1 if self.number is None else self.number, self.symbol or ''
+
+    def __lt__(self, card: "Card") -> bool:
+        return self.get_sort_key() < card.get_sort_key()
+
 
 class Action(BaseModel):
+    model_config = ConfigDict(frozen=True)  # the actions are shared, see get_action
+
     card: Optional[Card] = None  # the card to play
     color: Optional[str] = None  # the chosen color to play (for wild cards)
     draw: Optional[int] = None   # the number of cards to draw for the next player
     uno: bool = False            # true to announce "UNO" with the second last card
 
+    def get_sort_key(self) -> Tuple[Tuple[str, int, str], str, int, bool]:
+        card_key = self.card.get_sort_key() if self.card is not None else ('', -2, '')
+        return card_key, self.color or '', self.draw or 0, self.uno
+
+    def __lt__(self, action: "Action") -> bool:
+        return self.get_sort_key() < action.get_sort_key()
+
 
 class PlayerState(BaseModel):
     name: Optional[str] = None  # name of player
@@ -30,90 +49,390 @@ class GamePhase(str, Enum):
 
 
 class GameState(BaseModel):
+    # shared by all states and not serialised, the engine refers to the cards by id (see get_card_id)
     # numbers of cards for each player to start with
-    CNT_HAND_CARDS: int = 7
+    CNT_HAND_CARDS: ClassVar[int] = 7
     # any = for wild cards
-    LIST_COLOR: List[str] = ['red', 'green', 'yellow', 'blue', 'any']
+    LIST_COLOR: ClassVar[Tuple[str, ...]] = ('red', 'green', 'yellow', 'blue', 'any')
     # draw2 = draw two cards, wild = chose color, wilddraw4 = chose color and draw 4
-    LIST_SYMBOL: List[str] = ['skip', 'reverse', 'draw2', 'wild', 'wilddraw4']
-    LIST_CARD: List[Card] = [
-        Card(color='red', number=0), Card(color='green', number=0), Card(color='yellow', number=0), Card(color='blue', number=0),
-        Card(color='red', number=1), Card(color='green', number=1), Card(color='yellow', number=1), Card(color='blue', number=1),
-        Card(color='red', number=2), Card(color='green', number=2), Card(color='yellow', number=2), Card(color='blue', number=2),
-        Card(color='red', number=3), Card(color='green', number=3), Card(color='yellow', number=3), Card(color='blue', number=3),
-        Card(color='red', number=4), Card(color='green', number=4), Card(color='yellow', number=4), Card(color='blue', number=4),
-        Card(color='red', number=5), Card(color='green', number=5), Card(color='yellow', number=5), Card(color='blue', number=5),
-        Card(color='red', number=6), Card(color='green', number=6), Card(color='yellow', number=6), Card(color='blue', number=6),
-        Card(color='red', number=7), Card(color='green', number=7), Card(color='yellow', number=7), Card(color='blue', number=7),
-        Card(color='red', number=8), Card(color='green', number=8), Card(color='yellow', number=8), Card(color='blue', number=8),
-        Card(color='red', number=9), Card(color='green', number=9), Card(color='yellow', number=9), Card(color='blue', number=9),
-        Card(color='red', number=1), Card(color='green', number=1), Card(color='yellow', number=1), Card(color='blue', number=1),
-        Card(color='red', number=2), Card(color='green', number=2), Card(color='yellow', number=2), Card(color='blue', number=2),
-        Card(color='red', number=3), Card(color='green', number=3), Card(color='yellow', number=3), Card(color='blue', number=3),
-        Card(color='red', number=4), Card(color='green', number=4), Card(color='yellow', number=4), Card(color='blue', number=4),
-        Card(color='red', number=5), Card(color='green', number=5), Card(color='yellow', number=5), Card(color='blue', number=5),
-        Card(color='red', number=6), Card(color='green', number=6), Card(color='yellow', number=6), Card(color='blue', number=6),
-        Card(color='red', number=7), Card(color='green', number=7), Card(color='yellow', number=7), Card(color='blue', number=7),
-        Card(color='red', number=8), Card(color='green', number=8), Card(color='yellow', number=8), Card(color='blue', number=8),
-        Card(color='red', number=9), Card(color='green', number=9), Card(color='yellow', number=9), Card(color='blue', number=9),
+    LIST_SYMBOL: ClassVar[Tuple[str, ...]] = ('skip', 'reverse', 'draw2', 'wild', 'wilddraw4')
+    LIST_CARD: ClassVar[Tuple[Card, ...]] = (
+        Card(color='red', number=0), Card(color='green', number=0),
+        Card(color='yellow', number=0), Card(color='blue', number=0),
+        Card(color='red', number=1), Card(color='green', number=1),
+        Card(color='yellow', number=1), Card(color='blue', number=1),
+        Card(color='red', number=2), Card(color='green', number=2),
+        Card(color='yellow', number=2), Card(color='blue', number=2),
+        Card(color='red', number=3), Card(color='green', number=3),
+        Card(color='yellow', number=3), Card(color='blue', number=3),
+        Card(color='red', number=4), Card(color='green', number=4),
+        Card(color='yellow', number=4), Card(color='blue', number=4),
+        Card(color='red', number=5), Card(color='green', number=5),
+        Card(color='yellow', number=5), Card(color='blue', number=5),
+        Card(color='red', number=6), Card(color='green', number=6),
+        Card(color='yellow', number=6), Card(color='blue', number=6),
+        Card(color='red', number=7), Card(color='green', number=7),
+        Card(color='yellow', number=7), Card(color='blue', number=7),
+        Card(color='red', number=8), Card(color='green', number=8),
+        Card(color='yellow', number=8), Card(color='blue', number=8),
+        Card(color='red', number=9), Card(color='green', number=9),
+        Card(color='yellow', number=9), Card(color='blue', number=9),
+        Card(color='red', number=1), Card(color='green', number=1),
+        Card(color='yellow', number=1), Card(color='blue', number=1),
+        Card(color='red', number=2), Card(color='green', number=2),
+        Card(color='yellow', number=2), Card(color='blue', number=2),
+        Card(color='red', number=3), Card(color='green', number=3),
+        Card(color='yellow', number=3), Card(color='blue', number=3),
+        Card(color='red', number=4), Card(color='green', number=4),
+        Card(color='yellow', number=4), Card(color='blue', number=4),
+        Card(color='red', number=5), Card(color='green', number=5),
+        Card(color='yellow', number=5), Card(color='blue', number=5),
+        Card(color='red', number=6), Card(color='green', number=6),
+        Card(color='yellow', number=6), Card(color='blue', number=6),
+        Card(color='red', number=7), Card(color='green', number=7),
+        Card(color='yellow', number=7), Card(color='blue', number=7),
+        Card(color='red', number=8), Card(color='green', number=8),
+        Card(color='yellow', number=8), Card(color='blue', number=8),
+        Card(color='red', number=9), Card(color='green', number=9),
+        Card(color='yellow', number=9), Card(color='blue', number=9),
         # skip next player
-        Card(color='red', symbol='skip'), Card(color='green', symbol='skip'), Card(color='yellow', symbol='skip'), Card(color='blue', symbol='skip'),
-        Card(color='red', symbol='skip'), Card(color='green', symbol='skip'), Card(color='yellow', symbol='skip'), Card(color='blue', symbol='skip'),
+        Card(color='red', symbol='skip'), Card(color='green', symbol='skip'),
+        Card(color='yellow', symbol='skip'), Card(color='blue', symbol='skip'),
+        Card(color='red', symbol='skip'), Card(color='green', symbol='skip'),
+        Card(color='yellow', symbol='skip'), Card(color='blue', symbol='skip'),
         # revers playing direction
-        Card(color='red', symbol='reverse'), Card(color='green', symbol='reverse'), Card(color='yellow', symbol='reverse'), Card(color='blue', symbol='reverse'),
-        Card(color='red', symbol='reverse'), Card(color='green', symbol='reverse'), Card(color='yellow', symbol='reverse'), Card(color='blue', symbol='reverse'),
+        Card(color='red', symbol='reverse'), Card(color='green', symbol='reverse'),
+        Card(color='yellow', symbol='reverse'), Card(color='blue', symbol='reverse'),
+        Card(color='red', symbol='reverse'), Card(color='green', symbol='reverse'),
+        Card(color='yellow', symbol='reverse'), Card(color='blue', symbol='reverse'),
         # next player must draw 2 cards
-        Card(color='red', symbol='draw2'), Card(color='green', symbol='draw2'), Card(color='yellow', symbol='draw2'), Card(color='blue', symbol='draw2'),
-        Card(color='red', symbol='draw2'), Card(color='green', symbol='draw2'), Card(color='yellow', symbol='draw2'), Card(color='blue', symbol='draw2'),
+        Card(color='red', symbol='draw2'), Card(color='green', symbol='draw2'),
+        Card(color='yellow', symbol='draw2'), Card(color='blue', symbol='draw2'),
+        Card(color='red', symbol='draw2'), Card(color='green', symbol='draw2'),
+        Card(color='yellow', symbol='draw2'), Card(color='blue', symbol='draw2'),
         # current player choses color for next player to play
         Card(color='any', symbol='wild'), Card(color='any', symbol='wild'),
         Card(color='any', symbol='wild'), Card(color='any', symbol='wild'),
         # current player choses color for next player to play and next player must draw 4 cards
         Card(color='any', symbol='wilddraw4'), Card(color='any', symbol='wilddraw4'),
         Card(color='any', symbol='wilddraw4'), Card(color='any', symbol='wilddraw4'),
-    ]
+    )
+
+    list_card_draw: Optional[List[Card]] = None     # list of cards to draw
+    list_card_discard: Optional[List[Card]] = None  # list of cards discarded
+    list_player: List[PlayerState] = []             # list of player-states
+    phase: GamePhase = GamePhase.SETUP              # the current game-phase ("setup"|"running"|"finished")
+    cnt_player: int                                 # number of players N (to be set in the phase "setup")
+    idx_player_active: Optional[int] = None         # the index (0 to N-1) of active player
+    direction: int = 1                              # direction of the game, +1 to the left, -1 to right
+    color: str = 'any'                              # active color (last card played or the chosen color of a wild card)
+    cnt_to_draw: int = 0                            # accumulated number of cards to draw for the next player
+    has_drawn: bool = False                         # flag to indicate if the last player has alreay drawn cards or not
+
+
+# The engine keeps the cards as integer ids: 0 to 51 are the colored cards (color * 13 + rank),
+# 52 is wild and 53 wilddraw4. The ids after them are the other combinations of a color of LIST_COLOR
+# with a number or a symbol (only found in hand-made states, e.g. a red wilddraw4 or a symbol '2').
+# All ids are created at import, cards of other kinds are rejected (see get_card_id). Hands are vectors
+# with the number of cards per id and a bitmask of the ids in hand, which is matched against the masks
+# of the card ids per color and per rank.
+LIST_COLOR_CARD = GameState.LIST_COLOR[:-1]
+COLOR_ANY = len(LIST_COLOR_CARD)  # color index of the wild cards and of the active color 'any'
+COLOR_INDEX: Dict[str, int] = {color: idx for idx, color in enumerate(GameState.LIST_COLOR)}
+RANK_SKIP, RANK_REVERSE, RANK_DRAW2, RANK_WILD, RANK_WILDDRAW4 = range(10, 15)
+
+CARD_BY_ID: List[Card] = []
+CARD_COLOR: List[int] = []  # color index per card id
+CARD_RANK: List[int] = []  # rank per card id: numbers 0 to 9, then the symbols
+MASK_COLOR: List[int] = [0] * (COLOR_ANY + 1)  # card ids per color index, the wild cards are 'any'
+MASK_RANK: List[int] = []  # card ids per rank
+_id_by_key: Dict[Tuple[Optional[str], Optional[int], Optional[str]], int] = {}
+
+CARD_HIDDEN = Card(symbol='back')  # face down card in the player views, the client draws its back
+
+
+def _add_card_kind(color: str, number: Optional[int], symbol: Optional[str], rank: int) -> None:
+    id_card = _id_by_key.setdefault((color, number, symbol), len(CARD_BY_ID))
+    if id_card < len(CARD_BY_ID):
+        return
+    CARD_BY_ID.append(Card(color=color, number=number, symbol=symbol))
+    CARD_COLOR.append(COLOR_INDEX[color])
+    CARD_RANK.append(rank)
+    MASK_RANK.extend([0] * (rank + 1 - len(MASK_RANK)))
+    MASK_RANK[rank] |= 1 << id_card
+    MASK_COLOR[COLOR_ANY if rank in (RANK_WILD, RANK_WILDDRAW4) else COLOR_INDEX[color]] |= 1 << id_card
+
+
+def get_card_id(card: Card) -> int:
+    """ Id of the kind of the card, raises a ValueError for cards of unknown kinds """
+    id_card = _id_by_key.get((card.color, card.number, card.symbol))
+    if id_card is None:
+        raise ValueError(f"Unknown card: {card}")
+    return id_card
 
-    list_card_draw: Optional[List[Card]]     # list of cards to draw
-    list_card_discard: Optional[List[Card]]  # list of cards discarded
-    list_player: List[PlayerState]           # list of player-states
-    phase: GamePhase                         # the current game-phase ("setup"|"running"|"finished")
-    cnt_player: int                          # number of players N (to be set in the phase "setup")
-    idx_player_active: Optional[int]         # the index (0 to N-1) of active player
-    direction: int                           # direction of the game, +1 to the left, -1 to right
-    color: str                               # active color (last card played or the chosen color after a wild cards)
-    cnt_to_draw: int                         # accumulated number of cards to draw for the next player
-    has_drawn: bool                          # flag to indicate if the last player has alreay drawn cards or not
+
+_action_by_key: Dict[Tuple[int, Optional[str], Optional[int], bool], Action] = {}
+
+
+def get_action(id_card: int, color: Optional[str], draw: Optional[int], uno: bool = False) -> Action:
+    """ Shared action playing the card id (-1 for no card), get_list_action creates no models """
+    key = (id_card, color, draw, uno)
+    action = _action_by_key.get(key)
+    if action is None:
+        card = CARD_BY_ID[id_card] if id_card >= 0 else None
+        action = _action_by_key[key] = Action(card=card, color=color, draw=draw, uno=uno)
+    return action
+
+
+def get_list_id(mask: int) -> List[int]:
+    """ Card ids of the bits set in the mask, ascending """
+    list_id = []
+    while mask:
+        bit = mask & -mask
+        list_id.append(bit.bit_length() - 1)
+        mask ^= bit
+    return list_id
+
+
+LIST_RANK_KEY: List[Tuple[Optional[int], Optional[str]]] = [(number, None) for number in range(10)]
+LIST_RANK_KEY += [(None, symbol) for symbol in GameState.LIST_SYMBOL]
+LIST_RANK_KEY += [(None, str(number)) for number in range(10)]
+for _color in LIST_COLOR_CARD:
+    for _rank, (_number, _symbol) in enumerate(LIST_RANK_KEY[:RANK_WILD]):
+        _add_card_kind(_color, _number, _symbol, _rank)
+for _rank in (RANK_WILD, RANK_WILDDRAW4):
+    _add_card_kind('any', None, GameState.LIST_SYMBOL[_rank - RANK_SKIP], _rank)
+for _color in GameState.LIST_COLOR:
+    for _rank, (_number, _symbol) in enumerate(LIST_RANK_KEY):
+        _add_card_kind(_color, _number, _symbol, _rank)
+DECK: Tuple[int, ...] = tuple(get_card_id(card) for card in GameState.LIST_CARD)  # card ids of LIST_CARD
 
 
 class Uno(Game):
 
-    def __init__(self) -> None:
+    def __init__(self, seed: Optional[int] = None) -> None:
         """ Important: Game initialization also requires a set_state call to set the number of players """
-        pass
+        self.rng = random.Random(seed)
+        self.state: Optional[GameState] = None
+        self.list_draw: List[int] = []  # card ids of the draw pile, the top card is the last
+        self.list_discard: List[int] = []  # card ids of the discard pile, the top card is the last
+        self.list_hand: List[List[int]] = []  # per player the number of cards per card id
+        self.list_cnt_card: List[int] = []  # per player the number of cards in hand
+        self.list_mask_hand: List[int] = []  # per player the bitmask of the card ids in hand
+        self.is_synced = True  # false if the card lists of the state are behind the lists above
 
     def set_state(self, state: GameState) -> None:
         """ Set the game to a given state """
-        pass
+        self.state = state
+        if state.phase == GamePhase.SETUP:
+            self._setup(state)
+            return
+        self.list_draw = [get_card_id(card) for card in state.list_card_draw or []]
+        self.list_discard = [get_card_id(card) for card in state.list_card_discard or []]
+        self._clear_hands(len(state.list_player))
+        for idx_player, player in enumerate(state.list_player):
+            for card in player.list_card:
+                self._add_card(idx_player, get_card_id(card))
+        self.is_synced = True
+
+    def _setup(self, state: GameState) -> None:
+        """ Deal the cards from the end of the draw pile (shuffled if not given) and turn up the first card """
+        if state.list_card_draw is None:
+            self.list_draw = list(DECK)
+            self.rng.shuffle(self.list_draw)
+        else:
+            self.list_draw = [get_card_id(card) for card in state.list_card_draw]
+        self._clear_hands(state.cnt_player)
+        for idx_player in range(state.cnt_player):
+            for _ in range(state.CNT_HAND_CARDS):
+                self._draw_card(idx_player)
+
+        # a wild draw 4 can not be the first card, it goes back under the draw pile
+        for _ in range(len(self.list_draw)):
+            if CARD_RANK[self.list_draw[-1]] != RANK_WILDDRAW4:
+                break
+            self.list_draw.insert(0, self.list_draw.pop())
+        id_top = self.list_draw.pop()
+        self.list_discard = [id_top]
+
+        state.phase = GamePhase.RUNNING
+        state.list_player = [PlayerState(name=f'Player {idx + 1}') for idx in range(state.cnt_player)]
+        if state.idx_player_active is None:
+            state.idx_player_active = self.rng.randrange(state.cnt_player)
+        state.color = CARD_BY_ID[id_top].color or 'any'
+        state.cnt_to_draw = 0
+        state.has_drawn = False
+        if CARD_RANK[id_top] == RANK_DRAW2:
+            state.cnt_to_draw = 2
+        elif CARD_RANK[id_top] == RANK_REVERSE:
+            state.direction = -state.direction
+        elif CARD_RANK[id_top] == RANK_SKIP:
+            state.idx_player_active = (state.idx_player_active + state.direction) % state.cnt_player
+        self.is_synced = False
+
+    def _get_state(self) -> GameState:
+        if self.state is None:
+            raise ValueError("Game state not set yet. Set the game state using `set_state` method.")
+        return self.state
 
     def get_state(self) -> GameState:
         """ Get the complete, unmasked game state """
-        pass
+        state = self._get_state()
+        if not self.is_synced:
+            state.list_card_draw = [CARD_BY_ID[id_card] for id_card in self.list_draw]
+            state.list_card_discard = [CARD_BY_ID[id_card] for id_card in self.list_discard]
+            for player, hand, mask_hand in zip(state.list_player, self.list_hand, self.list_mask_hand):
+                player.list_card = [CARD_BY_ID[id_card] for id_card in get_list_id(mask_hand)
+                                    for _ in range(hand[id_card])]
+            self.is_synced = True
+        return state
 
     def print_state(self) -> None:
         """ Print the current game state """
-        pass
+        if self.state is not None:
+            print(self.get_state().model_dump())
+        else:
+            print("No state set yet. Use the `set_state()` method to set a state.")
 
     def get_list_action(self) -> List[Action]:
         """ Get a list of possible actions for the active player """
-        pass
+        state = self._get_state()
+        if state.phase != GamePhase.RUNNING or state.idx_player_active is None:
+            return []
+        if not self.list_discard:  # without a top card nothing can be matched, only drawing or passing is left
+            if state.cnt_to_draw > 0 and not state.has_drawn:
+                return [get_action(-1, None, state.cnt_to_draw)]
+            return [get_action(-1, None, None if state.has_drawn else 1)]
+        if state.cnt_to_draw > 0 and not state.has_drawn:
+            list_action = self._get_list_action_stack(state.idx_player_active, state.cnt_to_draw)
+        else:
+            list_action = self._get_list_action_play(state.idx_player_active, state.color, state.has_drawn)
+        if self.list_cnt_card[state.idx_player_active] == 2:
+            list_action += [get_action(get_card_id(action.card), action.color, action.draw, True)
+                            for action in list_action if action.card is not None]
+        return list_action
+
+    def _get_list_action_stack(self, idx_player: int, cnt_to_draw: int) -> List[Action]:
+        """ Only another draw card can be stacked, else the accumulated cards have to be drawn """
+        mask_stack = MASK_RANK[RANK_WILDDRAW4]
+        if CARD_RANK[self.list_discard[-1]] == RANK_DRAW2:
+            mask_stack |= MASK_RANK[RANK_DRAW2]
+        list_action: List[Action] = []
+        for id_card in get_list_id(self.list_mask_hand[idx_player] & mask_stack):
+            if CARD_RANK[id_card] == RANK_DRAW2:
+                list_action.append(get_action(id_card, CARD_BY_ID[id_card].color, cnt_to_draw + 2))
+            else:
+                list_action += [get_action(id_card, color, cnt_to_draw + 4) for color in LIST_COLOR_CARD]
+        list_action.append(get_action(-1, None, cnt_to_draw))
+        return list_action
+
+    def _get_list_action_play(self, idx_player: int, color_active: str, has_drawn: bool) -> List[Action]:
+        """ Cards matching the active color or the top card, wild cards, and drawing a card """
+        mask_hand = self.list_mask_hand[idx_player]
+        color = COLOR_INDEX.get(color_active, COLOR_ANY)
+        if color == COLOR_ANY:
+            mask_play = mask_hand
+        else:
+            mask_play = mask_hand & (MASK_COLOR[color] | MASK_RANK[CARD_RANK[self.list_discard[-1]]]
+                                     | MASK_COLOR[COLOR_ANY])
+            if mask_hand & MASK_COLOR[color]: # a wild draw 4 is only allowed without a card of the active color
+                mask_play &= ~MASK_RANK[RANK_WILDDRAW4]
+        list_action: List[Action] = []
+        for id_card in get_list_id(mask_play):
+            rank = CARD_RANK[id_card]
+            if rank in (RANK_WILD, RANK_WILDDRAW4):
+                draw = 4 if rank == RANK_WILDDRAW4 else None
+                list_action += [get_action(id_card, color_wild, draw) for color_wild in LIST_COLOR_CARD]
+            else:
+                list_action.append(get_action(id_card, CARD_BY_ID[id_card].color, 2 if rank == RANK_DRAW2 else None))
+        if not has_drawn:
+            list_action.append(get_action(-1, None, 1))
+        elif not list_action:
+            list_action.append(get_action(-1, None, None))  # pass, nothing to play after drawing
+        return list_action
 
     def apply_action(self, action: Action) -> None:
         """ Apply the given action to the game """
-        pass
+        state = self._get_state()
+        assert state.idx_player_active is not None
+        idx_player = state.idx_player_active
+        if action.card is not None:
+            id_card = get_card_id(action.card)
+            self._remove_card(idx_player, id_card)
+        self.is_synced = False
+
+        if action.card is None:
+            if action.draw: # the player keeps the turn to play after drawing
+                for _ in range(action.draw):
+                    self._draw_card(idx_player)
+                state.cnt_to_draw = 0
+                state.has_drawn = True
+            else:
+                state.has_drawn = False
+                state.idx_player_active = (idx_player + state.direction) % state.cnt_player
+            return
+
+        self.list_discard.append(id_card)
+        state.color = action.color or action.card.color or 'any'
+        state.has_drawn = False
+        if self.list_cnt_card[idx_player] == 0:
+            state.phase = GamePhase.FINISHED # the active player wins
+            return
+        if self.list_cnt_card[idx_player] == 1 and not action.uno:
+            for _ in range(4): # penalty for not announcing UNO
+                self._draw_card(idx_player)
+
+        rank = CARD_RANK[id_card]
+        cnt_step = 1
+        if rank == RANK_SKIP:
+            cnt_step = 2
+        elif rank == RANK_REVERSE:
+            state.direction = -state.direction
+            cnt_step = 2 if state.cnt_player == 2 else 1 # with two players reverse acts like skip
+        elif rank == RANK_DRAW2:
+            state.cnt_to_draw += 2
+        elif rank == RANK_WILDDRAW4:
+            state.cnt_to_draw += 4
+        state.idx_player_active = (idx_player + cnt_step * state.direction) % state.cnt_player
+
+    def _draw_card(self, idx_player: int) -> None:
+        """ Move the top card of the draw pile to the hand, reshuffle the discard pile if it is empty """
+        if not self.list_draw:
+            self.list_draw = self.list_discard[:-1]
+            self.list_discard = self.list_discard[-1:]
+            self.rng.shuffle(self.list_draw)
+            if not self.list_draw:
+                return
+        self._add_card(idx_player, self.list_draw.pop())
+
+    def _clear_hands(self, cnt_player: int) -> None:
+        self.list_hand = [[0] * len(CARD_BY_ID) for _ in range(cnt_player)]
+        self.list_cnt_card = [0] * cnt_player
+        self.list_mask_hand = [0] * cnt_player
+
+    def _add_card(self, idx_player: int, id_card: int) -> None:
+        hand = self.list_hand[idx_player]
+        hand[id_card] += 1
+        self.list_cnt_card[idx_player] += 1
+        self.list_mask_hand[idx_player] |= 1 << id_card
+
+    def _remove_card(self, idx_player: int, id_card: int) -> None:
+        hand = self.list_hand[idx_player]
+        if hand[id_card] == 0:
+            raise ValueError("You don't have this card in hand.")
+        hand[id_card] -= 1
+        self.list_cnt_card[idx_player] -= 1
+        if hand[id_card] == 0:
+            self.list_mask_hand[idx_player] &= ~(1 << id_card)
 
     def get_player_view(self, idx_player: int) -> GameState:
         """ Get the masked state for the active player (e.g. the oppontent's cards are face down)"""
-        pass
+        state = self.get_state()
+        list_player = [player if idx == idx_player else
+                       PlayerState(name=player.name, list_card=[CARD_HIDDEN] * len(player.list_card))
+                       for idx, player in enumerate(state.list_player)]
+        return state.model_copy(update={
+            'list_card_draw': [CARD_HIDDEN] * len(state.list_card_draw or []), 'list_player': list_player})
 
 
 class RandomPlayer(Player):
@@ -127,6 +446,7 @@ class RandomPlayer(Player):
 
 if __name__ == '__main__':
 
-    uno = Uno()
-    state = GameState(cnt_player=3)
-    uno.set_state(state)
+    game = Uno()
+    game_state = GameState(cnt_player=3)
+    game.set_state(game_state)
+    game.print_state()
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+from server.py import metrics
+
+logger = logging.getLogger('server.watchdog')
+
+# extra context (game, session id) of the tasks running websocket handlers, by the id of the outermost frame of
+# the task: tag() writes it in the loop thread, the watcher thread finds it in the stack of the blocked loop
+_frame_tags: Dict[int, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def tag(**info: Any) -> None:
+    """ Attach context (e.g. game='dog', session_id=...) to the current task, reported if it blocks the loop """
+    task = asyncio.current_task()
+    frame = getattr(task.get_coro(), 'cr_frame', None) if task is not None else None
+    if task is None or frame is None:
+        return
+    key = id(frame)
+    with _lock:
+        tags = _frame_tags.get(key)
+        if tags is None:
+            tags = _frame_tags[key] = {'task': task.get_name()}
+            task.add_done_callback(lambda _: _forget(key))
+        tags.update(info)
+
+
+def _forget(key: int) -> None:
+    with _lock:
+        _frame_tags.pop(key, None)
+
+
+def get_tags(frame: Optional[FrameType]) -> Dict[str, Any]:
+    """ Tags of the task whose outermost frame is in the stack of the given frame """
+    with _lock:
+        while frame is not None:
+            tags = _frame_tags.get(id(frame))
+            if tags is not None:
+                return dict(tags)
+            frame = frame.f_back
+    return {}
+
+
+class LoopWatchdog:
+    """
+    Measures the event loop lag with a heartbeat task. A watcher thread notices when the heartbeat
+    stops for longer than the threshold and logs the stack of the blocking code and the tags of its task.
+    """
+
+    def __init__(self, threshold: float = 0.25, interval: float = 0.05) -> None:
+        self.threshold = threshold  # seconds the loop may be blocked before a stall is reported
+        self.interval = interval  # seconds between heartbeats
+        self.list_stall: List[Dict[str, Any]] = []  # last reported stalls (newest last)
+        self._heartbeat = time.monotonic()
+        self._heartbeat_reported = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """ Start heartbeat and watcher thread, must be called from the running event loop """
+        if not logger.hasHandlers():  # stall reports are warnings, also without a logging configuration
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(levelname)s %(message)s'))
+            logger.addHandler(handler)
+            logger.setLevel(logging.WARNING)
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._run_heartbeat())
+        threading.Thread(target=self._watch, name='loop-watchdog', daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run_heartbeat(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self._heartbeat = time.monotonic()
+            metrics.EVENT_LOOP_LAG_SECONDS.observe(max(0.0, self._heartbeat - start - self.interval))
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.threshold / 4):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked > self.threshold and heartbeat != self._heartbeat_reported:
+                self._heartbeat_reported = heartbeat
+                self._report(blocked)
+
+    def _report(self, blocked: float) -> None:
+        stall: Dict[str, Any] = {'event': 'event_loop_blocked', 'blocked_seconds': round(blocked, 4)}
+        frame = sys._current_frames().get(self._loop_thread_id or 0)  # pylint: disable=protected-access
+        stall.update(get_tags(frame))
+        if frame is not None:
+            stall['stack'] = [f'{entry.filename}:{entry.lineno} in {entry.name}'
+                              for entry in traceback.extract_stack(frame)]
+        metrics.EVENT_LOOP_STALLS_TOTAL.inc(game=str(stall.get('game', '')))
+        self.list_stall = self.list_stall[-99:] + [stall]
+        logger.warning(json.dumps(stall))
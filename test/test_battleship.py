@@ -0,0 +1,195 @@
+import pytest
+from server.py.battleship import (
+    Battleship,
+    BattleshipAction,
+    BattleshipGameState,
+    ActionType,
+    GamePhase,
+    PlayerState,
+    RandomPlayer,
+    Ship,
+    get_list_location,
+    get_location_mask,
+    get_placement_masks,
+)
+
+
+def create_game(shots: list = None) -> Battleship:
+    """Running game where both players placed their ships in the rows 1 to 5 and player 0 shot at the locations."""
+    ships = [
+        Ship(name="carrier", length=5, location=["A1", "A2", "A3", "A4", "A5"]),
+        Ship(name="battleship", length=4, location=["B1", "B2", "B3", "B4"]),
+        Ship(name="cruiser", length=3, location=["C1", "C2", "C3"]),
+        Ship(name="submarine", length=3, location=["D1", "D2", "D3"]),
+        Ship(name="destroyer", length=2, location=["E1", "E2"]),
+    ]
+    players = [PlayerState(name=f"Player {idx + 1}", ships=[ship.model_copy() for ship in ships], shots=[],
+                           successful_shots=[]) for idx in range(2)]
+    game = Battleship()
+    game.set_state(BattleshipGameState(idx_player_active=0, phase=GamePhase.RUNNING, winner=None, players=players))
+    for location in shots or []:
+        game.apply_action(BattleshipAction(action_type=ActionType.SHOOT, ship_name=None, location=[location]))
+        game.get_state().idx_player_active = 0
+    return game
+
+
+def test_location_mask():
+    """Test that locations are bits of the board mask and back."""
+    assert get_location_mask(["A1"]) == 1
+    assert get_location_mask(["a10", "B1"]) == 1 << 9 | 1 << 10
+    assert get_location_mask(["J10"]) == 1 << 99
+    assert get_list_location(1 << 10 | 1 << 99 | 1) == ["A1", "B1", "J10"]
+    with pytest.raises(ValueError):
+        get_location_mask(["K1"])
+
+
+def test_placement_masks():
+    """Test that the placement table has every placement of a ship inside the board once."""
+    masks = get_placement_masks(3)
+    assert len(masks) == len(set(masks)) == 2 * 10 * 8
+    assert all(mask.bit_count() == 3 for mask in masks)
+    assert get_location_mask(["H10", "I10", "J10"]) in masks
+    assert get_location_mask(["A9", "A10", "B1"]) not in masks
+
+
+def test_setup_placements():
+    """Test that the setup actions are every placement of the ships which don't overlap the placed ships."""
+    game = Battleship()
+    actions = game.get_list_action()
+    assert len(actions) == 2 * 10 * (6 + 7 + 8 + 8 + 9)
+    assert all(action.action_type == ActionType.SET_SHIP for action in actions)
+    carrier = BattleshipAction(
+        action_type=ActionType.SET_SHIP, ship_name="carrier", location=["A1", "B1", "C1", "D1", "E1"])
+    assert carrier in actions
+    game.apply_action(carrier)
+    assert game.get_state().idx_player_active == 1
+    assert game.get_state().players[0].ships[0].location == ["A1", "B1", "C1", "D1", "E1"]
+    game.apply_action(game.get_list_action()[0])
+    actions = game.get_list_action()
+    assert all(action.ship_name != "carrier" for action in actions)
+    assert all("C1" not in action.location for action in actions)
+    assert len([action for action in actions if action.ship_name == "destroyer"]) == 2 * 10 * 9 - 5 - 5
+
+
+def test_set_ship_overlap():
+    """Test that a ship can not be placed on a placed ship."""
+    game = Battleship()
+    game.apply_action(BattleshipAction(action_type=ActionType.SET_SHIP, ship_name="destroyer", location=["A1", "A2"]))
+    game.get_state().idx_player_active = 0
+    with pytest.raises(ValueError):
+        game.apply_action(BattleshipAction(
+            action_type=ActionType.SET_SHIP, ship_name="cruiser", location=["A2", "B2", "C2"]))
+
+
+def test_set_ship_rejects_invalid_ships():
+    """Test that only unplaced ships of the fleet can be placed, and only on a placement of their length."""
+    game = Battleship()
+    for name, location in [
+            ("pirate", ["A1", "C5", "J10"]),  # no ship of the fleet
+            (None, ["A1", "A2"]),
+            ("destroyer", ["A1", "C5"]),  # not in a line
+            ("destroyer", ["A1", "A2", "A3"]),  # wrong length
+            ("destroyer", ["A1", "A1"]),
+            ("cruiser", ["A9", "A10", "B1"])]:  # across the edge of the board
+        with pytest.raises(ValueError):
+            game.apply_action(BattleshipAction(action_type=ActionType.SET_SHIP, ship_name=name, location=location))
+    assert game.get_state().idx_player_active == 0
+    assert all(ship.location is None for ship in game.get_state().players[0].ships)
+    game.apply_action(BattleshipAction(action_type=ActionType.SET_SHIP, ship_name="destroyer", location=["A1", "A2"]))
+    game.get_state().idx_player_active = 0
+    with pytest.raises(ValueError):
+        game.apply_action(BattleshipAction(
+            action_type=ActionType.SET_SHIP, ship_name="destroyer", location=["J1", "J2"]))
+    assert len(game.get_state().players[0].ships) == 5
+
+
+def test_shoot_rejects_invalid_shots():
+    """Test that a shot needs the running phase and exactly one location that was not shot at."""
+    game = Battleship()
+    with pytest.raises(ValueError):
+        game.apply_action(BattleshipAction(action_type=ActionType.SHOOT, ship_name=None, location=["A1"]))
+    game = create_game(["A1"])
+    for location in [[], ["A2", "A3"], ["K1"], ["A1"], ["a1"]]:
+        with pytest.raises(ValueError):
+            game.apply_action(BattleshipAction(action_type=ActionType.SHOOT, ship_name=None, location=location))
+    assert game.get_state().players[0].shots == ["A1"]
+    assert game.get_state().idx_player_active == 0
+
+
+def test_setup_finishes_after_all_ships():
+    """Test that the game runs after both players placed their five ships."""
+    game = Battleship()
+    player = RandomPlayer()
+    for _ in range(10):
+        assert game.get_state().phase == GamePhase.SETUP
+        game.apply_action(player.select_action(game.get_state(), game.get_list_action()))
+    state = game.get_state()
+    assert state.phase == GamePhase.RUNNING
+    for player_state in state.players:
+        locations = [location for ship in player_state.ships for location in ship.location]
+        assert len(locations) == len(set(locations)) == 17
+    assert len(game.get_list_action()) == 100
+
+
+def test_shoot_hit_and_miss():
+    """Test that shots are remembered, hits are successful and the shot locations are not offered again."""
+    game = create_game(["A1", "J10"])
+    player = game.get_state().players[0]
+    assert player.shots == ["A1", "J10"]
+    assert player.successful_shots == ["A1"]
+    locations = [action.location[0] for action in game.get_list_action()]
+    assert len(locations) == 98
+    assert "A1" not in locations and "J10" not in locations
+
+
+def test_shoot_all_ships_wins():
+    """Test that sinking the last ship finishes the game."""
+    locations = ["A1", "A2", "A3", "A4", "A5", "B1", "B2", "B3", "B4", "C1", "C2", "C3", "D1", "D2", "D3", "E1"]
+    game = create_game(locations)
+    assert game.get_state().phase == GamePhase.RUNNING
+    game.apply_action(BattleshipAction(action_type=ActionType.SHOOT, ship_name=None, location=["E2"]))
+    state = game.get_state()
+    assert state.phase == GamePhase.FINISHED
+    assert state.winner == 0
+    assert game.get_list_action() == []
+
+
+def test_set_state_restores_masks():
+    """Test that a game restored from its state continues the same."""
+    game = create_game(["A1", "F5", "C2"])
+    game_restored = Battleship()
+    game_restored.set_state(game.get_state().model_copy(deep=True))
+    assert game_restored.get_list_action() == game.get_list_action()
+    assert game_restored.get_player_view(0) == game.get_player_view(0)
+
+
+def test_get_player_view_hides_ships():
+    """Test that the ships of the opponent are hidden until they are sunk."""
+    game = create_game(["E1", "E2", "A1"])
+    view = game.get_player_view(0)
+    assert view.players[0].ships == game.get_state().players[0].ships
+    ships = {ship.name: ship.location for ship in view.players[1].ships}
+    assert ships["destroyer"] == ["E1", "E2"]
+    assert ships["carrier"] is None
+    assert game.get_state().players[1].ships[0].location is not None
+
+
+def test_random_player_finishes_game():
+    """Test that random players finish a game."""
+    game = Battleship()
+    player = RandomPlayer()
+    for _ in range(300):
+        action = player.select_action(game.get_state(), game.get_list_action())
+        if action is None:
+            break
+        game.apply_action(action)
+    state = game.get_state()
+    assert state.phase == GamePhase.FINISHED
+    assert len(state.players[state.winner].successful_shots) == 17
+
+
+def test_print_state(capfd):
+    """Test that print_state prints the state."""
+    Battleship().print_state()
+    out, _ = capfd.readouterr()
+    assert "setup" in out
@@ -1,4 +1,5 @@
 import pytest
+from server.py import dog_board
 from server.py.dog import (
     Dog,
     Card,
@@ -654,8 +655,8 @@ def test_generate_joker_swap_actions_with_joker():
 def test_get_list_action_player_finished():
     """
     Covers:
-    - self._finish_game() call
     - if player.finished logic
+    - get_list_action does not change the state
     """
     dog = Dog()
     # Complete all exchanges first to move to normal action phase
@@ -670,11 +671,13 @@ def test_get_list_action_player_finished():
     for i, marble in enumerate(player.list_marble):
         marble.pos = finish_positions[i]
 
-    # This triggers player.finished = True in _finish_game
-    actions = dog.get_list_action()  # Will call self._finish_game() internally
-    # Player finished means player's marbles replaced by partner's marbles
+    # A finished player moves the partner's marbles, get_list_action does not change the state for that
+    state_before = dog.state.model_dump()
+    actions = dog.get_list_action()
+    assert dog.state.model_dump() == state_before
     partner = dog.state.list_player[(dog.state.idx_player_active + 2) % 4]
-    assert player.list_marble == partner.list_marble
+    partner_kennel = KennelNumbers[partner.colour].value
+    assert all(action.pos_from is None or action.pos_from in partner_kennel for action in actions)
     # No card_active, so it will go past the if self.state.card_active block
     # Just ensure it returns possible actions (likely kennel start since partner marbles are used)
     assert isinstance(actions, list)
@@ -794,4 +797,145 @@ def test_process_joker_action_no_swap_card():
     with pytest.raises(
         ValueError, match="Es muss eine Karte angegeben werden, die der Joker ersetzt."
     ):
-        dog._process_joker_action(player, Action(card=joker_card))
\ No newline at end of file
+        dog._process_joker_action(player, Action(card=joker_card))
+
+def test_board_matches_enums():
+    """Test that the board geometry uses the same positions as the enums."""
+    for colour in dog_board.LIST_COLOUR:
+        assert dog_board.START_POS[colour] == StartNumbers[colour].value
+        assert dog_board.KENNEL_POS[colour] == KennelNumbers[colour].value
+        assert dog_board.FINISH_POS[colour] == FinishNumbers[colour].value
+        for path_index, pos in enumerate(dog_board.SQUARE_AT[colour]):
+            assert dog_board.PATH_INDEX[colour][pos] == path_index
+
+
+def test_track_mask_matches_is_between():
+    """Test that the track mask finds a square passed or reached in both directions, also over square 0."""
+    for pos in [0, 5, 63]:
+        mask = dog_board.get_track_mask([pos, 70])
+        for pos_from in range(dog_board.CNT_TRACK):
+            for steps in [-4, 1, 4, 7, 13]:
+                pos_to = (pos_from + steps) % dog_board.CNT_TRACK
+                direction = -1 if steps < 0 else 1
+                assert dog_board.is_any_between(mask, pos_from, steps) == \
+                    dog_board.is_between(pos_from, pos_to, pos, direction)
+
+
+def test_apply_action_counts_marbles_in_finish():
+    """Test that the number of marbles in the finish follows the moves and finishing the game."""
+    dog = Dog()
+    dog.state.bool_card_exchanged = True
+    player = dog.state.list_player[0]
+    player.list_card = [Card(suit="♠", rank="5"), Card(suit="♥", rank="A")]
+    player.list_marble[0].pos = 62
+    player.list_marble[0].is_save = False
+    dog.apply_action(Action(card=Card(suit="♠", rank="5"), pos_from=62, pos_to=70))
+    assert dog.cnt_marble_finished["BLUE"] == 1
+    assert player.finished is False
+    dog.apply_action(Action(card=Card(suit="♥", rank="A"), pos_from=70, pos_to=71))
+    assert dog.cnt_marble_finished["BLUE"] == 1
+    assert dog.state.phase == GamePhase.RUNNING
+
+
+def test_get_list_action_move_to_finish():
+    """Test moving over the own start into the finish lane, but not past own marbles there."""
+    dog = Dog()
+    dog.state.bool_card_exchanged = True
+    player = dog.state.list_player[0]
+    player.list_card = [Card(suit="♠", rank="5")]
+    player.list_marble[0].pos = 62
+    player.list_marble[0].is_save = False
+    list_action = dog.get_list_action()
+    assert Action(card=player.list_card[0], pos_from=62, pos_to=3) in list_action
+    assert Action(card=player.list_card[0], pos_from=62, pos_to=70) in list_action
+    assert dog._calculate_steps(62, 70) == 5
+
+    player.list_marble[1].pos = 69
+    list_action = dog.get_list_action()
+    assert Action(card=player.list_card[0], pos_from=62, pos_to=70) not in list_action
+
+
+def test_get_list_action_in_finish_lane():
+    """Test that a marble in the finish lane only moves inside it and a save marble can not enter it from the start."""
+    dog = Dog()
+    dog.state.bool_card_exchanged = True
+    player = dog.state.list_player[0]
+    player.list_card = [Card(suit="♠", rank="3")]
+    player.list_marble[0].pos = 68
+    list_action = dog.get_list_action()
+    assert [(action.pos_from, action.pos_to) for action in list_action if action.pos_from == 68] == [(68, 71)]
+
+    player.list_marble[0].pos = 0
+    player.list_marble[0].is_save = True
+    list_action = dog.get_list_action()
+    assert Action(card=player.list_card[0], pos_from=0, pos_to=3) in list_action
+    assert Action(card=player.list_card[0], pos_from=0, pos_to=70) not in list_action
+    player.list_marble[0].is_save = False
+    assert Action(card=player.list_card[0], pos_from=0, pos_to=70) in dog.get_list_action()
+
+
+def test_apply_action_resets_is_save():
+    """Test that a marble is only save on its start square until it moves on."""
+    dog = Dog()
+    dog.state.bool_card_exchanged = True
+    player = dog.state.list_player[0]
+    player.list_card = [Card(suit="♠", rank="A"), Card(suit="♥", rank="2")]
+    dog.apply_action(Action(card=Card(suit="♠", rank="A"), pos_from=64, pos_to=0))
+    assert player.list_marble[0].is_save is True
+    dog.state.idx_player_active = 0
+    dog.apply_action(Action(card=Card(suit="♥", rank="2"), pos_from=0, pos_to=2))
+    assert player.list_marble[0].pos == 2
+    assert player.list_marble[0].is_save is False
+
+
+def test_action_none_reverts_only_current_seven():
+    """Test that giving up a split 7 does not revert the moves of an earlier 7 of another player."""
+    dog = Dog()
+    dog.state.bool_card_exchanged = True
+    blue, green, red = dog.state.list_player[:3]
+    blue.list_card = [Card(suit="♠", rank="7")]
+    blue.list_marble[0].pos = 10
+    red.list_marble[0].pos = 14
+    dog.apply_action(Action(card=Card(suit="♠", rank="7"), pos_from=10, pos_to=17))
+    assert red.list_marble[0].pos == 80 # sent home by the 7
+    assert dog.state.idx_player_active == 1
+
+    green.list_card = [Card(suit="♥", rank="7"), Card(suit="♣", rank="2")]
+    green.list_marble[0].pos = 20
+    dog.apply_action(Action(card=Card(suit="♥", rank="7"), pos_from=20, pos_to=23))
+    dog.apply_action(None)
+    assert green.list_marble[0].pos == 20
+    assert blue.list_marble[0].pos == 17
+    assert red.list_marble[0].pos == 80
+
+
+def test_apply_action_seven_into_finish_sends_home_on_track_only():
+    """Test that a 7 into the finish lane sends home the marbles it passes on the track, not those beyond the start."""
+    dog = Dog()
+    dog.state.bool_card_exchanged = True
+    blue, green, red = dog.state.list_player[:3]
+    blue.list_card = [Card(suit="♠", rank="7")]
+    blue.list_marble[0].pos = 61
+    red.list_marble[0].pos = 63
+    green.list_marble[0].pos = 1
+    action = Action(card=Card(suit="♠", rank="7"), pos_from=61, pos_to=71)
+    assert action in dog.get_list_action()
+    dog.apply_action(action)
+    assert blue.list_marble[0].pos == 71
+    assert red.list_marble[0].pos == 80
+    assert green.list_marble[0].pos == 1
+
+
+def test_get_list_action_finished_player_leaves_partner_kennel():
+    """Test that a finished player moves a marble of the partner out to the partner's start square."""
+    dog = Dog()
+    dog.state.bool_card_exchanged = True
+    player = dog.state.list_player[0]
+    player.list_card = [Card(suit="♠", rank="A"), Card(suit="", rank="JKR")]
+    for marble, pos in zip(player.list_marble, FinishNumbers[player.colour].value):
+        marble.pos = pos
+    partner_start = StartNumbers[dog.state.list_player[2].colour].value
+    list_action = dog.get_list_action()
+    assert Action(card=Card(suit="♠", rank="A"), pos_from=80, pos_to=partner_start) in list_action
+    assert Action(card=Card(suit="", rank="JKR"), pos_from=80, pos_to=partner_start) in list_action
+    assert all(action.pos_to != StartNumbers[player.colour].value for action in list_action)
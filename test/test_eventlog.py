@@ -0,0 +1,84 @@
+import json
+import os
+
+from server.py import eventlog
+
+
+class RecordingEventLog(eventlog.EventLog):
+    """Event log that remembers the number of lines of every write."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.list_cnt_line = []
+
+    def _write(self, data: str) -> None:
+        self.list_cnt_line.append(data.count("\n"))
+        super()._write(data)
+
+
+def read_events(path: str) -> list:
+    with open(path, encoding="utf-8") as fin:
+        return [json.loads(line) for line in fin]
+
+
+def test_batches(tmp_path):
+    """Test that queued events are written in batches, also the ones emitted before start."""
+    path = str(tmp_path / "events.log")
+    event_log = RecordingEventLog(path, batch_size=3, flush_interval=10.0)
+    for idx in range(7):
+        event_log.emit("move", session_id="abc", idx=idx)
+    assert not os.path.exists(path)  # nothing is written before start
+    event_log.start()
+    event_log.close()
+    assert event_log.list_cnt_line == [3, 3, 1]
+    events = read_events(path)
+    assert [event["idx"] for event in events] == list(range(7))
+    assert events[0]["event"] == "move" and events[0]["session_id"] == "abc"
+
+
+def test_emit_after_close_is_dropped(tmp_path):
+    """Test that events after close or beyond the queue limit are counted as dropped."""
+    event_log = eventlog.EventLog(str(tmp_path / "events.log"), max_queue=2)
+    for _ in range(3):
+        event_log.emit("move")
+    assert event_log.cnt_dropped == 1
+    event_log.start()
+    event_log.close()
+    event_log.emit("move")
+    assert event_log.cnt_dropped == 2
+    assert len(read_events(str(tmp_path / "events.log"))) == 2
+
+
+def test_rotation(tmp_path):
+    """Test that the file is rotated before it grows beyond max_bytes and only backup_count files are kept."""
+    path = str(tmp_path / "events.log")
+    event_log = eventlog.EventLog(path, max_bytes=300, backup_count=2, batch_size=1)
+    event_log.start()
+    for idx in range(40):
+        event_log.emit("move", session_id="abc", idx=idx)
+    event_log.close()
+    assert sorted(os.listdir(tmp_path)) == ["events.log", "events.log.1", "events.log.2"]
+    assert all(os.path.getsize(f"{path}{suffix}") <= 300 for suffix in ["", ".1", ".2"])
+    list_idx = [event["idx"] for suffix in [".2", ".1", ""] for event in read_events(f"{path}{suffix}")]
+    assert list_idx == list(range(list_idx[0], 40))  # the oldest events are gone
+
+
+def test_sampling():
+    """Test that sessions are sampled by their id, the same session always gets the same answer."""
+    assert eventlog.EventLog(sample_rate=1.0).is_sampled("abc")
+    assert not eventlog.EventLog(sample_rate=0.0).is_sampled("abc")
+    event_log = eventlog.EventLog(sample_rate=0.25)
+    list_sampled = [event_log.is_sampled(f"session{idx}") for idx in range(2000)]
+    assert 400 < sum(list_sampled) < 600
+    assert list_sampled == [event_log.is_sampled(f"session{idx}") for idx in range(2000)]
+
+
+def test_create_event_log_from_env(monkeypatch, tmp_path):
+    """Test that the event log is configured by the environment variables."""
+    monkeypatch.setenv("GAME_EVENT_LOG", str(tmp_path / "events.log"))
+    monkeypatch.setenv("GAME_EVENT_LOG_SAMPLE", "0.1")
+    monkeypatch.setenv("GAME_EVENT_LOG_BACKUPS", "3")
+    event_log = eventlog.create_event_log_from_env()
+    assert event_log.path == str(tmp_path / "events.log")
+    assert event_log.sample_rate == 0.1
+    assert event_log.backup_count == 3
@@ -0,0 +1,151 @@
+import os
+
+import pytest
+from server.py import hangman_solver
+from server.py.hangman import (
+    Hangman,
+    HangmanGameState,
+    GamePhase,
+    GuessLetterAction,
+    RandomPlayer,
+    get_letter_mask,
+)
+
+
+def create_game(word_to_guess: str, guesses: str = "") -> Hangman:
+    game = Hangman()
+    game.set_state(HangmanGameState(
+        word_to_guess=word_to_guess, phase=GamePhase.RUNNING, guesses=list(guesses), incorrect_guesses=[]))
+    return game
+
+
+def test_get_state_not_set():
+    """Test that get_state raises an error before set_state."""
+    with pytest.raises(ValueError):
+        Hangman().get_state()
+
+
+def test_init_with_word():
+    """Test that a word given to the constructor starts the game."""
+    game = Hangman("DevOps")
+    assert game.get_state().word_to_guess == "DevOps"
+    assert game.get_state().phase == GamePhase.RUNNING
+
+
+def test_get_letter_mask():
+    """Test the letter mask ignores case and non-letters."""
+    assert get_letter_mask("aB-b") == 0b11
+    assert get_letter_mask("") == 0
+
+
+def test_set_state_derives_incorrect_guesses():
+    """Test that set_state recomputes the incorrect guesses instead of adding to them."""
+    state = HangmanGameState(
+        word_to_guess="devops", phase=GamePhase.RUNNING, guesses=["D", "x", "A"], incorrect_guesses=["Q", "X"])
+    game = Hangman()
+    for _ in range(3):
+        game.set_state(state)
+    assert game.get_state().incorrect_guesses == ["X", "A"]
+    for letter in "BCFGHI":
+        game.apply_action(GuessLetterAction(letter=letter))
+    assert game.get_state().phase == GamePhase.FINISHED
+    game.set_state(game.get_state())
+    assert len(game.get_state().incorrect_guesses) == 8
+
+
+def test_get_list_action_unguessed_letters():
+    """Test that the actions are the unguessed letters in alphabetical order."""
+    game = create_game("devops", "AC")
+    letters = [action.letter for action in game.get_list_action()]
+    assert letters[:3] == ["B", "D", "E"]
+    assert len(letters) == 24
+    assert create_game("devops", "ABCDEFGHIJKLMNOPQRSTUVWXYZ").get_list_action() == []
+
+
+def test_apply_action_win():
+    """Test that revealing all letters finishes the game."""
+    game = create_game("Xy")
+    game.apply_action(GuessLetterAction(letter="x"))
+    assert game.get_state().phase == GamePhase.RUNNING
+    game.apply_action(GuessLetterAction(letter="Y"))
+    assert game.get_state().phase == GamePhase.FINISHED
+    assert game.get_state().incorrect_guesses == []
+
+
+def test_apply_action_lose():
+    """Test that the 8th incorrect guess finishes the game."""
+    game = create_game("XY")
+    for letter in "ABCDEFG":
+        game.apply_action(GuessLetterAction(letter=letter))
+    assert game.get_state().phase == GamePhase.RUNNING
+    game.apply_action(GuessLetterAction(letter="H"))
+    assert game.get_state().phase == GamePhase.FINISHED
+    assert len(game.get_state().incorrect_guesses) == 8
+
+
+def test_get_player_view_masks_word():
+    """Test that only guessed letters of the word are shown."""
+    game = create_game("DevOps", "DZ")
+    assert game.get_player_view(0).word_to_guess == "D_____"
+    game.apply_action(GuessLetterAction(letter="o"))
+    assert game.get_player_view(0).word_to_guess == "D__O__"
+    assert game.get_player_view(0).guesses == ["D", "Z", "O"]
+
+
+def test_print_state(capfd):
+    """Test that print_state prints with and without a state."""
+    Hangman().print_state()
+    create_game("devops").print_state()
+    out, _ = capfd.readouterr()
+    assert "No state set yet" in out
+    assert "devops" in out
+
+
+def test_random_player():
+    """Test that the random player selects one of the actions."""
+    game = create_game("devops")
+    actions = game.get_list_action()
+    assert RandomPlayer().select_action(game.get_state(), actions) in actions
+    assert RandomPlayer().select_action(game.get_state(), []) is None
+
+
+def test_word_index_candidates(tmp_path):
+    """Test that the binary index finds the words matching a masked pattern."""
+    words_file = tmp_path / "words.json"
+    words_file.write_text('["devops", "deploy", "docker", "cat", "dog-s"]', encoding="utf-8")
+    index_file = str(tmp_path / "words.idx")
+    hangman_solver.write_index(str(words_file), index_file)
+    index = hangman_solver.WordIndex(index_file)
+    assert index.get_cnt_word(6) == 3
+    assert index.get_cnt_word(5) == 0  # words with other characters than letters are skipped
+    words = [index.get_word(6, idx) for idx in hangman_solver.iter_bits(index.get_candidates("DE____", "DE"))]
+    assert words == ["DEPLOY", "DEVOPS"]
+    assert index.get_candidates("DE____", "DEO") == 0  # O is guessed but hidden
+    index.close()
+
+
+def test_solver_player_wins(tmp_path):
+    """Test that the solver guesses a dictionary word with at most one wrong guess."""
+    words_file = tmp_path / "words.json"
+    words_file.write_text('["devops", "deploy", "docker", "python", "kernel"]', encoding="utf-8")
+    player = hangman_solver.SolverPlayer(str(tmp_path / "words.idx"), str(words_file))
+    game = create_game("Docker")
+    while game.get_state().phase != GamePhase.FINISHED:
+        game.apply_action(player.select_action(game.get_player_view(0), game.get_list_action()))
+    assert len(game.get_state().incorrect_guesses) <= 1
+    assert player.select_action(game.get_player_view(0), []) is None
+
+
+def test_index_file_per_word_list(tmp_path, monkeypatch):
+    """Test that the default index is built outside the source tree and a changed word list gets a new index."""
+    monkeypatch.setattr(hangman_solver, "INDEX_DIR", str(tmp_path / "cache"))
+    words_file = tmp_path / "words.json"
+    words_file.write_text('["devops", "deploy"]', encoding="utf-8")
+    player = hangman_solver.SolverPlayer(words_file=str(words_file))
+    assert player.index_file.startswith(str(tmp_path / "cache"))
+    game = create_game("devops")
+    assert player.select_action(game.get_player_view(0), game.get_list_action()) is not None
+    assert os.path.exists(player.index_file)
+    words_file.write_text('["devops", "docker"]', encoding="utf-8")
+    assert hangman_solver.get_index_file(str(words_file)) != player.index_file
+    assert os.path.isabs(hangman_solver.WORDS_FILE) and os.path.exists(hangman_solver.WORDS_FILE)
@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+from server.py import main, session, uno
+
+ACTION_ILLEGAL = {"card": None, "color": None, "draw": 7, "uno": False}  # drawing 7 cards is never offered
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "session_store", session.create_session_store("memory"))
+    return TestClient(main.app)
+
+
+def receive_update(websocket) -> dict:
+    data = websocket.receive_json()
+    assert data["type"] == "update"
+    return data["state"]
+
+
+def test_uno_simulation_rejects_illegal_action(client):
+    """Test that an action which is not in the list is not applied and the actions are sent again."""
+    with client.websocket_connect("/uno/simulation/ws") as websocket:
+        state = receive_update(websocket)
+        websocket.send_json({"type": "action", "action": ACTION_ILLEGAL})
+        state_again = receive_update(websocket)
+        state.pop("selected_action")  # the suggested action is drawn at random each time
+        state_again.pop("selected_action")
+        assert state_again == state
+        websocket.send_json({"type": "action", "action": state["list_action"][0]})
+        state_next = receive_update(websocket)
+        assert state_next["list_player"] != state["list_player"]
+
+
+def test_uno_singleplayer_resume(client):
+    """Test that a singleplayer game is resumed by its session id and only offered actions are applied."""
+    game = uno.Uno(seed=5)
+    game.set_state(uno.GameState(cnt_player=main.UNO_CNT_PLAYER, idx_player_active=0))
+    main.session_store.save_game("abc", "uno", game)
+    list_card = game.get_state().list_player[0].list_card
+    with client.websocket_connect("/uno/singleplayer/ws?session_id=abc") as websocket:
+        assert websocket.receive_json()["session_id"] == "abc"
+        state = receive_update(websocket)
+        assert [uno.Card(**card) for card in state["list_player"][0]["list_card"]] == list_card
+        websocket.send_json({"type": "action", "action": ACTION_ILLEGAL})
+        assert receive_update(websocket)["list_action"] == []
+        assert receive_update(websocket)["list_action"] == state["list_action"]
+    restored = main.session_store.load_game("abc", "uno")
+    assert restored is not None
+    assert restored.get_state().list_player[0].list_card == list_card
+
+
+def test_uno_singleplayer_new_session(client):
+    """Test that an unknown session id starts a new game with a new session id."""
+    with client.websocket_connect("/uno/singleplayer/ws?session_id=unknown") as websocket:
+        data = websocket.receive_json()
+        assert data["type"] == "session" and data["session_id"] != "unknown"
+
+
+def test_uno_random_player_finishes_game(client):
+    """Test that the random players play the game until it is finished."""
+    with client.websocket_connect("/uno/random_player/ws") as websocket:
+        for _ in range(10000):
+            state = receive_update(websocket)
+            if state["phase"] == "finished":
+                break
+    assert state["phase"] == "finished"
+    assert any(len(player["list_card"]) == 0 for player in state["list_player"])
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from server.py import metrics
+
+
+def test_counter_and_gauge():
+    """Test that counters add up per label and gauges go up and down."""
+    counter = metrics.Counter("moves_total", "Moves", ("game",))
+    counter.inc(game="dog")
+    counter.inc(2, game="dog")
+    counter.inc(game="uno")
+    assert counter.get(game="dog") == 3.0
+    assert counter.get(game="hangman") == 0.0
+    gauge = metrics.Gauge("sessions", "Sessions", ("game",))
+    gauge.inc(game="dog")
+    gauge.inc(game="dog")
+    gauge.dec(game="dog")
+    assert gauge.get(game="dog") == 1.0
+    gauge.set(7, game="dog")
+    assert gauge.get(game="dog") == 7.0
+
+
+def test_wrong_labels():
+    """Test that missing or unknown labels raise an error."""
+    counter = metrics.Counter("moves_total", "Moves", ("game",))
+    with pytest.raises(ValueError):
+        counter.inc()
+    with pytest.raises(ValueError):
+        counter.inc(game="dog", player="1")
+
+
+def test_histogram_buckets():
+    """Test that observations are counted in the first bucket they fit, cumulative in the output."""
+    histogram = metrics.Histogram("latency_seconds", "Latency", ("game",), buckets=(0.1, 0.01, 1.0))
+    assert histogram.buckets == (0.01, 0.1, 1.0)
+    for value in (0.005, 0.01, 0.05, 5.0):
+        histogram.observe(value, game="dog")
+    with histogram.time(game="dog"):
+        pass
+    assert histogram.get_count(game="dog") == 5
+    lines = histogram.samples()
+    assert lines[:4] == [
+        'latency_seconds_bucket{game="dog",le="0.01"} 3',
+        'latency_seconds_bucket{game="dog",le="0.1"} 4',
+        'latency_seconds_bucket{game="dog",le="1.0"} 4',
+        'latency_seconds_bucket{game="dog",le="+Inf"} 5',
+    ]
+    assert lines[4].startswith('latency_seconds_sum{game="dog"} 5.065')
+    assert lines[5] == 'latency_seconds_count{game="dog"} 5'
+
+
+def test_registry_render():
+    """Test the text exposition format of a registry."""
+    registry = metrics.Registry()
+    counter = registry.register(metrics.Counter("moves_total", "Number of moves", ("game",)))
+    registry.register(metrics.Histogram("lag_seconds", "Lag", buckets=(1.0,)))
+    counter.inc(game="dog")
+    assert registry.render() == (
+        "# HELP moves_total Number of moves\n"
+        "# TYPE moves_total counter\n"
+        'moves_total{game="dog"} 1.0\n'
+        "# HELP lag_seconds Lag\n"
+        "# TYPE lag_seconds histogram\n")
+    with pytest.raises(ValueError):
+        registry.register(metrics.Counter("moves_total", "Again"))
+
+
+def test_track_session():
+    """Test that the decorator counts started and active sessions, also when the handler fails."""
+    active = []
+
+    @metrics.track_session("test_game")
+    async def handler(fail: bool) -> None:
+        active.append(metrics.SESSIONS_ACTIVE.get(game="test_game"))
+        if fail:
+            raise RuntimeError("disconnected")
+
+    asyncio.run(handler(False))
+    with pytest.raises(RuntimeError):
+        asyncio.run(handler(True))
+    assert active == [1.0, 1.0]
+    assert metrics.SESSIONS_ACTIVE.get(game="test_game") == 0.0
+    assert metrics.SESSIONS_TOTAL.get(game="test_game") == 2.0
+
+
+def test_metric_is_abstract():
+    """Test that a metric without samples can not be created."""
+    with pytest.raises(TypeError):
+        metrics.Metric("moves_total", "Moves")  # pylint: disable=abstract-class-instantiated
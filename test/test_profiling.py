@@ -0,0 +1,87 @@
+import pytest
+from server.py import profiling
+from server.py.game import Game
+
+
+class CounterGame(Game):
+    """Game whose apply_action calls get_state, to check nested calls."""
+
+    def __init__(self) -> None:
+        self.state = 0
+
+    def set_state(self, state):
+        self.state = state
+
+    def get_state(self):
+        return self.state
+
+    def print_state(self):
+        print(self.state)
+
+    def get_list_action(self):
+        return [1, 2]
+
+    def apply_action(self, action):
+        self.state = self.get_state() + action
+
+    def get_player_view(self, idx_player):
+        return self.state
+
+
+@pytest.fixture
+def profiler():
+    profiler = profiling.GameProfiler()
+    yield profiler
+    profiler.detach(CounterGame)
+
+
+def test_attach_detach_restores_methods(profiler):
+    """Test that attaching wraps the interface methods and detaching restores the originals."""
+    originals = {name: CounterGame.__dict__[name] for name in profiling.PROFILED_METHODS}
+    profiler.attach(CounterGame)
+    assert profiler.is_attached(CounterGame)
+    assert all(CounterGame.__dict__[name] is not originals[name] for name in profiling.PROFILED_METHODS)
+    profiler.attach(CounterGame, sample_rate=0.5)  # changing the rate does not wrap twice
+    assert CounterGame.apply_action.__wrapped__ is originals["apply_action"]
+    profiler.detach(CounterGame)
+    assert not profiler.is_attached(CounterGame)
+    assert all(CounterGame.__dict__[name] is originals[name] for name in profiling.PROFILED_METHODS)
+
+
+def test_stats_of_sampled_calls(profiler):
+    """Test that calls are counted per method and nested calls are part of the outer call."""
+    game = CounterGame()
+    profiler.attach(CounterGame)
+    for action in game.get_list_action():
+        game.apply_action(action)
+    assert game.get_state() == 3
+    games = profiler.summary()["games"]
+    assert games["test_profiling.CounterGame"]["apply_action"]["cnt_call"] == 2
+    assert games["test_profiling.CounterGame"]["get_list_action"]["cnt_call"] == 1
+    assert games["test_profiling.CounterGame"]["get_state"]["cnt_call"] == 1  # not the calls in apply_action
+    profiler.attach(CounterGame, sample_rate=0.0)
+    game.apply_action(1)
+    assert profiler.summary()["games"]["test_profiling.CounterGame"]["apply_action"]["cnt_call"] == 2
+    with pytest.raises(ValueError):
+        profiler.attach(CounterGame, sample_rate=2.0)
+
+
+def test_collapsed_stacks(profiler):
+    """Test the collapsed stack output: one 'game;method microseconds' line per profiled method."""
+    game = CounterGame()
+    profiler.attach(CounterGame)
+    game.apply_action(1)
+    game.get_list_action()
+    lines = profiler.to_collapsed().splitlines()
+    assert [line.rsplit(" ", 1)[0] for line in lines] == [
+        "test_profiling.CounterGame;apply_action", "test_profiling.CounterGame;get_list_action"]
+    assert all(int(line.rsplit(" ", 1)[1]) >= 0 for line in lines)
+    profiler.reset()
+    assert profiler.to_collapsed() == "\n"
+
+
+def test_parse_profile_config():
+    """Test that the sample rate of a game type defaults to 1."""
+    assert profiling.parse_profile_config("dog:0.1, hangman,") == {"dog": 0.1, "hangman": 1.0}
+    with pytest.raises(ValueError):
+        profiling.attach_from_config("chess", {"dog": CounterGame})
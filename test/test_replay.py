@@ -0,0 +1,157 @@
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+from server.py import dog, hangman, main, replay
+
+
+def record_dog_game(cnt_action: int) -> replay.ReplayRecorder:
+    random.seed(2)
+    game = dog.Dog(seed=2)
+    recorder = replay.ReplayRecorder("dog", game)
+    player = dog.RandomPlayer()
+    for _ in range(cnt_action):
+        action = player.select_action(game.get_state(), game.get_list_action())
+        game.apply_action(action)
+        recorder.record(action)
+    return recorder
+
+
+def record_hangman_game() -> replay.ReplayRecorder:
+    game = hangman.Hangman("DevOps")
+    recorder = replay.ReplayRecorder("hangman", game)
+    for letter in "XDEOVPS":
+        action = hangman.GuessLetterAction(letter=letter)
+        game.apply_action(action)
+        recorder.record(action)
+    return recorder
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = str(tmp_path / "games.replay")
+    log = replay.ReplayLog(path)
+    log.append(record_dog_game(100))
+    log.append(record_hangman_game())
+    return path
+
+
+def test_codec_round_trip():
+    """Test that every encoded action, including None, decodes to the same action."""
+    codec = replay.CODECS["dog"]
+    game = dog.Dog(seed=5)
+    list_action = game.get_list_action() + [None]
+    for action in list_action:
+        data = codec.encode_action(action)
+        assert len(data) == codec.action_size
+        assert codec.decode_action(data) == action
+    codec = replay.CODECS["hangman"]
+    for action in list(hangman.GUESS_ACTIONS) + [None]:
+        assert codec.decode_action(codec.encode_action(action)) == action
+
+
+def test_log_round_trip(log_path):
+    """Test that the recorded games are read back and replay to the states of the played games."""
+    with replay.ReplayReader(log_path) as reader:
+        assert len(reader) == 2
+        record_dog, record_hangman = list(reader)
+    assert record_dog.game_type == "dog" and record_dog.cnt_action == 100
+    assert record_hangman.game_type == "hangman" and record_hangman.cnt_action == 7
+    recorder = record_dog_game(100)
+    assert record_dog.init == recorder.init and record_dog.actions == bytes(recorder.actions)
+    state = record_hangman.replay().get_state()
+    assert state.phase == hangman.GamePhase.FINISHED
+    assert state.incorrect_guesses == ["X"]
+
+
+def test_replay_matches_played_game(log_path):
+    """Test that replaying a record gives the state of the game that was played."""
+    random.seed(2)
+    game = dog.Dog(seed=2)
+    player = dog.RandomPlayer()
+    for _ in range(100):
+        game.apply_action(player.select_action(game.get_state(), game.get_list_action()))
+    with replay.ReplayReader(log_path) as reader:
+        record = reader[0]
+    assert record.replay().get_state() == game.get_state()
+
+
+def test_seek_matches_replay(log_path):
+    """Test that seeking via the snapshots gives the same state as replaying from the start."""
+    with replay.ReplayReader(log_path) as reader:
+        record = reader[0]
+    index = replay.ReplayIndex(record, interval=16)
+    assert len(index.list_snapshot) == 100 // 16 + 1
+    for idx_move in [0, 1, 15, 16, 17, 63, 99, 100, 150]:
+        assert index.seek(idx_move).get_state() == record.replay(idx_move).get_state()
+    list_move = list(index.iter_moves(95))
+    assert [idx for idx, _, _ in list_move] == [95, 96, 97, 98, 99, 100]
+    assert list_move[-1][2].get_state() == record.replay().get_state()
+
+
+def test_find_and_partial_record(log_path):
+    """Test that find returns the last record of a game and a record still being written is ignored."""
+    recorder = record_hangman_game()
+    replay.ReplayLog(log_path).append(recorder)
+    with open(log_path, "ab") as fout:
+        fout.write(recorder.to_bytes()[:20])
+    with replay.ReplayReader(log_path) as reader:
+        assert len(reader) == 3
+        record = reader.find(recorder.game_id.hex)
+        assert record is not None and record.offset == reader[2].offset
+        assert reader.find("0" * 32) is None
+        assert reader.find("not a game id") is None
+        assert reader.get_stats()["hangman"]["cnt_game"] == 2
+
+
+def test_not_a_replay_log(tmp_path):
+    """Test that reading a file without the replay header raises an error."""
+    path = tmp_path / "other.log"
+    path.write_bytes(b"not a replay log")
+    with pytest.raises(ValueError):
+        replay.ReplayReader(str(path))
+
+
+def test_record_random_games_skips_failed_games(tmp_path):
+    """Test that the headless runner only appends games that did not fail and counts the failed ones."""
+    path = str(tmp_path / "games.replay")
+    cnt_failed = replay.record_random_games(path, 5, cnt_action_max=200)
+    with replay.ReplayReader(path) as reader:
+        assert len(reader) == 5 - cnt_failed
+
+
+@pytest.fixture
+def client(monkeypatch, log_path):
+    monkeypatch.setattr(main, "replay_log", replay.ReplayLog(log_path))
+    monkeypatch.setattr(main, "replay_indexes", main.OrderedDict())
+    with replay.ReplayReader(log_path) as reader:
+        game_id = reader[1].game_id
+    return TestClient(main.app), game_id
+
+
+def test_get_replay(client):
+    """Test that the replay endpoint returns the state after a move, the final state by default."""
+    test_client, game_id = client
+    response = test_client.get(f"/replay/{game_id}", params={"idx_move": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["game_type"] == "hangman" and data["idx_move"] == 2 and data["cnt_move"] == 7
+    assert data["state"]["guesses"] == ["X", "D"]
+    assert test_client.get(f"/replay/{game_id}").json()["state"]["phase"] == "finished"
+    assert test_client.get(f"/replay/{'0' * 32}").status_code == 404
+    assert test_client.get(f"/replay/{game_id}", params={"idx_move": "x"}).status_code == 422
+
+
+def test_replay_ws(client):
+    """Test that the replay socket streams the moves, seeks, and answers bad move indexes with an error."""
+    test_client, game_id = client
+    with test_client.websocket_connect(f"/replay/ws?game_id={game_id}&idx_move=5") as websocket:
+        list_idx = [websocket.receive_json()["state"]["idx_move"] for _ in range(3)]
+        assert list_idx == [5, 6, 7]
+        websocket.send_json({"type": "seek", "idx_move": "x"})
+        assert websocket.receive_json()["type"] == "error"
+        websocket.send_json({"type": "seek", "idx_move": 6})
+        assert [websocket.receive_json()["state"]["idx_move"] for _ in range(2)] == [6, 7]
+    with test_client.websocket_connect(f"/replay/ws?game_id={game_id}&idx_move=abc") as websocket:
+        assert websocket.receive_json()["type"] == "error"
+        assert websocket.receive_json()["state"]["idx_move"] == 0
@@ -0,0 +1,90 @@
+import pytest
+from server.py import session
+from server.py.dog import Dog
+from server.py.hangman import Hangman, GuessLetterAction
+from server.py.uno import Uno, GameState as UnoGameState
+
+
+def create_dog() -> Dog:
+    game = Dog(seed=11)
+    game.apply_action(game.get_list_action()[0])
+    return game
+
+
+def create_hangman() -> Hangman:
+    game = Hangman("DevOps")
+    game.apply_action(GuessLetterAction(letter="X"))
+    game.apply_action(GuessLetterAction(letter="O"))
+    return game
+
+
+def create_uno() -> Uno:
+    game = Uno(seed=3)
+    game.set_state(UnoGameState(cnt_player=3))
+    for _ in range(10):
+        game.apply_action(game.get_list_action()[0])
+    return game
+
+
+GAMES = {"dog": create_dog, "hangman": create_hangman, "uno": create_uno}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return session.create_session_store("memory")
+    return session.create_session_store(f"sqlite:///{tmp_path / 'sessions.db'}")
+
+
+@pytest.mark.parametrize("game_type", GAMES)
+def test_snapshot_round_trip(game_type):
+    """Test that a game restored from its snapshot has the same state and actions."""
+    game = GAMES[game_type]()
+    restored = session.load_snapshot(game_type, session.dump_snapshot(game_type, game))
+    assert restored.get_state() == game.get_state()
+    assert restored.get_list_action() == game.get_list_action()
+
+
+@pytest.mark.parametrize("game_type", GAMES)
+def test_store_round_trip(store, game_type):
+    """Test that a saved game is loaded again, and is gone after delete."""
+    game = GAMES[game_type]()
+    store.save_game("abc", game_type, game)
+    restored = store.load_game("abc", game_type)
+    assert restored is not None
+    assert restored.get_state() == game.get_state()
+    assert store.load("abc").owner == session.worker_id()
+    store.delete("abc")
+    assert store.load_game("abc", game_type) is None
+
+
+def test_store_other_game_type(store):
+    """Test that a session is not restored as another game and a save replaces the session."""
+    store.save_game("abc", "hangman", create_hangman())
+    assert store.load_game("abc", "dog") is None
+    store.save_game("abc", "uno", create_uno())
+    assert isinstance(store.load_game("abc", "uno"), Uno)
+    assert store.load_game("unknown", "uno") is None
+
+
+def test_sqlite_store_shared(tmp_path):
+    """Test that two stores on the same SQLite file see the sessions of each other."""
+    url = f"sqlite:///{tmp_path / 'sessions.db'}"
+    session.create_session_store(url).save_game("abc", "hangman", create_hangman())
+    restored = session.create_session_store(url).load_game("abc", "hangman")
+    assert restored is not None
+    assert restored.get_state().guesses == ["X", "O"]
+
+
+def test_create_session_store_unknown():
+    """Test that an unknown store url raises an error."""
+    with pytest.raises(ValueError):
+        session.create_session_store("redis://localhost")
+
+
+def test_affinity_hint():
+    """Test that the worker of a session is stable and within the number of workers."""
+    assert session.affinity_hint("abc", 1) == 0
+    list_worker = [session.affinity_hint(f"session{idx}", 4) for idx in range(100)]
+    assert set(list_worker) == {0, 1, 2, 3}
+    assert session.affinity_hint("session7", 4) == list_worker[7]
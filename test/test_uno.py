@@ -0,0 +1,217 @@
+import pytest
+from server.py.uno import (
+    Uno,
+    Action,
+    Card,
+    GamePhase,
+    GameState,
+    RandomPlayer,
+    CARD_BY_ID,
+    CARD_HIDDEN,
+    get_card_id,
+)
+
+
+def create_game(top: Card, hand: list, cnt_player: int = 2) -> Uno:
+    """Game with number cards to draw, the top card of the discard pile and the hand of player 0."""
+    list_card_draw = [
+        Card(color=color, number=number) for color in ["red", "blue", "yellow", "green"] for number in range(10)]
+    list_card_draw[len(list_card_draw) - cnt_player * 7 - 1] = top
+    game = Uno(seed=1)
+    game.set_state(GameState(cnt_player=cnt_player, idx_player_active=0, list_card_draw=list_card_draw))
+    state = game.get_state()
+    state.list_player[0].list_card = hand
+    game.set_state(state)
+    return game
+
+
+def test_get_state_not_set():
+    """Test that get_state raises an error before set_state."""
+    with pytest.raises(ValueError):
+        Uno().get_state()
+
+
+def test_setup_deals_full_deck():
+    """Test that the shuffled deck is dealt and the first card is not a wild draw 4."""
+    game = Uno(seed=3)
+    state = GameState(cnt_player=4)
+    game.set_state(state)
+    assert game.get_state() is state
+    assert state.phase == GamePhase.RUNNING
+    assert len(state.list_card_draw) == 108 - 4 * 7 - 1
+    assert all(len(player.list_card) == 7 for player in state.list_player)
+    assert state.list_card_discard[-1].symbol != "wilddraw4"
+    assert 0 <= state.idx_player_active < 4
+
+
+def test_tables_not_serialised():
+    """Test that the card tables are shared by the class and not part of the state data."""
+    state = GameState(cnt_player=2)
+    assert len(state.LIST_CARD) == 108
+    assert state.LIST_CARD is GameState.LIST_CARD
+    assert "LIST_CARD" not in state.model_dump()
+    assert "CNT_HAND_CARDS" not in state.model_dump_json()
+
+
+def test_get_card_id():
+    """Test that cards of the same kind share an id and unknown kinds are rejected."""
+    assert get_card_id(Card(color="red", number=0)) == 0
+    assert get_card_id(Card(color="any", symbol="wild")) == 52
+    assert get_card_id(Card(color="green", symbol="2")) >= 54  # hand-made cards have ids after the deck
+    cnt_card = len(CARD_BY_ID)
+    for card in [CARD_HIDDEN, Card(color="purple", number=1), Card(color="red", number=12)]:
+        with pytest.raises(ValueError):
+            get_card_id(card)
+    assert len(CARD_BY_ID) == cnt_card
+
+
+def test_apply_action_card_not_in_hand():
+    """Test that playing a card which is not in the hand raises an error and changes nothing."""
+    game = create_game(Card(color="red", number=5), [Card(color="red", number=1), Card(color="blue", number=5)])
+    state_before = game.get_state().model_dump()
+    with pytest.raises(ValueError):
+        game.apply_action(Action(card=Card(color="red", number=2), color="red"))
+    with pytest.raises(ValueError):
+        game.apply_action(Action(card=CARD_HIDDEN))
+    assert game.get_state().model_dump() == state_before
+    assert len(game.get_list_action()) == 5  # both cards with and without UNO, and drawing
+
+
+def test_get_list_action_matching():
+    """Test that cards matching color or number, wild cards and drawing are possible."""
+    game = create_game(Card(color="red", number=5), [
+        Card(color="red", number=1), Card(color="blue", number=5), Card(color="blue", number=6),
+        Card(color="any", symbol="wild")])
+    actions = game.get_list_action()
+    assert Action(card=Card(color="red", number=1), color="red") in actions
+    assert Action(card=Card(color="blue", number=5), color="blue") in actions
+    assert Action(card=Card(color="blue", number=6), color="blue") not in actions
+    assert len([action for action in actions if action.card == Card(color="any", symbol="wild")]) == 4
+    assert Action(draw=1) in actions
+    assert len(sorted(actions)) == 7
+
+
+def test_get_list_action_large_hand():
+    """Test that the index finds every matching card of a large hand, and only those."""
+    hand = list(GameState(cnt_player=2).LIST_CARD[::3])
+    game = create_game(Card(color="red", number=5), hand, cnt_player=4)
+    found = {action.card for action in game.get_list_action() if action.card is not None}
+    expected = {card for card in hand if card.color in ("red", "any") or card.number == 5}
+    assert found == expected - {Card(color="any", symbol="wilddraw4")}  # the hand has red cards
+    card = Card(color="green", number=5)  # twice in the hand
+    game.apply_action(Action(card=card, color="green"))
+    assert card in game.get_state().list_player[0].list_card
+    game.set_state(game.get_state().model_copy(update={"idx_player_active": 0}))
+    game.apply_action(Action(card=card, color="green"))
+    assert card not in game.get_state().list_player[0].list_card
+
+
+def test_wild_draw_four_only_without_color():
+    """Test that a wild draw 4 is only possible without a card of the active color."""
+    wilddraw4 = Card(color="any", symbol="wilddraw4")
+    game = create_game(Card(color="red", number=5), [Card(color="blue", number=1), wilddraw4])
+    assert Action(card=wilddraw4, color="green", draw=4) in game.get_list_action()
+    game = create_game(Card(color="red", number=5), [Card(color="red", number=1), wilddraw4])
+    assert all(action.card != wilddraw4 for action in game.get_list_action())
+
+
+def test_draw_two_stacking():
+    """Test that draw 2 cards stack and the next player has to draw all cards."""
+    draw2 = Card(color="blue", symbol="draw2")
+    hand = [draw2, Card(color="blue", number=1), Card(color="red", number=1)]
+    game = create_game(Card(color="red", symbol="draw2"), hand)
+    assert game.get_state().cnt_to_draw == 2
+    assert sorted(game.get_list_action()) == sorted([Action(card=draw2, color="blue", draw=4), Action(draw=2)])
+    game.apply_action(Action(card=draw2, color="blue", draw=4))
+    state = game.get_state()
+    assert state.idx_player_active == 1
+    assert state.cnt_to_draw == 4
+    game.apply_action(Action(draw=4))
+    assert len(game.get_state().list_player[1].list_card) == 11
+    assert game.get_state().cnt_to_draw == 0
+
+
+def test_reverse_and_skip():
+    """Test that reverse changes the direction and skip skips the next player."""
+    hand = [Card(color="red", symbol="reverse"), Card(color="red", symbol="skip"), Card(color="red", number=1)]
+    game = create_game(Card(color="red", number=5), hand, cnt_player=3)
+    game.apply_action(Action(card=hand[0], color="red"))
+    assert game.get_state().direction == -1
+    assert game.get_state().idx_player_active == 2
+    game = create_game(Card(color="red", number=5), hand, cnt_player=3)
+    game.apply_action(Action(card=hand[1], color="red"))
+    assert game.get_state().idx_player_active == 2
+
+
+def test_pass_after_drawing():
+    """Test that the player keeps the turn after drawing and passes without a matching card."""
+    game = create_game(Card(color="green", number=5), [Card(color="red", number=1)])
+    game.apply_action(Action(draw=1))  # yellow 4
+    state = game.get_state()
+    assert state.has_drawn and state.idx_player_active == 0
+    assert game.get_list_action() == [Action()]
+    game.apply_action(Action())
+    assert game.get_state().idx_player_active == 1
+    assert not game.get_state().has_drawn
+
+
+def test_empty_discard_pile_only_draws():
+    """Test that a running game without a discard pile only offers drawing instead of raising an error."""
+    game = create_game(Card(color="green", number=5), [Card(color="red", number=1)])
+    state = game.get_state()
+    state.list_card_discard = []
+    game.set_state(state)
+    assert game.get_list_action() == [Action(draw=1)]
+    state.cnt_to_draw = 2
+    game.set_state(state)
+    assert game.get_list_action() == [Action(draw=2)]
+    game.apply_action(Action(draw=2))
+    assert game.get_list_action() == [Action()]
+
+
+def test_set_state_restores_game():
+    """Test that a game restored from its state continues the same."""
+    game = Uno(seed=5)
+    game.set_state(GameState(cnt_player=3))
+    for _ in range(20):
+        game.apply_action(game.get_list_action()[0])
+    state = game.get_state().model_copy(deep=True)
+    game_restored = Uno()
+    game_restored.set_state(state)
+    assert game_restored.get_list_action() == game.get_list_action()
+    assert game_restored.get_state() == game.get_state()
+
+
+def test_get_player_view_hides_cards():
+    """Test that the cards of the opponents and the draw pile are face down."""
+    game = create_game(Card(color="red", number=5), [Card(color="red", number=1)])
+    view = game.get_player_view(0)
+    assert view.list_player[0].list_card == [Card(color="red", number=1)]
+    assert view.list_player[1].list_card == [CARD_HIDDEN] * 7
+    assert set(view.list_card_draw) == {CARD_HIDDEN}
+    assert game.get_state().list_player[1].list_card != [CARD_HIDDEN] * 7
+
+
+def test_random_player_finishes_game():
+    """Test that random players finish a game."""
+    game = Uno(seed=7)
+    game.set_state(GameState(cnt_player=4))
+    player = RandomPlayer()
+    for _ in range(5000):
+        if game.get_state().phase == GamePhase.FINISHED:
+            break
+        game.apply_action(player.select_action(game.get_player_view(0), game.get_list_action()))
+    state = game.get_state()
+    assert state.phase == GamePhase.FINISHED
+    assert sum(len(p.list_card) for p in state.list_player) + len(state.list_card_draw) + len(
+        state.list_card_discard) == 108
+    assert player.select_action(state, []) is None
+
+
+def test_print_state(capfd):
+    """Test that print_state prints with and without a state."""
+    Uno().print_state()
+    create_game(Card(color="red", number=5), []).print_state()
+    out, _ = capfd.readouterr()
+    assert "No state set yet" in out
+    assert "running" in out
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from server.py import watchdog
+
+
+def block_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def test_blocked_loop_is_reported():
+    """Test that a handler blocking the loop is reported with its tags and the blocking stack."""
+    loop_watchdog = watchdog.LoopWatchdog(threshold=0.1, interval=0.01)
+
+    async def handler() -> None:
+        watchdog.tag(game="dog", session_id="abc")
+        await asyncio.sleep(0.05)
+        block_loop(0.4)
+        await asyncio.sleep(0.05)
+
+    async def main() -> None:
+        loop_watchdog.start()
+        await asyncio.sleep(0.05)
+        await asyncio.get_running_loop().create_task(handler(), name="handler")
+        loop_watchdog.stop()
+
+    asyncio.run(main())
+    assert len(loop_watchdog.list_stall) == 1
+    stall = loop_watchdog.list_stall[0]
+    assert stall["game"] == "dog" and stall["session_id"] == "abc" and stall["task"] == "handler"
+    assert stall["blocked_seconds"] > 0.1
+    assert any("in block_loop" in entry for entry in stall["stack"])
+
+
+def test_no_report_without_stall():
+    """Test that a loop which keeps running is not reported."""
+    loop_watchdog = watchdog.LoopWatchdog(threshold=0.1, interval=0.01)
+
+    async def main() -> None:
+        loop_watchdog.start()
+        await asyncio.sleep(0.3)
+        loop_watchdog.stop()
+
+    asyncio.run(main())
+    assert loop_watchdog.list_stall == []
+
+
+def test_tags_are_forgotten():
+    """Test that the tags of a finished task are removed."""
+    async def handler() -> None:
+        watchdog.tag(game="uno")
+
+    asyncio.run(handler())
+    assert watchdog.get_tags(None) == {}
+    assert not watchdog._frame_tags  # pylint: disable=protected-access